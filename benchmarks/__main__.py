@@ -0,0 +1,89 @@
+"""
+Run every benchmark, optionally saving or comparing against a baseline
+
+    python -m benchmarks --save baseline.json
+    python -m benchmarks --compare baseline.json --tolerance 0.25
+
+With --compare the exit status is 1 if any benchmark got slower than
+the baseline by more than the tolerance.
+"""
+import argparse
+import importlib
+import json
+import sys
+
+from benchmarks import _runner
+
+MODULES = (
+    "bench_models",
+    "bench_decode",
+    "bench_metrics",
+    "bench_client",
+    "bench_upload",
+    "bench_comments",
+    "bench_crawl",
+    "bench_startup",
+)
+
+
+def run(modules) -> dict:
+    results = {}
+
+    for module in modules:
+        print(f"\n== {module}")
+        _runner.reset()
+        importlib.import_module(f"benchmarks.{module}").main()
+        results[module] = dict(_runner.RESULTS)
+
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """
+    Return (name, baseline ms, current ms) of every regression
+    """
+    regressions = []
+
+    for module, timings in results.items():
+        for name, current in timings.items():
+            previous = baseline.get(module, {}).get(name)
+
+            if previous and current > previous * (1 + tolerance):
+                regressions.append((f"{module}: {name}", previous, current))
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--only", help="comma separated modules, e.g. bench_client"
+    )
+    parser.add_argument("--save", help="write the results to this file")
+    parser.add_argument("--compare", help="baseline written with --save")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    results = run(args.only.split(",") if args.only else MODULES)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as out_file:
+            json.dump(results, out_file, indent=2, ensure_ascii=False)
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as baseline_file:
+            baseline = json.load(baseline_file)
+
+        regressions = compare(results, baseline, args.tolerance)
+
+        print(f"\n{len(regressions)} regressions over {args.tolerance:.0%}")
+
+        for name, previous, current in regressions:
+            print(f"{name:<64} {previous:>10.3f} -> {current:>10.3f} ms")
+
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
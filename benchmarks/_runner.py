@@ -0,0 +1,65 @@
+import gc
+import timeit
+import tracemalloc
+
+# best time in ms of every bench() call, by "section / name"
+RESULTS = {}
+_section = None
+
+
+def section(title: str):
+    """
+    Print a heading, following bench() results are recorded under it
+    """
+    global _section
+
+    _section = title
+    print(f"\n{title}")
+
+
+def reset():
+    global _section
+
+    RESULTS.clear()
+    _section = None
+
+
+def bench(name: str, func, number: int = None, repeat: int = 5) -> float:
+    """
+    Print and return the best time per call of `func` in milliseconds
+    """
+    timer = timeit.Timer(func)
+
+    if number is None:
+        number, _ = timer.autorange()
+
+    best = min(timer.repeat(repeat=repeat, number=number)) / number * 1000
+
+    return record(name, best)
+
+
+def record(name: str, milliseconds: float) -> float:
+    """
+    Print and record a time measured some other way than bench()
+    """
+    print(f"{name:<48} {milliseconds:>10.3f} ms")
+
+    RESULTS[f"{_section} / {name}" if _section else name] = milliseconds
+
+    return milliseconds
+
+
+def peak_memory(name: str, func) -> int:
+    """
+    Print and return the peak traced allocation of `func()` in bytes
+    """
+    gc.collect()
+    tracemalloc.start()
+    result = func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+
+    print(f"{name:<48} {peak / 1024 / 1024:>10.2f} MB")
+
+    return peak
@@ -0,0 +1,133 @@
+"""
+End-to-end client scenarios against benchmarks.fake_makaba: catalog
+polling, thread fetching and parsing, top-N, bulk thread fetches and
+bulk media downloads
+
+    python -m benchmarks.bench_client [--latency 0.02]
+
+With the default zero latency the numbers are dominated by the client's
+own work; a latency shows how well the bulk paths overlap requests.
+"""
+import argparse
+import shutil
+import tempfile
+
+from benchmarks._runner import bench, section
+from benchmarks.fake_makaba import FakeMakaba
+from benchmarks.fixtures import make_catalog
+from py_2ch_api.catalog import CatalogPoller
+from py_2ch_api.client import ChAPI
+from py_2ch_api.constants import TOP_METHODS
+from py_2ch_api.http_cache import ResponseCache
+from py_2ch_api.models import Thread
+from py_2ch_api.ranking import rank_key, rank_threads
+
+BOARDS = ("b", "po", "news", "vg")
+THREADS = 200
+POSTS = 500
+BULK_THREADS = 40
+MEDIA_SIZE = 256 * 1024
+
+
+def client(fake: FakeMakaba, **kwargs) -> ChAPI:
+    return ChAPI(base_url=fake.url, boards_cache_dir=None, **kwargs)
+
+
+def polling(fake: FakeMakaba):
+    section(f"catalog polling, {len(BOARDS)} boards x {THREADS} threads")
+
+    for name, cache in (("no cache", None), ("ResponseCache, 304", True)):
+        poller = CatalogPoller(
+            client(fake, cache=ResponseCache() if cache else None),
+            boards=BOARDS,
+        )
+        bench(
+            f"poll all boards, {name}",
+            lambda: [poller.poll(board) for board in BOARDS],
+        )
+
+
+def thread_parsing(fake: FakeMakaba):
+    section(f"get_thread, {POSTS} posts")
+    api = client(fake)
+    num = 1000
+
+    bench("Post models", lambda: api.get_thread(num, board="b"))
+    bench("lazy PostViews", lambda: api.get_thread(num, board="b", lazy=True))
+
+    raw_api = client(fake, raw=True)
+    bench(
+        "raw + lazy PostViews",
+        lambda: raw_api.get_thread(num, board="b", lazy=True),
+    )
+
+
+def top_n():
+    threads = [Thread(raw) for raw in make_catalog(threads=20000)["threads"]]
+
+    section(f"top 5 of {len(threads)} threads")
+    key = rank_key(TOP_METHODS.VIEWS)
+    bench("full sort", lambda: sorted(threads, key=key, reverse=True)[:5])
+    bench(
+        "rank_threads (heap)",
+        lambda: rank_threads(threads, TOP_METHODS.VIEWS, limit=5),
+    )
+
+
+def bulk_threads(fake: FakeMakaba):
+    keys = [("b", 1000 + i * 1000) for i in range(BULK_THREADS)]
+
+    section(f"get_threads, {BULK_THREADS} threads")
+
+    for use_threads in (False, True):
+        api = client(fake, use_threads=use_threads, workers=8)
+        bench(
+            "use_threads" if use_threads else "sequential",
+            lambda: list(api.get_threads(keys, lazy=True)),
+            number=1,
+            repeat=3,
+        )
+
+
+def bulk_downloads(fake: FakeMakaba):
+    section(
+        f"download_all_media_from_thread, files of {MEDIA_SIZE // 1024} KB"
+    )
+    out_dir = tempfile.mkdtemp(prefix="py-2ch-bench-")
+
+    try:
+        for use_threads in (False, True):
+            api = client(fake, use_threads=use_threads, workers=8)
+            # a fresh directory per run, existing files would be skipped
+            bench(
+                "parallel" if use_threads else "sequential",
+                lambda: api.download_all_media_from_thread(
+                    1000, tempfile.mkdtemp(dir=out_dir), board="b"
+                ),
+                number=1,
+                repeat=3,
+            )
+            api.__exit__(None, None, None)
+    finally:
+        shutil.rmtree(out_dir, ignore_errors=True)
+
+
+def main(latency: float = 0.0):
+    with FakeMakaba(
+        boards=BOARDS,
+        threads=THREADS,
+        posts=POSTS,
+        media_size=MEDIA_SIZE,
+        latency=latency,
+    ) as fake:
+        polling(fake)
+        thread_parsing(fake)
+        top_n()
+        bulk_threads(fake)
+        bulk_downloads(fake)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency", type=float, default=0.0)
+    main(parser.parse_args().latency)
@@ -0,0 +1,91 @@
+"""
+Comment parsing and reply graph on a 5000-post thread, or on threads
+recorded with benchmarks.record
+
+    python -m benchmarks.bench_comments [--recorded recorded/]
+
+The baseline runs one regex per thing it extracts, the way consumers
+did before parse_comment.
+"""
+import argparse
+import glob
+import html
+import json
+import os
+import re
+
+from benchmarks._runner import bench, section
+from benchmarks.fixtures import make_thread
+from py_2ch_api.comments import ReplyGraph, parse_comment
+
+POSTS = 5000
+NEW_POSTS = 100
+
+TAG_RE = re.compile(r"<[^>]+>")
+REPLY_RE = re.compile(r"&gt;&gt;(\d+)")
+LINK_RE = re.compile(r'href="(https?://[^"]+)"')
+GREENTEXT_RE = re.compile(r'<span class="unkfunc">(.*?)</span>')
+
+
+def parse_with_regexes(comment: str):
+    return (
+        html.unescape(TAG_RE.sub("", comment.replace("<br>", "\n"))),
+        [int(num) for num in REPLY_RE.findall(comment)],
+        LINK_RE.findall(comment),
+        [
+            html.unescape(TAG_RE.sub("", line))
+            for line in GREENTEXT_RE.findall(comment)
+        ],
+    )
+
+
+def load_threads(recorded: str = None):
+    if recorded is None:
+        return [make_thread(posts=POSTS)["threads"][0]["posts"]]
+
+    threads = []
+
+    for path in sorted(
+        glob.glob(os.path.join(recorded, "*", "res", "*.json"))
+    ):
+        with open(path, "r", encoding="utf-8") as thread_file:
+            threads.append(json.load(thread_file)["threads"][0]["posts"])
+
+    return threads
+
+
+def main(recorded: str = None):
+    threads = load_threads(recorded)
+    posts = [post for thread in threads for post in thread]
+    comments = [post["comment"] for post in posts]
+
+    section(f"{len(threads)} threads, {len(posts)} posts")
+    bench(
+        "regex per field",
+        lambda: [parse_with_regexes(comment) for comment in comments],
+    )
+    bench(
+        "parse_comment",
+        lambda: [parse_comment(comment) for comment in comments],
+    )
+    bench(
+        "ReplyGraph, whole threads",
+        lambda: [ReplyGraph(thread) for thread in threads],
+    )
+
+    old, new = posts[:-NEW_POSTS], posts[-NEW_POSTS:]
+    graph = ReplyGraph(old)
+
+    def add_new_posts():
+        for post in new:
+            graph.remove(post["num"])
+
+        graph.add_many(new)
+
+    bench(f"ReplyGraph, add {NEW_POSTS} new posts", add_new_posts)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--recorded", help="directory of benchmarks.record")
+    main(parser.parse_args().recorded)
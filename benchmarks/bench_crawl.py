@@ -0,0 +1,110 @@
+"""
+Board crawl throughput in one process and sharded across worker
+processes, against benchmarks.fake_makaba running in its own process
+
+    python -m benchmarks.bench_crawl [--processes 1,2,4]
+
+Scaling is bounded by the fake server and the number of cores; on a
+single core the process counts only show the sharding overhead.
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+from benchmarks._runner import bench, section
+from py_2ch_api.client import ChAPI
+from py_2ch_api.crawl import crawl_boards
+from py_2ch_api.export import post_record, thread_record
+from py_2ch_api.models import PostView, ThreadView
+
+BOARDS = ("b", "po", "news", "vg", "a", "pr", "s", "mu")
+THREADS = 20
+POSTS = 300
+
+
+def start_fake() -> (subprocess.Popen, str):
+    fake = subprocess.Popen(
+        [
+            sys.executable,
+            "-u",
+            "-m",
+            "benchmarks.fake_makaba",
+            "--port",
+            "0",
+            "--boards",
+            ",".join(BOARDS),
+            "--threads",
+            str(THREADS),
+            "--posts",
+            str(POSTS),
+        ],
+        stdout=subprocess.PIPE,
+        universal_newlines=True,
+    )
+
+    return fake, fake.stdout.readline().split()[-1]
+
+
+def crawl_in_process(url: str) -> int:
+    api = ChAPI(base_url=url, boards_cache_dir=None, raw=True)
+    records = 0
+
+    for board in BOARDS:
+        catalog = api.get(f"/{board}/catalog.json")["threads"]
+
+        for thread in catalog:
+            thread_record(board, ThreadView(thread))
+            num = thread["num"]
+            posts = api.get(f"/{board}/res/{num}.json")["threads"]
+
+            for post in posts[0]["posts"]:
+                post_record(board, num, PostView(post))
+                records += 1
+
+    return records
+
+
+def crawl_sharded(url: str, processes: int) -> int:
+    return sum(
+        len(result.value.posts)
+        for result in crawl_boards(BOARDS, base_url=url, processes=processes)
+    )
+
+
+def main(processes=None):
+    processes = processes or sorted({1, 2, os.cpu_count() or 1})
+    fake, url = start_fake()
+
+    try:
+        section(
+            f"crawl {len(BOARDS)} boards x {THREADS} threads x {POSTS} posts"
+        )
+        bench(
+            "one process",
+            lambda: crawl_in_process(url),
+            number=1,
+            repeat=3,
+        )
+
+        for count in processes:
+            bench(
+                f"crawl_boards, {count} processes",
+                lambda: crawl_sharded(url, count),
+                number=1,
+                repeat=3,
+            )
+    finally:
+        fake.terminate()
+        fake.wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--processes", help="comma separated, e.g. 1,2,4")
+    args = parser.parse_args()
+    main(
+        [int(count) for count in args.processes.split(",")]
+        if args.processes
+        else None
+    )
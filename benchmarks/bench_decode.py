@@ -0,0 +1,55 @@
+"""
+Per-request decoding cost of a catalog and a thread body for every
+decoder / wrapping mode of GenericRequestProvider
+
+    python -m benchmarks.bench_decode
+"""
+import importlib
+
+from benchmarks._runner import bench, section
+from benchmarks.fixtures import make_catalog, make_thread, dumps
+from py_2ch_api.constants import JSON_DECODER
+from py_2ch_api.session import GenericRequestProvider
+
+FIXTURES = {
+    "catalog.json (500 threads)": dumps(make_catalog(threads=500)),
+    "res/N.json (1000 posts)": dumps(make_thread(posts=1000)),
+}
+
+
+def installed(decoder: str) -> bool:
+    if decoder == JSON_DECODER.STDLIB:
+        return True
+
+    try:
+        importlib.import_module(decoder)
+    except ImportError:
+        return False
+
+    return True
+
+
+def main():
+    decoders = [
+        decoder
+        for decoder in (
+            JSON_DECODER.STDLIB,
+            JSON_DECODER.UJSON,
+            JSON_DECODER.ORJSON,
+        )
+        if installed(decoder)
+    ]
+
+    for name, body in FIXTURES.items():
+        section(f"{name}, {len(body) / 1024:.0f} KB")
+
+        for decoder in decoders:
+            for raw in (False, True):
+                provider = GenericRequestProvider(decoder=decoder, raw=raw)
+                mode = "raw" if raw else "addict"
+
+                bench(f"{decoder} + {mode}", lambda: provider._parse(body))
+
+
+if __name__ == "__main__":
+    main()
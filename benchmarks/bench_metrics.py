@@ -0,0 +1,88 @@
+"""
+Per-request overhead of the metrics hooks in GenericRequestProvider,
+with metrics disabled, a no-op sink, an in-process registry and a
+Prometheus sink, plus the cost of rendering the exposition text
+
+The HTTP layer is replaced by a canned response so only the client-side
+work is measured.
+
+    python -m benchmarks.bench_metrics
+"""
+import requests
+
+from benchmarks._runner import bench, section
+from benchmarks.fixtures import make_thread, dumps
+from py_2ch_api.metrics import MetricsSink, MetricsRegistry, PrometheusSink
+from py_2ch_api.session import GenericRequestProvider
+
+BODY = dumps(make_thread(posts=1))
+
+
+class CannedSession:
+    """
+    requests.Session stand-in answering every request with the same body
+    """
+
+    def __init__(self, body: bytes):
+        self.response = requests.Response()
+        self.response.status_code = 200
+        self.response._content = body
+        self.response.request = requests.Request(
+            "GET", "https://2ch.hk/b/res/1.json"
+        ).prepare()
+
+    def request(self, method, url, **kwargs):
+        return self.response
+
+    def close(self):
+        pass
+
+
+def provider(metrics=None) -> GenericRequestProvider:
+    provider = GenericRequestProvider(raw=True, metrics=metrics)
+    provider._session = CannedSession(BODY)
+
+    return provider
+
+
+def main():
+    sinks = {
+        "disabled (metrics=None)": None,
+        "no-op MetricsSink": MetricsSink(),
+        "MetricsRegistry": MetricsRegistry(),
+        "PrometheusSink": PrometheusSink(),
+    }
+
+    section(f"GET /b/res/1.json, {len(BODY)} B body")
+
+    baseline = None
+
+    for name, sink in sinks.items():
+        client = provider(sink)
+        best = bench(name, lambda: client.get("/b/res/1.json"))
+
+        if baseline is None:
+            baseline = best
+        else:
+            print(f"{'':<48} {(best / baseline - 1) * 100:>+9.1f} %")
+
+    # everything the hooks add to a request while disabled
+    metrics = None
+    checks = bench(
+        "disabled hooks alone (4 checks)",
+        lambda: (
+            metrics is not None,
+            metrics is not None,
+            metrics is not None,
+            metrics is not None,
+        ),
+    )
+    print(f"{'':<48} {checks / baseline * 100:>+9.3f} %")
+
+    section("exposition")
+    sink = sinks["PrometheusSink"]
+    bench("PrometheusSink.render", sink.render)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Model construction: slotted models from raw dicts vs the old
+addict-backed models, and lazy views vs slotted models
+
+    python -m benchmarks.bench_models
+"""
+from addict import Dict
+
+from benchmarks._runner import bench, peak_memory, section
+from benchmarks.fixtures import make_thread, make_catalog
+from py_2ch_api.models import Post, Thread, PostView, ThreadView
+
+POSTS = 100000
+
+
+class LegacyFile:
+    def __init__(self, file):
+        self.displayname = file.displayname
+        self.fullname = file.fullname
+        self.height = file.height
+        self.md5 = file.md5
+        self.name = file.name
+        self.nsfw = file.nsfw
+        self.path = file.path
+        self.size = file.size
+        self.thumbnail = file.thumbnail
+        self.tn_height = file.tn_height
+        self.tn_width = file.tn_width
+        self.type = file.type
+        self.width = file.width
+        self.duration = file.duration if file.duration else None
+        self.duration_secs = file.duration_secs if file.duration_secs else None
+
+
+class LegacyPost:
+    def __init__(self, post):
+        self.banned = post.banned
+        self.closed = post.closed
+        self.comment = post.comment
+        self.date = post.date
+        self.email = post.email
+        self.endless = post.endless
+        self.files = [LegacyFile(Dict(file)) for file in post.files]
+        self.lasthit = post.lasthit
+        self.name = post.name
+        self.num = post.num
+        self.number = post.number
+        self.op = post.op
+        self.parent = post.parent
+        self.sticky = post.sticky
+        self.subject = post.subject
+        self.tags = post.tags
+        self.timestamp = post.timestamp
+        self.trip = post.trip
+
+
+class LegacyThread:
+    def __init__(self, thread_data):
+        self.comment = thread_data.comment
+        self.lasthit = thread_data.lasthit
+        self.num = thread_data.num
+        self.posts_count = thread_data.posts_count
+        self.score = thread_data.score
+        self.subject = thread_data.subject
+        self.timestamp = thread_data.timestamp
+        self.views = thread_data.views
+        self.opening_post = LegacyPost(thread_data)
+
+
+def main():
+    raw_posts = make_thread(posts=POSTS)["threads"][0]["posts"]
+    raw_threads = make_catalog(threads=500)["threads"]
+
+    section(f"{POSTS} posts")
+    legacy = bench(
+        "legacy: addict wrap + Post",
+        lambda: [LegacyPost(post) for post in Dict(posts=raw_posts).posts],
+        number=1,
+        repeat=3,
+    )
+    slotted = bench(
+        "slotted: Post from raw dict",
+        lambda: [Post(post) for post in raw_posts],
+        number=1,
+        repeat=3,
+    )
+    print(f"{'speedup':<48} {legacy / slotted:>10.2f} x")
+
+    legacy = peak_memory(
+        "legacy: peak memory",
+        lambda: [LegacyPost(post) for post in Dict(posts=raw_posts).posts],
+    )
+    slotted = peak_memory(
+        "slotted: peak memory", lambda: [Post(post) for post in raw_posts]
+    )
+    print(f"{'memory ratio':<48} {legacy / slotted:>10.2f} x")
+
+    section(f"{len(raw_threads)} catalog threads")
+    bench(
+        "legacy: addict wrap + Thread",
+        lambda: [
+            LegacyThread(thread)
+            for thread in Dict(threads=raw_threads).threads
+        ],
+    )
+    bench(
+        "slotted: Thread from raw dict",
+        lambda: [Thread(thread) for thread in raw_threads],
+    )
+    bench(
+        "lazy: ThreadView from raw dict",
+        lambda: [ThreadView(thread) for thread in raw_threads],
+    )
+
+    section(f"{POSTS} posts, reading num, timestamp and comment")
+    bench(
+        "slotted: Post",
+        lambda: [
+            (post.num, post.timestamp, post.comment)
+            for post in [Post(post) for post in raw_posts]
+        ],
+        number=1,
+        repeat=3,
+    )
+    bench(
+        "lazy: PostView",
+        lambda: [
+            (post.num, post.timestamp, post.comment)
+            for post in [PostView(post) for post in raw_posts]
+        ],
+        number=1,
+        repeat=3,
+    )
+
+
+if __name__ == "__main__":
+    main()
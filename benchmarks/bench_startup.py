@@ -0,0 +1,70 @@
+"""
+Import and construction cost of the client, for jobs that create many
+short-lived clients
+
+    python -m benchmarks.bench_startup
+
+Imports are timed in fresh interpreters, so nothing is already in
+sys.modules; the interpreter's own startup is excluded.
+"""
+import subprocess
+import sys
+
+from benchmarks._runner import bench, record, section
+from benchmarks.fake_makaba import FakeMakaba
+from py_2ch_api.client import ChAPI, _shared_boards
+from py_2ch_api.logger import Logger
+
+IMPORTS = ("py_2ch_api.client", "py_2ch_api.async_client")
+RUNS = 5
+
+TIMED_IMPORT = """
+import time
+start = time.perf_counter()
+import {module}
+print((time.perf_counter() - start) * 1000)
+"""
+
+
+def import_time(module: str) -> float:
+    """
+    Best import time of `module` in milliseconds over RUNS interpreters
+    """
+    return min(
+        float(
+            subprocess.run(
+                [sys.executable, "-c", TIMED_IMPORT.format(module=module)],
+                stdout=subprocess.PIPE,
+                check=True,
+                universal_newlines=True,
+            ).stdout
+        )
+        for _ in range(RUNS)
+    )
+
+
+def first_client(url: str) -> ChAPI:
+    # drop the boards an earlier client of this process loaded
+    _shared_boards.clear()
+
+    return ChAPI(base_url=url, boards_cache_dir=None)
+
+
+def main():
+    section("import, fresh interpreter")
+
+    for module in IMPORTS:
+        record(f"import {module}", import_time(module))
+
+    with FakeMakaba() as fake:
+        section("construction")
+        bench("Logger", lambda: Logger("py-2ch-api", logger_level="INFO"))
+        bench("first ChAPI, fetches boards", lambda: first_client(fake.url))
+        bench(
+            "next ChAPI, boards loaded",
+            lambda: ChAPI(base_url=fake.url, boards_cache_dir=None),
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+send_post with large attachments against benchmarks.fake_makaba: time
+and peak Python memory of the streamed multipart body compared with
+reading the files into memory like the old Message did
+
+    python -m benchmarks.bench_upload
+"""
+import os
+import shutil
+import tempfile
+
+import requests
+
+from benchmarks._runner import bench, peak_memory, section
+from benchmarks.fake_makaba import FakeMakaba
+from py_2ch_api.client import ChAPI
+from py_2ch_api.models import Message
+
+FILES = 8
+FILE_SIZE = 60 * 1024 * 1024
+
+
+def make_files(directory: str):
+    paths = []
+
+    for i in range(FILES):
+        path = os.path.join(directory, f"{i}.webm")
+
+        with open(path, "wb") as out_file:
+            # sparse, so the benchmark doesn't need the disk space
+            out_file.truncate(FILE_SIZE)
+
+        paths.append(path)
+
+    return paths
+
+
+def read_into_memory(url: str, message: Message):
+    files = [
+        ("formimages[]", (os.path.basename(path), open(path, "rb").read()))
+        for path in message.files
+    ]
+
+    return requests.post(url, data=dict(message.payload), files=files).json()
+
+
+def main():
+    directory = tempfile.mkdtemp(prefix="py-2ch-upload-")
+
+    try:
+        with FakeMakaba() as fake:
+            api = ChAPI(base_url=fake.url, boards_cache_dir=None)
+            message = Message("b", 0, "бенчмарк", files=make_files(directory))
+
+            # 8 x 60 MB is over the POST_LIMITS total, the benchmark
+            # measures the upload, not validation
+            section(f"{FILES} x {FILE_SIZE // 1024 // 1024} MB attachments")
+            bench(
+                "send_post, mmap streamed body",
+                lambda: api.send_post(message, validate=False),
+                number=1,
+                repeat=3,
+            )
+            peak_memory(
+                "send_post, peak memory",
+                lambda: api.send_post(message, validate=False),
+            )
+            url = f"{fake.url}/makaba/posting.fcgi"
+            bench(
+                "requests files=, read() into memory",
+                lambda: read_into_memory(url, message),
+                number=1,
+                repeat=3,
+            )
+            peak_memory(
+                "requests files=, peak memory",
+                lambda: read_into_memory(url, message),
+            )
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
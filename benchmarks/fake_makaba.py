@@ -0,0 +1,316 @@
+"""
+Local stand-in for 2ch.hk serving synthetic or recorded responses
+
+    python -m benchmarks.fake_makaba --port 8000 --latency 0.05
+
+Serves get_boards, userboards.json, catalog.json, res/N.json, the
+incremental mobile.fcgi get_thread, media (with Range support), accepts
+any passcode on makaba.fcgi and posts on posting.fcgi.
+JSON responses carry an ETag and answer If-None-Match with 304, like
+the real server. Files found under `recorded` (same paths as on 2ch.hk,
+see benchmarks.record) are served instead of the synthetic payloads.
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from benchmarks.fixtures import (
+    MEDIA_SIZE,
+    dumps,
+    make_board,
+    make_catalog,
+    make_thread,
+    media_body,
+)
+
+THREAD_RE = re.compile(r"^/(\w+)/res/(\d+)\.json$")
+CATALOG_RE = re.compile(r"^/(\w+)/catalog\.json$")
+MEDIA_RE = re.compile(r"^/(\w+)/(src|thumb)/")
+RANGE_RE = re.compile(r"^bytes=(\d+)-$")
+# answer of the passcode auth, whatever the passcode
+PASSCODE_HASH = "fake-passcode-hash"
+
+
+class FakeMakaba:
+    def __init__(
+        self,
+        boards=("b",),
+        threads: int = 200,
+        posts: int = 500,
+        media_size: int = MEDIA_SIZE,
+        latency: float = 0.0,
+        recorded: str = None,
+        missing=(),
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        """
+        threads: threads per catalog
+        posts: posts per thread
+        media_size: size in bytes of every media file, the md5 in the
+            posts matches what is served
+        latency: seconds to wait before answering each request
+        recorded: directory of recorded responses
+        missing: thread nums answered with 404, like deleted threads
+        """
+        self.boards = list(boards)
+        self.threads = threads
+        self.posts = posts
+        self.media_size = media_size
+        self.latency = latency
+        self.recorded = recorded
+        self.missing = set(missing)
+        self.hits = {}
+        self.posted = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeMakaba":
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, daemon=True
+        )
+        self._thread.start()
+
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def _count(self, path: str):
+        with self._lock:
+            self.hits[path] = self.hits.get(path, 0) + 1
+
+    def _recorded(self, path: str):
+        if not self.recorded:
+            return None
+
+        file_path = os.path.join(self.recorded, path.lstrip("/"))
+
+        if path.startswith("/makaba/"):
+            file_path = os.path.join(
+                self.recorded, "makaba", f"{path.split('task=')[-1]}.json"
+            )
+
+        try:
+            with open(file_path, "rb") as recorded_file:
+                return recorded_file.read()
+        except OSError:
+            return None
+
+    def boards_body(self) -> bytes:
+        return self._recorded("/makaba/mobile.fcgi?task=get_boards") or dumps(
+            {"Разное": [make_board(board) for board in self.boards]}
+        )
+
+    @lru_cache(maxsize=None)
+    def catalog_body(self, board: str) -> bytes:
+        return self._recorded(f"/{board}/catalog.json") or dumps(
+            make_catalog(
+                board, threads=self.threads, media_size=self.media_size
+            )
+        )
+
+    @lru_cache(maxsize=256)
+    def thread_body(self, board: str, num: int) -> bytes:
+        return self._recorded(f"/{board}/res/{num}.json") or dumps(
+            make_thread(
+                board, num, posts=self.posts, media_size=self.media_size
+            )
+        )
+
+    @lru_cache(maxsize=256)
+    def thread_posts(self, board: str, num: int) -> list:
+        return json.loads(self.thread_body(board, num))["threads"][0]["posts"]
+
+    def media_body(self, path: str) -> bytes:
+        return media_body(path, self.media_size)
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def send_body(self, body: bytes, status=200, headers=None):
+                self.send_response(status)
+
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def send_json(self, body: bytes):
+                etag = '"%s"' % hashlib.md5(body).hexdigest()
+
+                if self.headers.get("If-None-Match") == etag:
+                    return self.send_body(b"", 304, {"ETag": etag})
+
+                self.send_body(
+                    body,
+                    headers={"Content-Type": "application/json", "ETag": etag},
+                )
+
+            def send_media(self, path: str):
+                body = fake.media_body(path)
+                match = RANGE_RE.match(self.headers.get("Range", ""))
+
+                if not match:
+                    return self.send_body(body)
+
+                start = int(match.group(1))
+
+                if start >= len(body):
+                    return self.send_body(b"", 416)
+
+                content_range = f"bytes {start}-{len(body) - 1}/{len(body)}"
+                self.send_body(
+                    body[start:], 206, {"Content-Range": content_range}
+                )
+
+            def send_incremental(self, query):
+                posts = fake.thread_posts(
+                    query["board"][0], int(query["thread"][0])
+                )
+                start = int(query.get("post", ["1"])[0])
+
+                self.send_json(dumps(posts[max(start - 1, 0) :]))
+
+            def do_GET(self):
+                url = urlsplit(self.path)
+                path = url.path
+                fake._count(path)
+
+                if fake.latency:
+                    time.sleep(fake.latency)
+
+                if path == "/makaba/mobile.fcgi":
+                    query = parse_qs(url.query)
+                    task = query.get("task", [""])[0]
+
+                    if task == "get_boards":
+                        return self.send_json(fake.boards_body())
+                    if task == "get_thread":
+                        return self.send_incremental(query)
+
+                if path == "/makaba/makaba.fcgi":
+                    # auth_passcode sends its form in a GET body
+                    self.drain_body()
+
+                    return self.send_json(dumps({"hash": PASSCODE_HASH}))
+
+                if path == "/userboards.json":
+                    return self.send_json(
+                        fake._recorded(path) or dumps({"is_index": 0})
+                    )
+
+                match = CATALOG_RE.match(path)
+
+                if match and match.group(1) in fake.boards:
+                    return self.send_json(fake.catalog_body(match.group(1)))
+
+                match = THREAD_RE.match(path)
+
+                if (
+                    match
+                    and match.group(1) in fake.boards
+                    and int(match.group(2)) not in fake.missing
+                ):
+                    return self.send_json(
+                        fake.thread_body(match.group(1), int(match.group(2)))
+                    )
+
+                if MEDIA_RE.match(path):
+                    return self.send_media(path)
+
+                self.send_body(dumps({"error": 404}), 404)
+
+            def drain_body(self) -> int:
+                length = int(self.headers.get("Content-Length") or 0)
+                received = 0
+
+                # in chunks, uploads can be large
+                while received < length:
+                    chunk = self.rfile.read(min(1 << 20, length - received))
+
+                    if not chunk:
+                        break
+
+                    received += len(chunk)
+
+                return received
+
+            def do_POST(self):
+                path = urlsplit(self.path).path
+                fake._count(path)
+                received = self.drain_body()
+
+                if fake.latency:
+                    time.sleep(fake.latency)
+
+                if path != "/makaba/posting.fcgi":
+                    return self.send_body(dumps({"error": 404}), 404)
+
+                with fake._lock:
+                    fake.posted.append(received)
+                    num = len(fake.posted)
+
+                self.send_json(
+                    dumps({"Error": None, "Status": "OK", "Num": num})
+                )
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--boards", default="b", help="comma separated")
+    parser.add_argument("--threads", type=int, default=200)
+    parser.add_argument("--posts", type=int, default=500)
+    parser.add_argument("--media-size", type=int, default=MEDIA_SIZE)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--recorded", default=None)
+    args = parser.parse_args()
+
+    fake = FakeMakaba(
+        boards=args.boards.split(","),
+        threads=args.threads,
+        posts=args.posts,
+        media_size=args.media_size,
+        latency=args.latency,
+        recorded=args.recorded,
+        port=args.port,
+    )
+    print(f"serving on {fake.url}")
+    fake._server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+"""
+Makaba-shaped catalog and thread payloads for benchmarks
+
+The data is synthetic but follows the field set and value shapes of the
+real 2ch.hk responses, so model construction and decoding costs match.
+"""
+import hashlib
+import json
+import random
+from functools import lru_cache
+
+BASE_TIMESTAMP = 1600000000
+# size in bytes of every synthetic media file
+MEDIA_SIZE = 1 << 16
+
+COMMENT_PARTS = [
+    "Двач, помоги",
+    '<a href="/b/res/{thread}.html#{reply}" class="post-reply-link" '
+    'data-thread="{thread}" data-num="{reply}">&gt;&gt;{reply}</a>',
+    '<span class="unkfunc">&gt;greentext строка</span>',
+    "<br>",
+    '<a href="https://example.com/{num}" target="_blank" '
+    'rel="nofollow noopener noreferrer">https://example.com/{num}</a>',
+    "<strong>жирный</strong> текст",
+    "обычный текст поста, достаточно длинный для реалистичного размера",
+]
+
+FILE_TYPES = [(1, "jpg"), (2, "png"), (4, "gif"), (6, "webm"), (10, "mp4")]
+
+
+@lru_cache(maxsize=8)
+def _media_prefix(size: int):
+    """
+    Bytes shared by every media file of this size and their md5 state
+    """
+    prefix = (bytes(range(256)) * (size // 256 + 1))[: max(size - 16, 0)]
+
+    return prefix, hashlib.md5(prefix)
+
+
+def media_body(path: str, size: int = MEDIA_SIZE) -> bytes:
+    """
+    Body of the media file at `path`, the last 16 bytes depend on the path
+    so every file has its own md5
+    """
+    prefix, _ = _media_prefix(size)
+
+    return prefix + hashlib.md5(path.encode("utf-8")).digest()[:size]
+
+
+def media_md5(path: str, size: int = MEDIA_SIZE) -> str:
+    # continues the hash of the shared prefix, files are never hashed
+    # whole
+    _, prefix_md5 = _media_prefix(size)
+    md5 = prefix_md5.copy()
+    md5.update(hashlib.md5(path.encode("utf-8")).digest()[:size])
+
+    return md5.hexdigest()
+
+
+def make_file(
+    rnd: random.Random,
+    board: str,
+    thread: int,
+    index: int,
+    media_size: int = MEDIA_SIZE,
+):
+    file_type, ext = rnd.choice(FILE_TYPES)
+    name = f"{BASE_TIMESTAMP + index}{rnd.randint(1000, 9999)}.{ext}"
+    path = f"/{board}/src/{thread}/{name}"
+    video = file_type in (6, 10)
+
+    return {
+        "displayname": f"file{index}.{ext}",
+        "fullname": f"file{index}.{ext}",
+        "height": rnd.randint(200, 1080),
+        "md5": media_md5(path, media_size),
+        "name": name,
+        "nsfw": 0,
+        "path": path,
+        "size": rnd.randint(10, 20000),
+        "thumbnail": f"/{board}/thumb/{thread}/{name.split('.')[0]}s.jpg",
+        "tn_height": 220,
+        "tn_width": 220,
+        "type": file_type,
+        "width": rnd.randint(200, 1920),
+        "duration": "00:00:15" if video else None,
+        "duration_secs": 15 if video else None,
+    }
+
+
+def make_post(
+    rnd: random.Random,
+    board: str,
+    thread: int,
+    num: int,
+    number: int,
+    media_size: int = MEDIA_SIZE,
+):
+    comment = "".join(
+        rnd.choice(COMMENT_PARTS).format(
+            thread=thread, reply=max(thread, num - rnd.randint(1, 20)), num=num
+        )
+        for _ in range(rnd.randint(1, 6))
+    )
+    files = [
+        make_file(rnd, board, thread, num * 10 + i, media_size)
+        for i in range(rnd.choice((0, 0, 0, 1, 1, 2, 4)))
+    ]
+
+    return {
+        "banned": 0,
+        "closed": 0,
+        "comment": comment,
+        "date": "13/09/20 Вск 15:26:40",
+        "email": "",
+        "endless": 0,
+        "files": files,
+        "lasthit": BASE_TIMESTAMP + num,
+        "name": "Аноним",
+        "num": num,
+        "number": number,
+        "op": 1 if number == 1 else 0,
+        "parent": 0 if number == 1 else thread,
+        "sticky": 0,
+        "subject": f"Тред номер {thread} про всякое",
+        "tags": rnd.choice(("", "", "tag", "webm")),
+        "timestamp": BASE_TIMESTAMP + num,
+        "trip": "",
+    }
+
+
+def make_thread(
+    board: str = "b",
+    num: int = 1000,
+    posts: int = 500,
+    media_size: int = MEDIA_SIZE,
+):
+    rnd = random.Random(num)
+
+    return {
+        "threads": [
+            {
+                "posts": [
+                    make_post(rnd, board, num, num + i, i + 1, media_size)
+                    for i in range(posts)
+                ]
+            }
+        ]
+    }
+
+
+def make_catalog(
+    board: str = "b", threads: int = 200, media_size: int = MEDIA_SIZE
+):
+    rnd = random.Random(threads)
+    result = []
+
+    for i in range(threads):
+        num = 1000 + i * 1000
+        raw_thread = make_post(rnd, board, num, num, 1, media_size)
+        raw_thread.update(
+            {
+                "posts_count": rnd.randint(1, 1500),
+                "files_count": rnd.randint(0, 300),
+                "score": rnd.random() * 100,
+                "views": rnd.randint(10, 100000),
+            }
+        )
+        result.append(raw_thread)
+
+    return {"board": board, "threads": result}
+
+
+def make_board(board: str = "b", speed: int = 100):
+    return {
+        "bump_limit": 500,
+        "category": "Разное",
+        "default_name": "Аноним",
+        "enable_names": 0,
+        "enable_sage": 1,
+        "id": board,
+        "info": "",
+        "last_num": 1000000,
+        "name": board,
+        "speed": speed,
+        "threads": 200,
+        "unique_posters": 1000,
+        "enable_dices": 0,
+        "enable_flags": 0,
+        "enable_icons": 0,
+        "enable_likes": 0,
+        "enable_oekaki": 0,
+        "enable_posting": 1,
+        "enable_shield": 0,
+        "enable_subject": 1,
+        "enable_thread_tags": 0,
+        "enable_trips": 0,
+        "icons": [],
+        "pages": 10,
+    }
+
+
+def dumps(data) -> bytes:
+    return json.dumps(data, ensure_ascii=False).encode("utf-8")
@@ -0,0 +1,73 @@
+"""
+Record real makaba responses for benchmarks.fake_makaba
+
+    python -m benchmarks.record recorded/ --board b --threads 5
+
+Saves get_boards, userboards.json, the board catalog and its first
+`threads` threads under the same paths fake_makaba serves them from.
+"""
+import argparse
+import json
+import os
+
+import requests
+
+from py_2ch_api.constants import USER_AGENT
+
+
+def save(session: requests.Session, url: str, path: str) -> bytes:
+    r = session.get(url, timeout=30)
+    r.raise_for_status()
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    with open(path, "wb") as out_file:
+        out_file.write(r.content)
+
+    print(f"{url} -> {path} ({len(r.content)} B)")
+
+    return r.content
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("out_dir")
+    parser.add_argument("--base-url", default="https://2ch.hk")
+    parser.add_argument("--board", default="b")
+    parser.add_argument("--threads", type=int, default=5)
+    args = parser.parse_args()
+
+    session = requests.Session()
+    session.headers["User-agent"] = USER_AGENT
+    base_url = args.base_url.rstrip("/")
+
+    save(
+        session,
+        f"{base_url}/makaba/mobile.fcgi?task=get_boards",
+        os.path.join(args.out_dir, "makaba", "get_boards.json"),
+    )
+    save(
+        session,
+        f"{base_url}/userboards.json",
+        os.path.join(args.out_dir, "userboards.json"),
+    )
+    catalog = json.loads(
+        save(
+            session,
+            f"{base_url}/{args.board}/catalog.json",
+            os.path.join(args.out_dir, args.board, "catalog.json"),
+        )
+    )
+
+    for thread in catalog["threads"][: args.threads]:
+        save(
+            session,
+            f"{base_url}/{args.board}/res/{thread['num']}.json",
+            os.path.join(
+                args.out_dir, args.board, "res", f"{thread['num']}.json"
+            ),
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,314 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from py_2ch_api.bulk import BulkResult
+from py_2ch_api.models import Board, Thread, Post, File
+
+# columns of every table, the model fields plus the keys tying rows together
+_BOARD_COLUMNS = tuple(Board.__slots__)
+_THREAD_COLUMNS = (
+    ("board",)
+    + tuple(field for field in Thread.__slots__ if field != "opening_post")
+    + ("tags",)
+)
+_POST_COLUMNS = ("board", "thread") + tuple(
+    field for field in Post.__slots__ if field != "files"
+)
+_FILE_COLUMNS = ("board", "post") + tuple(File.__slots__)
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS boards ({}, archived REAL, "
+    "PRIMARY KEY (board_id))".format(", ".join(_BOARD_COLUMNS)),
+    "CREATE TABLE IF NOT EXISTS threads ({}, archived REAL, "
+    "PRIMARY KEY (board, num))".format(", ".join(_THREAD_COLUMNS)),
+    "CREATE TABLE IF NOT EXISTS posts ({}, archived REAL, "
+    "PRIMARY KEY (board, num))".format(", ".join(_POST_COLUMNS)),
+    "CREATE TABLE IF NOT EXISTS files ({}, archived REAL, "
+    "PRIMARY KEY (board, post, name))".format(", ".join(_FILE_COLUMNS)),
+    "CREATE INDEX IF NOT EXISTS threads_lasthit ON threads (board, lasthit)",
+    "CREATE INDEX IF NOT EXISTS posts_thread "
+    "ON posts (board, thread, timestamp)",
+    "CREATE INDEX IF NOT EXISTS posts_parent ON posts (board, parent)",
+    "CREATE INDEX IF NOT EXISTS posts_timestamp ON posts (timestamp)",
+    "CREATE INDEX IF NOT EXISTS files_md5 ON files (md5)",
+)
+
+
+def _value(value):
+    # icons, flags and the like have no column type of their own
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, ensure_ascii=False)
+
+    return value
+
+
+def _insert(table: str, columns: Tuple[str, ...]) -> str:
+    return "INSERT OR REPLACE INTO {} ({}, archived) VALUES ({}, ?)".format(
+        table, ", ".join(columns), ", ".join("?" * len(columns))
+    )
+
+
+def _thread_num(post) -> int:
+    parent = int(post.parent or 0)
+
+    return parent or post.num
+
+
+class Archive:
+    def __init__(self, path: str, batch_size: int = 5000):
+        """
+        SQLite archive of boards, threads, posts and files
+
+        Records are buffered and written `batch_size` rows per transaction,
+        call flush() or close() (or use the archive as a context manager)
+        to write the rest. The database runs in WAL mode, so readers in
+        other processes aren't blocked by the ingest.
+        """
+        directory = os.path.dirname(path)
+
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        self._pending = {"boards": [], "threads": [], "posts": [], "files": []}
+        self._pending_rows = 0
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+
+        with self._db:
+            for statement in _SCHEMA:
+                self._db.execute(statement)
+
+    def _queue(self, table: str, rows: List[Tuple]):
+        if not rows:
+            return
+
+        with self._lock:
+            self._pending[table].extend(rows)
+            self._pending_rows += len(rows)
+            flush = self._pending_rows >= self.batch_size
+
+        if flush:
+            self.flush()
+
+    def add_boards(self, boards: Iterable[Board]):
+        now = time.time()
+
+        self._queue(
+            "boards",
+            [
+                tuple(
+                    _value(getattr(board, column)) for column in _BOARD_COLUMNS
+                )
+                + (now,)
+                for board in boards
+            ],
+        )
+
+    def add_threads(self, board: str, threads: Iterable[Thread]):
+        """
+        Archive catalog entries, Thread or ThreadView
+        """
+        now = time.time()
+        rows = []
+
+        for thread in threads:
+            values = {"board": board, "tags": thread.opening_post.tags}
+            rows.append(
+                tuple(
+                    _value(
+                        values[column]
+                        if column in values
+                        else getattr(thread, column)
+                    )
+                    for column in _THREAD_COLUMNS
+                )
+                + (now,)
+            )
+
+        self._queue("threads", rows)
+
+    def add_posts(self, board: str, posts: Iterable[Post], thread: int = None):
+        """
+        Archive posts and their files, Post or PostView
+
+        thread: number of the thread the posts belong to, taken from
+            Post.parent if not given
+        """
+        now = time.time()
+        post_rows = []
+        file_rows = []
+
+        for post in posts:
+            values = {"board": board, "thread": thread or _thread_num(post)}
+            post_rows.append(
+                tuple(
+                    _value(
+                        values[column]
+                        if column in values
+                        else getattr(post, column)
+                    )
+                    for column in _POST_COLUMNS
+                )
+                + (now,)
+            )
+
+            for file in post.files or ():
+                file_rows.append(
+                    (board, post.num)
+                    + tuple(
+                        _value(getattr(file, column))
+                        for column in _FILE_COLUMNS[2:]
+                    )
+                    + (now,)
+                )
+
+        self._queue("posts", post_rows)
+        self._queue("files", file_rows)
+
+    def ingest(self, results: Iterable[BulkResult]) -> Iterator[BulkResult]:
+        """
+        Archive results of get_catalogs or get_threads and pass them on
+
+        Failed results are passed on untouched. Whatever is still buffered
+        is written when the input is exhausted.
+        """
+        try:
+            for result in results:
+                if result.ok:
+                    if isinstance(result.key, tuple):
+                        board, num = result.key
+                        self.add_posts(board, result.value, thread=num)
+                    else:
+                        self.add_threads(result.key, result.value)
+
+                yield result
+        finally:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            pending = self._pending
+            self._pending = {table: [] for table in pending}
+            self._pending_rows = 0
+
+            with self._db:
+                for table, columns in (
+                    ("boards", _BOARD_COLUMNS),
+                    ("threads", _THREAD_COLUMNS),
+                    ("posts", _POST_COLUMNS),
+                    ("files", _FILE_COLUMNS),
+                ):
+                    if pending[table]:
+                        self._db.executemany(
+                            _insert(table, columns), pending[table]
+                        )
+
+    def _select(self, query: str, params: Tuple = ()) -> List[Dict]:
+        with self._lock:
+            rows = self._db.execute(query, params).fetchall()
+
+        return [dict(row) for row in rows]
+
+    def _posts(self, rows: List[Dict]) -> List[Post]:
+        if not rows:
+            return []
+
+        files = {}
+
+        # files of a thread are few, fetch them per board in one query
+        for board in {row["board"] for row in rows}:
+            nums = [row["num"] for row in rows if row["board"] == board]
+
+            for start in range(0, len(nums), 500):
+                chunk = nums[start : start + 500]
+                for file in self._select(
+                    "SELECT * FROM files WHERE board = ? AND post IN ({})".format(
+                        ", ".join("?" * len(chunk))
+                    ),
+                    (board, *chunk),
+                ):
+                    files.setdefault((board, file["post"]), []).append(file)
+
+        for row in rows:
+            row["files"] = files.get((row["board"], row["num"]), [])
+
+        return [Post(row) for row in rows]
+
+    def thread(self, board: str, num: int) -> Optional[Thread]:
+        rows = self._select(
+            "SELECT * FROM threads WHERE board = ? AND num = ?", (board, num)
+        )
+
+        return Thread(rows[0]) if rows else None
+
+    def threads(self, board: str, since: int = 0) -> List[Thread]:
+        """
+        Archived threads of a board bumped after `since`, latest first
+        """
+        return [
+            Thread(row)
+            for row in self._select(
+                "SELECT * FROM threads WHERE board = ? AND lasthit > ? "
+                "ORDER BY lasthit DESC",
+                (board, since),
+            )
+        ]
+
+    def posts(self, board: str, thread: int, since: int = 0) -> List[Post]:
+        """
+        Archived posts of a thread posted after `since`, oldest first
+        """
+        return self._posts(
+            self._select(
+                "SELECT * FROM posts WHERE board = ? AND thread = ? "
+                "AND timestamp > ? ORDER BY num",
+                (board, thread, since),
+            )
+        )
+
+    def last_post_num(self, board: str, thread: int) -> Optional[int]:
+        """
+        Number of the last archived post, fetch only what comes after it
+        """
+        rows = self._select(
+            "SELECT MAX(num) AS num FROM posts WHERE board = ? AND thread = ?",
+            (board, thread),
+        )
+
+        return rows[0]["num"]
+
+    def files_by_md5(self, md5: str) -> List[Tuple[str, int, File]]:
+        """
+        Return (board, post num, file) for every archived copy of a file
+        """
+        return [
+            (row["board"], row["post"], File(row))
+            for row in self._select(
+                "SELECT * FROM files WHERE md5 = ?", (md5.lower(),)
+            )
+        ]
+
+    def close(self):
+        self.flush()
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __len__(self):
+        """
+        Number of archived posts
+        """
+        return self._select("SELECT COUNT(*) AS count FROM posts")[0]["count"]
@@ -0,0 +1,352 @@
+import asyncio
+import os
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Tuple
+
+from py_2ch_api.boards_cache import BoardsCache, DEFAULT_CACHE_DIR, DEFAULT_TTL
+from py_2ch_api.bulk import BulkResult
+from py_2ch_api.client import (
+    parse_boards,
+    filter_threads,
+    sort_threads,
+    filter_media,
+)
+from py_2ch_api.constants import (
+    TOP_METHODS,
+    MEDIA_TYPE,
+    FILE_TYPE,
+    JSON_DECODER,
+)
+from py_2ch_api.downloader import DownloadResult
+from py_2ch_api.exceptions import BoardNotFound, PasscodeNotProvidedError
+from py_2ch_api.logger import Logger
+from py_2ch_api.metrics import MetricsSink
+from py_2ch_api.models import (
+    Board,
+    Thread,
+    Post,
+    File,
+    ThreadView,
+    PostView,
+)
+from py_2ch_api.ratelimit import RateLimiter, RetryPolicy
+from py_2ch_api.async_session import AsyncRequestProvider
+from py_2ch_api.watcher import AsyncThreadWatcher
+
+
+class AsyncChAPI(AsyncRequestProvider):
+    def __init__(
+        self,
+        board: str = "b",
+        base_url: str = "https://2ch.hk",
+        passcode: str = None,
+        proxies: Dict = None,
+        concurrency: int = 100,
+        debug: bool = False,
+        boards_cache_dir: Optional[str] = DEFAULT_CACHE_DIR,
+        boards_cache_ttl: int = DEFAULT_TTL,
+        decoder: str = JSON_DECODER.STDLIB,
+        raw: bool = False,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        metrics: Optional[MetricsSink] = None,
+        download_timeout: int = 60,
+    ):
+        """
+        Asyncio version of ChAPI
+
+        Board settings can't be fetched from the constructor, so they are
+        loaded on the first call that needs them.
+        """
+        super().__init__(
+            base_url,
+            proxies,
+            concurrency,
+            decoder=decoder,
+            raw=raw,
+            rate_limiter=rate_limiter,
+            retry_policy=retry_policy,
+            metrics=metrics,
+            download_timeout=download_timeout,
+        )
+
+        self._boards = None
+        self._boards_lock = None
+        self._boards_cache = (
+            BoardsCache(base_url, boards_cache_dir, boards_cache_ttl)
+            if boards_cache_dir
+            else None
+        )
+        self._board_id = board
+        self.passcode = passcode
+        self.passcode_data = None
+        self._logger = Logger(
+            "py-2ch-api", logger_level="DEBUG" if debug else "INFO"
+        )
+
+    async def _fetch_board_settings(self) -> Tuple[Dict, Dict]:
+        all_settings, user_boards = await asyncio.gather(
+            self.get(path="/makaba/mobile.fcgi?task=get_boards"),
+            self.get(path="userboards.json"),
+        )
+
+        return all_settings, user_boards
+
+    async def get_all_board_settings(self) -> Dict[str, Board]:
+        return parse_boards(*await self._fetch_board_settings())
+
+    async def refresh_boards(self) -> Dict[str, Board]:
+        """
+        Re-fetch board settings from the API and update the on-disk cache
+        """
+        all_settings, user_boards = await self._fetch_board_settings()
+
+        if self._boards_cache:
+            self._boards_cache.save(all_settings, user_boards)
+
+        self._boards = parse_boards(all_settings, user_boards)
+
+        return self._boards
+
+    async def _get_boards(self) -> Dict[str, Board]:
+        if self._boards is not None:
+            return self._boards
+
+        # concurrent first calls must not all fetch the registry
+        if self._boards_lock is None:
+            self._boards_lock = asyncio.Lock()
+
+        async with self._boards_lock:
+            if self._boards is None:
+                cached = (
+                    self._boards_cache.load() if self._boards_cache else None
+                )
+
+                if cached:
+                    self._boards = parse_boards(*cached)
+                else:
+                    await self.refresh_boards()
+
+        return self._boards
+
+    async def get_board(self, board: str = None) -> Board:
+        boards = await self._get_boards()
+        board = board or self._board_id
+
+        if board not in boards:
+            raise BoardNotFound(f"Board {board} not found")
+
+        return boards[board]
+
+    async def set_board(self, board: str):
+        await self.get_board(board)
+
+        self._board_id = board
+
+    async def _is_board_exist(self, board: str = None) -> bool:
+        return board in await self._get_boards()
+
+    async def _resolve_board(self, board: str = None) -> str:
+        if not (board and await self._is_board_exist(board)):
+            board = (await self.get_board()).board_id
+
+        return board
+
+    async def auth_passcode(self, passcode: str = None) -> Optional[str]:
+
+        passcode = self.passcode if self.passcode else passcode
+
+        if not passcode:
+            raise PasscodeNotProvidedError("Please provide actual passcode")
+
+        payload = {
+            "task": "auth",
+            "usercode": passcode,
+            "json": 1,
+        }
+
+        response_data = await self.get("/makaba/makaba.fcgi", data=payload)
+
+        self.passcode_data = response_data["hash"]
+
+        return self.passcode_data
+
+    async def get_board_threads(
+        self,
+        board: str = None,
+        tag: str = None,
+        subject: str = None,
+        limit: int = 1,
+        lazy: bool = False,
+    ) -> List[Thread]:
+        """
+        Get all threads from board
+
+        tag: filter by tag
+        subject: filter by subject
+        lazy: return ThreadView objects that read the raw JSON on access
+        """
+        board = await self._resolve_board(board)
+
+        threads_response = (await self.get(f"/{board}/catalog.json"))[
+            "threads"
+        ]
+        model = ThreadView if lazy else Thread
+        threads = [model(thread_data) for thread_data in threads_response]
+
+        return filter_threads(threads, tag=tag, subject=subject, limit=limit)
+
+    async def get_thread(
+        self,
+        thread: Optional[Thread] = None,
+        board: str = None,
+        lazy: bool = False,
+    ) -> List[Post]:
+        if isinstance(thread, (Thread, ThreadView)):
+            thread = thread.num
+
+        board = await self._resolve_board(board)
+
+        posts = (await self.get(f"/{board}/res/{thread}.json"))["threads"]
+        model = PostView if lazy else Post
+
+        return [model(post) for post in posts[0]["posts"]]
+
+    async def _bulk(self, fetch, keys) -> AsyncIterator[BulkResult]:
+        async def call(key):
+            try:
+                return BulkResult(key, await fetch(key))
+            except Exception as e:
+                return BulkResult(key, error=e)
+
+        for result in asyncio.as_completed([call(key) for key in keys]):
+            yield await result
+
+    async def get_catalogs(
+        self, boards: Iterable[str] = None, lazy: bool = False
+    ) -> AsyncIterator[BulkResult]:
+        """
+        Fetch catalogs of many boards concurrently, all boards if none
+        given, yielding BulkResult objects as they complete
+        """
+        existing = await self._get_boards()
+
+        async def fetch(board):
+            if board not in existing:
+                raise BoardNotFound(f"Board {board} not found")
+
+            return await self.get_board_threads(board=board, lazy=lazy)
+
+        async for result in self._bulk(
+            fetch, list(existing) if boards is None else list(boards)
+        ):
+            yield result
+
+    async def get_threads(
+        self, threads: Iterable[Tuple[str, int]], lazy: bool = False
+    ) -> AsyncIterator[BulkResult]:
+        """
+        Fetch many (board, num) threads concurrently
+        """
+        existing = await self._get_boards()
+
+        async def fetch(key):
+            board, num = key
+
+            if board not in existing:
+                raise BoardNotFound(f"Board {board} not found")
+
+            return await self.get_thread(num, board=board, lazy=lazy)
+
+        async for result in self._bulk(fetch, list(threads)):
+            yield result
+
+    async def watch_thread(
+        self,
+        thread: Optional[Thread] = None,
+        board: str = None,
+        interval: float = 10,
+    ) -> AsyncThreadWatcher:
+        board = await self._resolve_board(board)
+
+        return AsyncThreadWatcher(self, thread, board=board, interval=interval)
+
+    async def get_top_threads(
+        self,
+        board: str = None,
+        method: TOP_METHODS = TOP_METHODS.VIEWS,
+        limit: int = 5,
+    ) -> List[Thread]:
+        threads = await self.get_board_threads(board=board)
+
+        return sort_threads(threads, method=method, limit=limit)
+
+    async def get_all_media_from_thread(
+        self,
+        thread: Thread = None,
+        media_type: Optional[MEDIA_TYPE] = MEDIA_TYPE.MP4,
+        board: str = None,
+    ) -> List[File]:
+        posts = await self.get_thread(thread, board=board)
+
+        return filter_media(posts, media_type=media_type)
+
+    async def download_all_media_from_thread(
+        self,
+        thread: Thread = None,
+        out_dir: str = "downloads",
+        media_type: MEDIA_TYPE = MEDIA_TYPE.ALL,
+        board: str = None,
+    ) -> List[DownloadResult]:
+        media = await self.get_all_media_from_thread(
+            thread,
+            media_type=None if media_type == MEDIA_TYPE.ALL else media_type,
+            board=board,
+        )
+
+        return await self._download_files(media, out_dir)
+
+    async def download_all_media_from_post(
+        self,
+        post: Post = None,
+        out_dir: str = "downloads",
+        media_type: MEDIA_TYPE = MEDIA_TYPE.ALL,
+    ) -> List[DownloadResult]:
+        files_to_download = post.files
+
+        if media_type != MEDIA_TYPE.ALL:
+            files_to_download = [
+                file
+                for file in post.files
+                if FILE_TYPE().get(file.type) in media_type
+            ]
+
+        return await self._download_files(files_to_download, out_dir)
+
+    async def _download_files(
+        self, files: List[File], out_dir: str
+    ) -> List[DownloadResult]:
+        if not files:
+            return []
+
+        os.makedirs(out_dir, exist_ok=True)
+
+        return list(
+            await asyncio.gather(
+                *[
+                    self.download_file_from_post(file=file, out_dir=out_dir)
+                    for file in files
+                ]
+            )
+        )
+
+    async def download_file_from_post(
+        self, file: File = None, out_dir: str = "downloads"
+    ) -> DownloadResult:
+        os.makedirs(out_dir, exist_ok=True)
+
+        out_path = os.path.join(out_dir, file.name[:64])
+        url = self.build_url(file.path)
+
+        self._logger.info(f"Downloading: {url}")
+
+        return await self.download(url=url, out_path=out_path)
@@ -0,0 +1,306 @@
+import asyncio
+import os
+import time
+from types import SimpleNamespace
+from typing import Optional, Dict
+from urllib.parse import urljoin, urlsplit
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover - optional dependency
+    aiohttp = None
+
+from py_2ch_api.constants import USER_AGENT, JSON_DECODER
+from py_2ch_api.decoders import get_decoder, parse_json
+from py_2ch_api.downloader import DownloadResult, part_path
+from py_2ch_api.exceptions import RequestError, DownloadError
+from py_2ch_api.metrics import (
+    MetricsSink,
+    record_decode,
+    record_download,
+    record_request,
+    record_retry,
+)
+from py_2ch_api.ratelimit import RateLimiter, RetryPolicy
+from py_2ch_api.session import IDEMPOTENT
+
+
+class AsyncRequestProvider:
+    def __init__(
+        self,
+        base_url: str = "https://2ch.hk",
+        proxies: Dict = None,
+        concurrency: int = 100,
+        timeout: int = 20,
+        decoder: str = JSON_DECODER.STDLIB,
+        raw: bool = False,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        metrics: Optional[MetricsSink] = None,
+        download_timeout: int = 60,
+    ):
+        """
+        Asyncio counterpart of GenericRequestProvider
+
+        All requests share one aiohttp connection pool of `concurrency`
+        connections, and no more than `concurrency` requests are in flight
+        at once, so any number of coroutines can be scheduled safely.
+
+        timeout: total seconds of an API request
+        download_timeout: seconds a download may wait for the connection
+            or the next chunk, downloads have no total limit, like
+            Downloader
+        """
+        if aiohttp is None:
+            raise ImportError(
+                "aiohttp is required for the async client, "
+                "install it with `pip install py-2ch-api[async]`"
+            )
+
+        self._base_url = base_url
+        self._proxies = proxies or {}
+        self._concurrency = concurrency
+        self._timeout = timeout
+        self._download_timeout = download_timeout
+        self._session = None
+        self._semaphore = None
+        self._decode = get_decoder(decoder)
+        self._raw = raw
+        self._rate_limiter = rate_limiter
+        self._retry_policy = retry_policy
+        self._metrics = metrics
+
+    async def __aenter__(self):
+        self._get_session()
+
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    def _get_session(self):
+        # created lazily, because both objects must be bound to a running loop
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self._concurrency, limit_per_host=self._concurrency
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                headers={"User-agent": USER_AGENT},
+                timeout=aiohttp.ClientTimeout(total=self._timeout),
+            )
+            self._semaphore = asyncio.Semaphore(self._concurrency)
+
+        return self._session
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+    def _proxy_for(self, url: str) -> Optional[str]:
+        return self._proxies.get(urlsplit(url).scheme)
+
+    async def _request(
+        self,
+        method: str = None,
+        path: str = None,
+        extra_headers: Optional[Dict] = None,
+        extra_params: Optional[Dict] = None,
+        status_code: int = 200,
+        **kwargs
+    ):
+        url = self.build_url(path)
+        session = self._get_session()
+
+        headers = kwargs.pop("headers", {})
+        headers.update(extra_headers or {})
+
+        params = kwargs.pop("params", {})
+        params.update(extra_params or {})
+
+        retry_policy = self._retry_policy if method in IDEMPOTENT else None
+        attempt = 0
+        metrics = self._metrics
+
+        if metrics is not None:
+            started = time.perf_counter()
+
+        while True:
+            if self._rate_limiter is not None:
+                delay = self._rate_limiter.reserve(url)
+
+                if delay:
+                    await asyncio.sleep(delay)
+
+            try:
+                async with self._semaphore:
+                    async with session.request(
+                        method,
+                        url,
+                        headers=headers,
+                        params=params,
+                        proxy=self._proxy_for(url),
+                        **kwargs
+                    ) as r:
+                        body = await r.read()
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if retry_policy is None or not retry_policy.should_retry(
+                    attempt
+                ):
+                    raise
+
+                if metrics is not None:
+                    record_retry(metrics, url)
+
+                await asyncio.sleep(retry_policy.delay(attempt))
+            else:
+                if retry_policy is None or not retry_policy.should_retry(
+                    attempt, r.status
+                ):
+                    break
+
+                if metrics is not None:
+                    record_retry(metrics, url)
+
+                await asyncio.sleep(retry_policy.delay(attempt, r.headers))
+
+            attempt += 1
+
+        if metrics is not None:
+            record_request(
+                metrics,
+                url,
+                method,
+                r.status,
+                time.perf_counter() - started,
+                len(body),
+                int(r.request_info.headers.get("Content-Length") or 0),
+            )
+
+        if r.status != status_code:
+            raise RequestError(
+                SimpleNamespace(
+                    status_code=r.status,
+                    reason=r.reason,
+                    text=body.decode("utf-8", "replace"),
+                ),
+                status_code,
+            )
+
+        if metrics is not None:
+            started = time.perf_counter()
+
+        try:
+            data = self._decode(body)
+        except ValueError:
+            return body
+
+        if metrics is not None:
+            record_decode(metrics, url, time.perf_counter() - started)
+
+        return data if self._raw else parse_json(data)
+
+    async def download(
+        self,
+        url: str = None,
+        out_path: str = None,
+        chunk_size: int = 1 << 16,
+        overwrite: bool = False,
+    ) -> DownloadResult:
+        """
+        Stream `url` into `out_path`, resuming a partial download
+
+        Same semantics as Downloader.fetch: errors are reported in the
+        result instead of raised.
+        """
+        started = time.monotonic()
+        result = DownloadResult(url, out_path)
+
+        try:
+            if overwrite or not os.path.exists(out_path):
+                await self._stream(url, out_path, chunk_size, result)
+            else:
+                result.skipped = True
+        except (
+            aiohttp.ClientError,
+            asyncio.TimeoutError,
+            OSError,
+            DownloadError,
+        ) as e:
+            result.error = e
+
+        result.duration = time.monotonic() - started
+
+        if self._metrics is not None:
+            record_download(self._metrics, result)
+
+        return result
+
+    async def _stream(
+        self, url: str, out_path: str, chunk_size: int, result: DownloadResult
+    ):
+        tmp_path = part_path(out_path)
+        headers = {}
+
+        try:
+            offset = os.path.getsize(tmp_path)
+        except OSError:
+            offset = 0
+
+        if offset:
+            headers["Range"] = f"bytes={offset}-"
+
+        session = self._get_session()
+        # the session timeout is for API requests, a large file must not
+        # be cut off after its total
+        timeout = aiohttp.ClientTimeout(
+            total=None,
+            sock_connect=self._download_timeout,
+            sock_read=self._download_timeout,
+        )
+
+        async with self._semaphore:
+            async with session.get(
+                url,
+                headers=headers,
+                proxy=self._proxy_for(url),
+                timeout=timeout,
+            ) as r:
+                if r.status == 416 and offset:
+                    os.replace(tmp_path, out_path)
+                    return
+
+                if r.status == 206 and offset:
+                    mode = "ab"
+                    result.resumed = True
+                elif r.status == 200:
+                    mode = "wb"
+                else:
+                    raise DownloadError(
+                        f"Unexpected status code {r.status} for {url}"
+                    )
+
+                with open(tmp_path, mode) as out_file:
+                    async for chunk in r.content.iter_chunked(chunk_size):
+                        out_file.write(chunk)
+                        result.bytes += len(chunk)
+
+        os.replace(tmp_path, out_path)
+
+    def build_url(self, path: str = None) -> str:
+        return urljoin(self._base_url, path.lstrip("/"))
+
+    async def get(self, path, **kwargs):
+        return await self._request("get", path, **kwargs)
+
+    async def post(self, path, **kwargs):
+        return await self._request("post", path, **kwargs)
+
+    async def put(self, path, **kwargs):
+        return await self._request("put", path, **kwargs)
+
+    async def patch(self, path, **kwargs):
+        return await self._request("patch", path, **kwargs)
+
+    async def delete(self, path, **kwargs):
+        return await self._request("delete", path, **kwargs)
@@ -0,0 +1,77 @@
+import json
+import os
+import re
+import tempfile
+import time
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+DEFAULT_CACHE_DIR = os.path.join(
+    os.environ.get("XDG_CACHE_HOME")
+    or os.path.join(os.path.expanduser("~"), ".cache"),
+    "py_2ch_api",
+)
+DEFAULT_TTL = 24 * 60 * 60
+
+
+class BoardsCache:
+    def __init__(
+        self,
+        base_url: str = "https://2ch.hk",
+        cache_dir: str = DEFAULT_CACHE_DIR,
+        ttl: int = DEFAULT_TTL,
+    ):
+        """
+        On-disk cache of the raw board settings responses
+
+        One file per host, so clients pointed at different mirrors don't
+        share a registry.
+        """
+        host = re.sub(r"[^\w.-]", "_", urlsplit(base_url).netloc or base_url)
+
+        self.path = os.path.join(cache_dir, f"boards-{host}.json")
+        self.ttl = ttl
+
+    def load(self) -> Optional[Tuple[Dict, Dict]]:
+        """
+        Return cached (all_settings, user_boards) or None if stale/missing
+        """
+        try:
+            with open(self.path, "r", encoding="utf-8") as cache_file:
+                cached = json.load(cache_file)
+        except (OSError, ValueError):
+            return None
+
+        if time.time() - cached.get("saved_at", 0) > self.ttl:
+            return None
+
+        return cached["all_settings"], cached["user_boards"]
+
+    def save(self, all_settings: Dict, user_boards: Dict):
+        cache_dir = os.path.dirname(self.path)
+
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+
+            # write to a temp file first so concurrent readers never see
+            # a truncated registry
+            fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as cache_file:
+                json.dump(
+                    {
+                        "saved_at": time.time(),
+                        "all_settings": all_settings,
+                        "user_boards": user_boards,
+                    },
+                    cache_file,
+                    ensure_ascii=False,
+                )
+            os.replace(tmp_path, self.path)
+        except OSError:
+            pass
+
+    def clear(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,72 @@
+from concurrent.futures import FIRST_COMPLETED, Executor, wait
+from typing import Any, Callable, Hashable, Iterable, Iterator, Optional
+
+
+class BulkResult:
+    __slots__ = ("key", "value", "error")
+
+    def __init__(
+        self,
+        key: Hashable,
+        value: Any = None,
+        error: Optional[Exception] = None,
+    ):
+        """
+        key: board id or (board, num) the result belongs to
+        error: exception raised for this item, the batch goes on
+        """
+        self.key = key
+        self.value = value
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def __repr__(self):
+        status = "ok" if self.ok else f"error={self.error!r}"
+        return f"<BulkResult: {self.key} {status}>"
+
+
+def _call(func: Callable, key: Hashable) -> BulkResult:
+    try:
+        return BulkResult(key, func(key))
+    except Exception as e:
+        return BulkResult(key, error=e)
+
+
+def run_bulk(
+    func: Callable,
+    keys: Iterable[Hashable],
+    executor: Optional[Executor] = None,
+    window: int = 0,
+) -> Iterator[BulkResult]:
+    """
+    Call `func(key)` for every key and yield results as they complete
+
+    Without an executor the calls run one by one in the calling thread.
+    At most `window` calls are queued at once, so huge key lists don't
+    turn into as many pending futures.
+    """
+    if executor is None:
+        for key in keys:
+            yield _call(func, key)
+        return
+
+    keys = iter(keys)
+    pending = set()
+
+    while True:
+        for key in keys:
+            pending.add(executor.submit(_call, func, key))
+
+            if window and len(pending) >= window:
+                break
+
+        if not pending:
+            return
+
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+
+        for future in done:
+            yield future.result()
@@ -0,0 +1,201 @@
+import heapq
+import time
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import requests
+
+from py_2ch_api.constants import CATALOG_EVENT
+from py_2ch_api.exceptions import RequestError
+from py_2ch_api.models import Thread
+
+
+class CatalogEvent:
+    __slots__ = ("kind", "board", "num", "thread", "previous")
+
+    def __init__(
+        self,
+        kind: str,
+        board: str,
+        num: int,
+        thread: Optional[Thread] = None,
+        previous: Optional[tuple] = None,
+    ):
+        """
+        kind: one of CATALOG_EVENT
+        thread: current thread, None for dropped threads
+        previous: (lasthit, posts_count) seen on the previous poll
+        """
+        self.kind = kind
+        self.board = board
+        self.num = num
+        self.thread = thread
+        self.previous = previous
+
+    def __repr__(self):
+        return f"<CatalogEvent: {self.kind} {self.board}/{self.num}>"
+
+
+class CatalogPoller:
+    def __init__(
+        self,
+        client,
+        boards: Iterable[str] = None,
+        posts_per_poll: float = 20,
+        min_interval: float = 5,
+        max_interval: float = 300,
+        intervals: Dict[str, float] = None,
+        initial_events: bool = True,
+    ):
+        """
+        Poll board catalogs and report what changed since the previous poll
+
+        The poll interval of a board is the time it takes to get about
+        `posts_per_poll` new posts at its `Board.speed` (posts per hour),
+        clamped to [min_interval, max_interval]. `intervals` overrides it
+        per board.
+
+        initial_events: report every thread of the first catalog as created
+        """
+        self.client = client
+        self.boards = list(boards) if boards else [client.board.board_id]
+        self.posts_per_poll = posts_per_poll
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.intervals = intervals or {}
+        self.initial_events = initial_events
+        # board -> (consecutive failed polls, last error)
+        self.errors = {}
+        self._index = {}
+        self._responses = {}
+
+    def interval_for(self, board: str) -> float:
+        if board in self.intervals:
+            return self.intervals[board]
+
+        settings = self.client._boards.get(board)
+        speed = settings.speed if settings else None
+
+        if not speed:
+            return self.max_interval
+
+        interval = self.posts_per_poll / speed * 3600
+
+        return min(max(interval, self.min_interval), self.max_interval)
+
+    def backoff_for(self, board: str, failures: int) -> float:
+        """
+        Interval after `failures` failed polls in a row, doubled each time
+        up to max_interval
+        """
+        interval = max(self.interval_for(board), self.min_interval)
+
+        return min(interval * 2 ** failures, max(self.max_interval, interval))
+
+    def threads(self, board: str) -> Dict[int, tuple]:
+        """
+        Current index of a board: num -> (lasthit, posts_count)
+        """
+        return self._index.get(board, {})
+
+    def poll(self, board: str) -> List[CatalogEvent]:
+        response = self.client.get(f"/{board}/catalog.json")
+
+        if response is self._responses.get(board):
+            # 304 from the response cache
+            return []
+
+        self._responses[board] = response
+
+        first_poll = board not in self._index
+        previous_index = self._index.get(board, {})
+        index = {}
+        events = []
+
+        for raw_thread in response["threads"]:
+            num = raw_thread["num"]
+            current = (raw_thread["lasthit"], raw_thread["posts_count"])
+            index[num] = current
+            previous = previous_index.get(num)
+
+            if previous == current:
+                continue
+
+            if previous is None:
+                if not first_poll or self.initial_events:
+                    events.append(
+                        CatalogEvent(
+                            CATALOG_EVENT.CREATED,
+                            board,
+                            num,
+                            Thread(raw_thread),
+                        )
+                    )
+                continue
+
+            thread = Thread(raw_thread)
+
+            if previous[0] != current[0]:
+                events.append(
+                    CatalogEvent(
+                        CATALOG_EVENT.BUMPED, board, num, thread, previous
+                    )
+                )
+
+            if previous[1] != current[1]:
+                events.append(
+                    CatalogEvent(
+                        CATALOG_EVENT.POSTS_COUNT,
+                        board,
+                        num,
+                        thread,
+                        previous,
+                    )
+                )
+
+        for num in previous_index.keys() - index.keys():
+            events.append(
+                CatalogEvent(
+                    CATALOG_EVENT.DROPPED,
+                    board,
+                    num,
+                    previous=previous_index[num],
+                )
+            )
+
+        self._index[board] = index
+
+        return events
+
+    def stream(self) -> Iterator[CatalogEvent]:
+        """
+        Poll every board on its own interval and yield events forever
+
+        A board whose poll fails is backed off and recorded in `errors`,
+        the other boards keep streaming.
+        """
+        schedule = [(0.0, board) for board in self.boards]
+        heapq.heapify(schedule)
+
+        while True:
+            due, board = heapq.heappop(schedule)
+            delay = due - time.monotonic()
+
+            if delay > 0:
+                time.sleep(delay)
+
+            try:
+                events = self.poll(board)
+            except (RequestError, requests.RequestException) as e:
+                failures = self.errors.get(board, (0, None))[0] + 1
+                self.errors[board] = (failures, e)
+                interval = self.backoff_for(board, failures)
+            else:
+                self.errors.pop(board, None)
+                interval = self.interval_for(board)
+
+                yield from events
+
+            heapq.heappush(schedule, (time.monotonic() + interval, board))
+
+    def __iter__(self):
+        return self.stream()
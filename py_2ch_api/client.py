@@ -1,22 +1,111 @@
 import os
-import sys
+import threading
+import time
+from concurrent.futures import Future
 from concurrent.futures.thread import ThreadPoolExecutor
-from typing import Dict, List, Optional
-
-import wget
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
+from py_2ch_api.boards_cache import BoardsCache, DEFAULT_CACHE_DIR, DEFAULT_TTL
+from py_2ch_api.bulk import BulkResult, run_bulk
+from py_2ch_api.catalog import CatalogPoller
+from py_2ch_api.comments import ReplyGraph
 from py_2ch_api.constants import (
     TOP_METHODS,
     MEDIA_TYPE,
     FILE_TYPE,
+    JSON_DECODER,
+    EXPORT_FORMAT,
+    TASK_PRIORITY,
 )
+from py_2ch_api.crawl import crawl_boards
+from py_2ch_api.downloader import Downloader, DownloadResult
 from py_2ch_api.exceptions import (
     BoardNotFound,
     PasscodeNotProvidedError,
 )
+from py_2ch_api.export import export_board
+from py_2ch_api.http_cache import ResponseCache
 from py_2ch_api.logger import Logger
-from py_2ch_api.models import Board, Thread, Post, File
-from py_2ch_api.session import GenericRequestProvider
+from py_2ch_api.media_filter import MediaFilter, MediaPipeline, ThumbnailCheck
+from py_2ch_api.media_index import MediaIndex
+from py_2ch_api.metrics import MetricsSink
+from py_2ch_api.models import (
+    Board,
+    Thread,
+    Post,
+    File,
+    Message,
+    ThreadView,
+    PostView,
+)
+from py_2ch_api.ranking import RollingTopN, rank_threads
+from py_2ch_api.ratelimit import RateLimiter, RetryPolicy
+from py_2ch_api.scheduler import CrawlScheduler
+from py_2ch_api.search import ThreadIndex
+from py_2ch_api.session import DEFAULT_POOL_SIZE, GenericRequestProvider
+from py_2ch_api.watcher import ThreadWatcher
+
+# parsed board registries shared by the clients of this process, so
+# short-lived clients don't re-read or re-fetch them:
+# base url -> (loaded at, boards)
+_shared_boards = {}
+
+
+def parse_boards(all_settings: Dict, user_boards: Dict) -> Dict[str, Board]:
+    boards = {}
+
+    for key in all_settings.keys():
+        for settings in all_settings[key]:
+            boards[settings["id"]] = Board(settings)
+
+    for key in user_boards.keys():
+        if key != "is_index":
+            for settings in user_boards[key]:
+                boards[settings["id"]] = Board(settings)
+
+    return boards
+
+
+def filter_threads(
+    threads: List[Thread],
+    tag: str = None,
+    subject: str = None,
+    limit: int = 1,
+) -> List[Thread]:
+    if tag:
+        filtered_results = list(
+            filter(
+                lambda thread: tag in (thread.opening_post.tags or ""),
+                threads,
+            )
+        )
+        return filtered_results[:limit]
+
+    if subject:
+        subject = subject.lower()
+        filtered_results = list(
+            filter(
+                lambda thread: subject in (thread.subject or "").lower(),
+                threads,
+            )
+        )
+        return filtered_results[:limit]
+
+    return threads
+
+
+def sort_threads(
+    threads: List[Thread],
+    method: TOP_METHODS = TOP_METHODS.VIEWS,
+    limit: int = 5,
+) -> List[Thread]:
+    return rank_threads(threads, method=method, limit=limit)
+
+
+def filter_media(
+    posts: List[Post], media_type: Optional[MEDIA_TYPE] = MEDIA_TYPE.MP4
+) -> List[File]:
+    return MediaFilter(media_type=media_type).select(posts)
 
 
 class ChAPI(GenericRequestProvider):
@@ -29,36 +118,132 @@ class ChAPI(GenericRequestProvider):
         use_threads: bool = False,
         workers: int = 10,
         debug: bool = False,
+        boards_cache_dir: Optional[str] = DEFAULT_CACHE_DIR,
+        boards_cache_ttl: int = DEFAULT_TTL,
+        cache: Optional[ResponseCache] = None,
+        decoder: str = JSON_DECODER.STDLIB,
+        raw: bool = False,
+        media_index: Optional[MediaIndex] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        metrics: Optional[MetricsSink] = None,
+        scheduler: Optional[CrawlScheduler] = None,
     ):
-        super().__init__(base_url, proxies)
+        """
+        boards_cache_dir: where board settings are cached between runs,
+            None disables the on-disk cache
+        boards_cache_ttl: cache lifetime in seconds
+        cache: conditional GET cache for catalog and thread responses
+        decoder: JSON decoder, one of JSON_DECODER
+        raw: skip addict wrapping of responses, models are built from
+            plain dicts either way
+        media_index: md5 index of already downloaded media, files found
+            there are hardlinked instead of downloaded again
+        rate_limiter: client-side throttling, shared by API requests and
+            downloads, including the threaded ones
+        retry_policy: backoff and retries for API requests and downloads
+        metrics: sink for request and download metrics, e.g.
+            MetricsRegistry or PrometheusSink
+        scheduler: crawl scheduler for `schedule_*`, a thread pool of
+            `workers` is created on first use if not given. It must run
+            tasks in threads, the client's methods can't be pickled into
+            a process pool. A scheduler passed in is not shut down with
+            the client. Connection pools are sized for its workers too
+        """
+        if scheduler is not None and scheduler.processes:
+            raise ValueError(
+                "ChAPI needs a thread-based CrawlScheduler, bound methods "
+                "can't be sent to worker processes"
+            )
+        scheduler_workers = (
+            scheduler.workers if scheduler is not None else workers
+        )
+
+        super().__init__(
+            base_url,
+            proxies,
+            cache,
+            decoder,
+            raw,
+            rate_limiter,
+            retry_policy,
+            metrics,
+            # one keep-alive connection per thread that can use the
+            # session at once: the executor and the scheduler make API
+            # calls, media also comes from the downloader's pool
+            pool_size=max(workers + scheduler_workers, DEFAULT_POOL_SIZE),
+            media_pool_size=max(
+                2 * workers + scheduler_workers, DEFAULT_POOL_SIZE
+            ),
+        )
 
-        self._boards = self.get_all_board_settings()
+        self.__boards = None
+        self._boards_cache_ttl = boards_cache_ttl
+        self._boards_cache = (
+            BoardsCache(base_url, boards_cache_dir, boards_cache_ttl)
+            if boards_cache_dir
+            else None
+        )
 
         self.board = board
         self.use_threads = use_threads
         self.workers = workers
+        self.media_index = media_index
+        self._downloader = None
+        self._executor = None
+        self._scheduler = scheduler
+        self._owns_scheduler = False
+        self._lazy_lock = threading.Lock()
         self.passcode = passcode
         self.passcode_data = None
         self._logger = Logger(
             "py-2ch-api", logger_level="DEBUG" if debug else "INFO"
         )
 
-    def get_all_board_settings(self) -> Dict[str, Board]:
-        boards = {}
-
+    def _fetch_board_settings(self) -> Tuple[Dict, Dict]:
         all_settings = self.get(path="/makaba/mobile.fcgi?task=get_boards")
         user_boards = self.get(path="userboards.json")
 
-        for key in all_settings.keys():
-            for settings in all_settings[key]:
-                boards[settings["id"]] = Board(settings)
+        return all_settings, user_boards
+
+    def get_all_board_settings(self) -> Dict[str, Board]:
+        return parse_boards(*self._fetch_board_settings())
+
+    def refresh_boards(self) -> Dict[str, Board]:
+        """
+        Re-fetch board settings from the API and update the on-disk cache
+        """
+        all_settings, user_boards = self._fetch_board_settings()
+
+        if self._boards_cache:
+            self._boards_cache.save(all_settings, user_boards)
 
-        for key in user_boards.keys():
-            if key != "is_index":
-                for settings in user_boards[key]:
-                    boards[settings["id"]] = Board(settings)
+        self.__boards = parse_boards(all_settings, user_boards)
+        _shared_boards[self._base_url] = (time.time(), self.__boards)
 
-        return boards
+        return self.__boards
+
+    @property
+    def _boards(self) -> Dict[str, Board]:
+        if self.__boards is None:
+            loaded_at, boards = _shared_boards.get(self._base_url, (0, None))
+
+            if (
+                boards is not None
+                and time.time() - loaded_at <= self._boards_cache_ttl
+            ):
+                self.__boards = boards
+                return boards
+
+            cached = self._boards_cache.load() if self._boards_cache else None
+
+            if cached:
+                self.__boards = parse_boards(*cached)
+                _shared_boards[self._base_url] = (time.time(), self.__boards)
+            else:
+                self.refresh_boards()
+
+        return self.__boards
 
     @property
     def board(self):
@@ -89,7 +274,7 @@ class ChAPI(GenericRequestProvider):
 
         response_data = self.get("/makaba/makaba.fcgi", data=payload)
 
-        self.passcode_data = response_data.hash
+        self.passcode_data = response_data["hash"]
 
         return self.passcode_data
 
@@ -99,47 +284,193 @@ class ChAPI(GenericRequestProvider):
         tag: str = None,
         subject: str = None,
         limit: int = 1,
+        lazy: bool = False,
     ) -> List[Thread]:
         """
         Get all threads from board
 
         tag: filter by tag
         subject: filter by subject
+        lazy: return ThreadView objects that read the raw JSON on access
         """
 
         if not (board and self._is_board_exist(board)):
             board = self.board.board_id
 
-        threads_response = self.get(f"/{board}/catalog.json").threads
-        threads = [Thread(thread_data) for thread_data in threads_response]
+        threads_response = self.get(f"/{board}/catalog.json")["threads"]
+        model = ThreadView if lazy else Thread
+        threads = [model(thread_data) for thread_data in threads_response]
 
-        if tag:
-            filtered_results = list(
-                filter(lambda thread: tag in thread.opening_post.tags, threads)
-            )
-            return filtered_results[:limit]
+        return filter_threads(threads, tag=tag, subject=subject, limit=limit)
+
+    def get_thread(
+        self,
+        thread: Optional[Thread] = None,
+        board: Board = None,
+        lazy: bool = False,
+    ) -> List[Post]:
+        """
+        Get all posts from thread
 
-        if subject:
-            filtered_results = list(
-                filter(
-                    lambda thread: subject.lower() in thread.subject.lower(),
-                    threads,
+        lazy: return PostView objects that read the raw JSON on access
+        """
+        if isinstance(thread, (Thread, ThreadView)):
+            thread = thread.num
+
+        if not (board and self._is_board_exist(board)):
+            board = self.board.board_id
+
+        posts = self.get(f"/{board}/res/{thread}.json")["threads"]
+        model = PostView if lazy else Post
+
+        return [model(post) for post in posts[0]["posts"]]
+
+    def get_reply_graph(
+        self, thread: Optional[Thread] = None, board: Board = None
+    ) -> ReplyGraph:
+        """
+        Reply graph of a thread, new posts can be added to it as they come
+        """
+        return ReplyGraph(self.get_thread(thread, board=board, lazy=True))
+
+    @property
+    def executor(self) -> Optional[ThreadPoolExecutor]:
+        """
+        Shared pool for bulk API calls, None unless use_threads is set
+        """
+        if not self.use_threads:
+            return None
+
+        with self._lazy_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="py-2ch-api"
                 )
-            )
-            return filtered_results[:limit]
 
-        return threads
+            return self._executor
 
-    def get_thread(self, thread: Optional[Thread] = None, board: Board = None):
-        if isinstance(thread, Thread):
-            thread = thread.num
+    @property
+    def scheduler(self) -> CrawlScheduler:
+        """
+        Long-lived crawl pool, shut down with the client if the client
+        created it
+        """
+        with self._lazy_lock:
+            if self._scheduler is None:
+                self._scheduler = CrawlScheduler(
+                    workers=self.workers, metrics=self._metrics
+                )
+                self._owns_scheduler = True
+
+            return self._scheduler
+
+    def schedule_thread(
+        self,
+        thread: Thread = None,
+        board: Board = None,
+        lazy: bool = False,
+        priority: int = TASK_PRIORITY.THREAD,
+    ) -> Future:
+        """
+        Fetch a thread on the scheduler, the future resolves to its posts
+        """
+        return self.scheduler.submit(
+            self.get_thread,
+            thread,
+            board=board,
+            lazy=lazy,
+            priority=priority,
+            kind="thread",
+        )
+
+    def schedule_download(
+        self,
+        file: File,
+        out_dir: str = "downloads",
+        priority: int = TASK_PRIORITY.MEDIA,
+    ) -> Future:
+        """
+        Download a file on the scheduler, the future resolves to its
+        DownloadResult
+        """
+        return self.scheduler.submit(
+            self.download_file_from_post,
+            file,
+            out_dir,
+            priority=priority,
+            kind="media",
+        )
+
+    def _get_existing_board_threads(self, board: str, lazy: bool = False):
+        if not self._is_board_exist(board):
+            raise BoardNotFound(f"Board {board} not found")
+
+        return self.get_board_threads(board=board, lazy=lazy)
+
+    def _get_existing_thread(self, key: Tuple[str, int], lazy: bool = False):
+        board, num = key
+
+        if not self._is_board_exist(board):
+            raise BoardNotFound(f"Board {board} not found")
+
+        return self.get_thread(num, board=board, lazy=lazy)
+
+    def get_catalogs(
+        self, boards: Iterable[str] = None, lazy: bool = False
+    ) -> Iterator[BulkResult]:
+        """
+        Fetch catalogs of many boards, all boards if none given
+
+        Results are yielded as they complete, BulkResult.key is the board
+        id and BulkResult.value the list of threads.
+        """
+        if boards is None:
+            boards = list(self._boards.keys())
+
+        return run_bulk(
+            lambda board: self._get_existing_board_threads(board, lazy),
+            boards,
+            self.executor,
+            window=self.workers * 4,
+        )
+
+    def get_threads(
+        self, threads: Iterable[Tuple[str, int]], lazy: bool = False
+    ) -> Iterator[BulkResult]:
+        """
+        Fetch many threads given as (board, num) pairs
+
+        Results are yielded as they complete, BulkResult.key is the pair
+        and BulkResult.value the list of posts.
+        """
+        return run_bulk(
+            lambda key: self._get_existing_thread(key, lazy),
+            threads,
+            self.executor,
+            window=self.workers * 4,
+        )
 
+    def watch_thread(
+        self,
+        thread: Optional[Thread] = None,
+        board: Board = None,
+        interval: float = 10,
+    ) -> ThreadWatcher:
+        """
+        Create a watcher that returns only posts added since the last poll
+        """
         if not (board and self._is_board_exist(board)):
             board = self.board.board_id
 
-        posts = self.get(f"/{board}/res/{thread}.json").threads
+        return ThreadWatcher(self, thread, board=board, interval=interval)
 
-        return [Post(post) for post in posts[0].posts]
+    def catalog_poller(
+        self, boards: List[str] = None, **kwargs
+    ) -> CatalogPoller:
+        """
+        Create a poller that reports new, bumped and dropped threads
+        """
+        return CatalogPoller(self, boards, **kwargs)
 
     def get_top_threads(
         self,
@@ -152,119 +483,310 @@ class ChAPI(GenericRequestProvider):
 
         threads = self.get_board_threads(board=board)
 
-        if method == TOP_METHODS.VIEWS:
-            threads = sorted(
-                threads,
-                key=lambda thread: (thread.views, thread.score),
-                reverse=True,
-            )
-        elif method == TOP_METHODS.POSTS:
-            threads = sorted(
-                threads,
-                key=lambda thread: (thread.posts_count, thread.views),
-                reverse=True,
+        return sort_threads(threads, method=method, limit=limit)
+
+    def get_top_threads_across(
+        self,
+        boards: Iterable[str] = None,
+        method: TOP_METHODS = TOP_METHODS.VIEWS,
+        limit: int = 5,
+    ) -> List[Tuple[str, Thread]]:
+        """
+        Rank threads of many boards at once, all boards if none given
+
+        Catalogs are fetched with get_catalogs and folded into the ranking
+        as they arrive. Returns (board, thread) pairs, best first.
+        """
+        top = RollingTopN(method=method, limit=limit)
+
+        for result in self.get_catalogs(boards, lazy=True):
+            if result.ok:
+                top.update_many(result.key, result.value)
+
+        return [(board, thread.materialize()) for board, thread in top.top()]
+
+    def build_thread_index(
+        self,
+        boards: Iterable[str] = None,
+        comments: bool = False,
+        index: Optional[ThreadIndex] = None,
+    ) -> ThreadIndex:
+        """
+        Index subjects and tags of many boards for ThreadIndex.search
+
+        Pass an existing `index` to refresh it, threads gone from a catalog
+        are dropped from it. Keep it current between calls by feeding it
+        catalog_poller events with ThreadIndex.apply.
+        """
+        if index is None:
+            index = ThreadIndex(comments=comments)
+
+        for result in self.get_catalogs(boards, lazy=True):
+            if result.ok:
+                index.replace_board(result.key, result.value)
+
+        return index
+
+    def export_board(
+        self,
+        path: str,
+        board: Board = None,
+        format: str = EXPORT_FORMAT.NDJSON,
+        batch_size: int = 1000,
+        posts: bool = True,
+        errors: Optional[Dict] = None,
+    ) -> int:
+        """
+        Stream a board snapshot to NDJSON, CSV or Parquet in constant memory
+
+        posts: export every post, only the catalog entries if False
+        errors: filled with the keys of the threads or catalogs that
+            failed and their errors, every failure is also logged
+
+        Returns the number of records written.
+        """
+        if not (board and self._is_board_exist(board)):
+            board = self.board.board_id
+
+        errors = {} if errors is None else errors
+        written = export_board(
+            self,
+            path,
+            board=board,
+            format=format,
+            batch_size=batch_size,
+            posts=posts,
+            errors=errors,
+        )
+
+        for key, error in errors.items():
+            self._logger.error(
+                f"Not exported, {key} failed: {error!r}", exc_info=False
             )
-        elif method == TOP_METHODS.SCORE:
-            threads = sorted(
-                threads,
-                key=lambda thread: (thread.score, thread.views),
-                reverse=True,
+
+        return written
+
+    def crawl_boards(
+        self,
+        boards: Iterable[str] = None,
+        processes: Optional[int] = None,
+        posts: bool = True,
+        options: Optional[Dict] = None,
+    ) -> Iterator[BulkResult]:
+        """
+        Crawl boards in worker processes, all boards if none given
+
+        Every worker has its own client with this client's base url,
+        board, proxies, retry policy and board registry; `options` adds or
+        overrides ChAPI arguments. Threads that fail are left out of the
+        posts and listed in BoardRecords.errors. Results are yielded per
+        board as they complete, BulkResult.value is a BoardRecords.
+        """
+        if boards is None:
+            boards = list(self._boards.keys())
+
+        return crawl_boards(
+            boards,
+            base_url=self._base_url,
+            processes=processes,
+            posts=posts,
+            options=dict(
+                {
+                    "board": self.board.board_id,
+                    "proxies": self._proxies,
+                    "retry_policy": self._retry_policy,
+                },
+                **(options or {}),
+            ),
+            board_registry=self._boards,
+        )
+
+    def send_post(
+        self,
+        message: Message,
+        validate: bool = True,
+        timeout: int = 300,
+        max_file_size: Optional[float] = None,
+    ) -> Dict:
+        """
+        Post a message, attachments are streamed from memory maps
+
+        Authenticates the passcode first if one was given and not used
+        yet. The posting limits depend on it.
+
+        validate: check file count and total size against POST_LIMITS
+            before uploading, raises ExtraFilesError or FileSizeError
+        timeout: socket timeout in seconds for the upload
+        max_file_size: with `validate`, also limit every file to this
+            size in MB
+
+        Returns makaba's JSON answer, `Error` is set if the post failed.
+        """
+        if self.passcode and not self.passcode_data:
+            self.auth_passcode()
+
+        if validate:
+            message.validate(
+                passcode=bool(self.passcode_data), max_file_size=max_file_size
             )
-        else:
-            return []
 
-        return threads[:limit]
+        if not message.payload.board:
+            message.payload.board = self.board.board_id
 
-    def send_post(self):
-        raise NotImplementedError
+        cookies = (
+            {"usercode_auth": self.passcode_data}
+            if self.passcode_data
+            else None
+        )
+
+        with message.body() as body:
+            return self.post(
+                "/makaba/posting.fcgi",
+                headers={"Content-Type": body.content_type},
+                data=body,
+                cookies=cookies,
+                timeout=timeout,
+            )
 
     def get_all_media_from_thread(
         self,
         thread: Thread = None,
         media_type: Optional[MEDIA_TYPE] = MEDIA_TYPE.MP4,
-    ):
-        posts = self.get_thread(thread)
+        board: Board = None,
+        media_filter: Optional[MediaFilter] = None,
+        thumbnail_check: Optional[ThumbnailCheck] = None,
+    ) -> List[File]:
+        """
+        media_filter: metadata checks, replaces `media_type` when given
+        thumbnail_check: called with each file that passed the metadata
+            checks and its thumbnail bytes, keeps the file if it's true
+        """
+        if media_filter is None:
+            media_filter = MediaFilter(media_type=media_type)
 
-        media = [
-            item
-            for sublist in [post.files for post in posts if post.files]
-            for item in sublist
-        ]
+        posts = self.get_thread(thread, board=board, lazy=True)
+        files = self.media_pipeline(media_filter, thumbnail_check).select(
+            posts
+        )
 
-        if media_type:
-            media = [
-                file
-                for file in media
-                if FILE_TYPE().get(file.type) in media_type
-            ]
+        return [file.materialize() for file in files]
+
+    def media_pipeline(
+        self,
+        media_filter: Optional[MediaFilter] = None,
+        thumbnail_check: Optional[ThumbnailCheck] = None,
+    ) -> MediaPipeline:
+        return MediaPipeline(
+            self.get_media,
+            media_filter=media_filter,
+            thumbnail_check=thumbnail_check,
+            executor=self.executor,
+        )
 
-        return media
+    @property
+    def downloader(self) -> Downloader:
+        with self._lazy_lock:
+            if self._downloader is None:
+                self._downloader = Downloader(
+                    self.media_session,
+                    workers=self.workers,
+                    index=self.media_index,
+                    rate_limiter=self._rate_limiter,
+                    retry_policy=self._retry_policy,
+                    metrics=self._metrics,
+                )
 
-    def download_all_media_from_thread(self):
-        raise NotImplementedError
+            return self._downloader
 
-    def download_all_media_from_post(
+    def download_all_media_from_thread(
         self,
-        post: Post = None,
+        thread: Thread = None,
         out_dir: str = "downloads",
         media_type: MEDIA_TYPE = MEDIA_TYPE.ALL,
-    ):
-
-        result = []
-
-        if post.files:
-
-            files_to_download = post.files
-
-            if media_type != MEDIA_TYPE.ALL:
-                files_to_download = [
-                    file
-                    for file in post.files
-                    if FILE_TYPE().get(file.type) in media_type
-                ]
-
-            if files_to_download:
+        board: Board = None,
+        media_filter: Optional[MediaFilter] = None,
+        thumbnail_check: Optional[ThumbnailCheck] = None,
+    ) -> List[DownloadResult]:
+        """
+        Download the files of a thread, only those passing `media_filter`
+        and `thumbnail_check` are fetched in full
+        """
+        media = self.get_all_media_from_thread(
+            thread,
+            media_type=None if media_type == MEDIA_TYPE.ALL else media_type,
+            board=board,
+            media_filter=media_filter,
+            thumbnail_check=thumbnail_check,
+        )
 
-                try:
-                    os.makedirs(out_dir)
-                except FileExistsError:
-                    pass
+        return self._download_files(media, out_dir)
 
-                if self.use_threads:
-                    pool = ThreadPoolExecutor(max_workers=self.workers)
+    def download_all_media_from_post(
+        self,
+        post: Post = None,
+        out_dir: str = "downloads",
+        media_type: MEDIA_TYPE = MEDIA_TYPE.ALL,
+    ) -> List[DownloadResult]:
+        files_to_download = post.files
 
-                    for file in files_to_download:
-                        pool.submit(
-                            self.download_file_from_post, file, out_dir
-                        )
+        if media_type != MEDIA_TYPE.ALL:
+            files_to_download = [
+                file
+                for file in post.files
+                if FILE_TYPE().get(file.type) in media_type
+            ]
 
-                        out_path = os.path.join(out_dir, file.name[:64])
+        return self._download_files(files_to_download, out_dir)
 
-                        result.append(out_path)
+    def _download_files(
+        self, files: List[File], out_dir: str
+    ) -> List[DownloadResult]:
+        if not files:
+            return []
 
-                    pool.shutdown(wait=True)
-                else:
-                    for file in files_to_download:
+        os.makedirs(out_dir, exist_ok=True)
 
-                        out_path = self.download_file_from_post(
-                            file=file, out_dir=out_dir
-                        )
+        items = []
 
-                        result.append(out_path)
+        for file in files:
+            url = self.build_url(file.path)
+            self._logger.info(f"Downloading: {url}")
+            items.append(
+                (url, os.path.join(out_dir, file.name[:64]), file.md5)
+            )
 
-                return result
+        return self.downloader.download_many(items, parallel=self.use_threads)
 
     def download_file_from_post(
         self, file: File = None, out_dir: str = "downloads"
-    ) -> Optional[str]:
+    ) -> DownloadResult:
+        os.makedirs(out_dir, exist_ok=True)
 
         out_path = os.path.join(out_dir, file.name[:64])
         url = self.build_url(file.path)
 
         self._logger.info(f"Downloading: {url}")
 
-        wget.download(url=url, out=out_path)
-        sys.stdout.flush()
-        sys.stdout.write("\n")
+        return self.downloader.fetch(url, out_path, file.md5)
+
+    def is_media_archived(self, md5: str) -> bool:
+        """
+        Check whether a file with this md5 was already downloaded
+        """
+        return self.media_index is not None and md5 in self.media_index
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        # queued crawl tasks use the executor and the downloader, they
+        # finish first; a scheduler passed in may be shared, its owner
+        # shuts it down
+        if self._owns_scheduler:
+            self._scheduler.shutdown()
+
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+        if self._downloader is not None:
+            self._downloader.shutdown()
 
-        return out_path
+        super().__exit__(exc_type, exc_val, exc_tb)
@@ -0,0 +1,220 @@
+import heapq
+import html
+import re
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+_TAG_RE = re.compile(r"<[^>]*>")
+# only reply links carry data-num, other links have absolute hrefs
+_REPLY_RE = re.compile(r'data-num="(\d+)"')
+_LINK_RE = re.compile(r'href="(https?://[^"]+)"')
+
+# makaba wraps greentext lines in this span
+GREENTEXT_SPAN = '<span class="unkfunc">'
+
+
+def _unescape(text: str) -> str:
+    if "&" not in text:
+        return text
+
+    # the entities makaba escapes, html.unescape only for anything else
+    fast = text.replace("&gt;", ">").replace("&lt;", "<")
+    fast = fast.replace("&quot;", '"')
+
+    return html.unescape(text) if "&" in fast else fast
+
+
+class ParsedComment:
+    __slots__ = ("text", "replies", "links", "greentext")
+
+    def __init__(
+        self,
+        text: str = "",
+        replies: List[int] = None,
+        links: List[str] = None,
+        greentext: List[str] = None,
+    ):
+        """
+        text: the comment without markup, <br> as newlines
+        replies: quoted post nums (>>num links), in order, repeats kept
+        links: external links
+        greentext: text of the greentext lines
+        """
+        self.text = text
+        self.replies = replies or []
+        self.links = links or []
+        self.greentext = greentext or []
+
+    def __repr__(self):
+        return (
+            f"<ParsedComment: {len(self.text)} chars, "
+            f"{len(self.replies)} replies, {len(self.links)} links>"
+        )
+
+
+def parse_comment(comment: Optional[str]) -> ParsedComment:
+    """
+    Split a makaba HTML comment into plain text, reply nums, links and
+    greentext
+
+    Each part is one regex scan in C, parts a comment can't contain are
+    skipped by a substring check; that's faster than a single tokenizing
+    pass driven from Python.
+    """
+    if not comment:
+        return ParsedComment()
+
+    if "<" not in comment:
+        return ParsedComment(_unescape(comment))
+
+    lines = comment.split("<br>")
+    text = _unescape(_TAG_RE.sub("", "\n".join(lines)))
+    replies = (
+        [int(num) for num in _REPLY_RE.findall(comment)]
+        if "data-num" in comment
+        else []
+    )
+    links = (
+        [_unescape(link) for link in _LINK_RE.findall(comment)]
+        if "http" in comment
+        else []
+    )
+    greentext = (
+        [
+            _unescape(_TAG_RE.sub("", line[line.index(GREENTEXT_SPAN) :]))
+            for line in lines
+            if GREENTEXT_SPAN in line
+        ]
+        if GREENTEXT_SPAN in comment
+        else []
+    )
+
+    return ParsedComment(text, replies, links, greentext)
+
+
+def reply_nums(comment: Optional[str]) -> List[int]:
+    """
+    Quoted post nums of a comment, without parsing the rest of it
+    """
+    if not comment or "data-num" not in comment:
+        return []
+
+    return [int(num) for num in _REPLY_RE.findall(comment)]
+
+
+def _post_fields(post) -> Tuple[int, Optional[str]]:
+    """
+    (num, comment) of a raw post dict or a post model
+    """
+    if isinstance(post, dict):
+        return post.get("num"), post.get("comment")
+
+    return post.num, post.comment
+
+
+class ReplyGraph:
+    def __init__(self, posts: Iterable = ()):
+        """
+        Who replies to whom within a thread
+
+        Posts can be raw dicts, Post or PostView objects and are added
+        incrementally, e.g. as ThreadWatcher reports them; a post quoting
+        the same num twice counts as one reply.
+        """
+        # num -> nums it quotes
+        self._quotes = {}
+        # num -> nums quoting it, in the order they were added
+        self._replies = {}
+
+        self.add_many(posts)
+
+    def add(self, post) -> Tuple[int, ...]:
+        """
+        Add a post, return the nums it quotes
+        """
+        num, comment = _post_fields(post)
+
+        if num in self._quotes:
+            return self._quotes[num]
+
+        quotes = tuple(dict.fromkeys(reply_nums(comment)))
+        self._link(num, quotes)
+
+        return quotes
+
+    def _link(self, num: int, quotes: Tuple[int, ...]):
+        self._quotes[num] = quotes
+        replies = self._replies
+
+        for quoted in quotes:
+            if quoted in replies:
+                replies[quoted].append(num)
+            else:
+                replies[quoted] = [num]
+
+    def add_many(self, posts: Iterable):
+        for post in posts:
+            self.add(post)
+
+    def remove(self, num: int):
+        """
+        Forget a deleted post and its outgoing replies, replies to it are
+        kept
+        """
+        for quoted in self._quotes.pop(num, ()):
+            replies = self._replies.get(quoted)
+
+            if replies is not None:
+                replies.remove(num)
+
+    def quotes(self, num: int) -> Tuple[int, ...]:
+        """
+        Nums the post replies to
+        """
+        return self._quotes.get(num, ())
+
+    def replies(self, num: int) -> List[int]:
+        """
+        Nums of the posts replying to this one
+        """
+        return list(self._replies.get(num, ()))
+
+    def reply_count(self, num: int) -> int:
+        return len(self._replies.get(num, ()))
+
+    def reply_counts(self) -> Dict[int, int]:
+        return {
+            num: len(replies)
+            for num, replies in self._replies.items()
+            if replies
+        }
+
+    def most_replied(self, limit: int = 10) -> List[Tuple[int, int]]:
+        """
+        (num, reply count) of the most replied posts
+        """
+        return heapq.nlargest(
+            limit,
+            ((num, len(replies)) for num, replies in self._replies.items()),
+            key=lambda item: item[1],
+        )
+
+    def subtree(self, num: int) -> Set[int]:
+        """
+        Nums of every post in the reply tree below `num`
+        """
+        seen = set()
+        stack = [num]
+
+        while stack:
+            for reply in self._replies.get(stack.pop(), ()):
+                if reply not in seen:
+                    seen.add(reply)
+                    stack.append(reply)
+
+        return seen
+
+    def __contains__(self, num: int) -> bool:
+        return num in self._quotes
+
+    def __len__(self):
+        return len(self._quotes)
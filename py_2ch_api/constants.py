@@ -1,7 +1,15 @@
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 6.1; rv:52.0) Gecko/20100101 Firefox/52.0"
+)
+
+
 class TOP_METHODS:
     VIEWS = "views"
     SCORE = "score"
     POSTS = "posts"
+    POSTS_PER_HOUR = "posts_per_hour"
+    VIEWS_PER_HOUR = "views_per_hour"
+    RECENCY = "recency"
 
 
 class MEDIA_TYPE:
@@ -29,6 +37,52 @@ class FILE_TYPE:
         return self.TYPES.get(value)
 
 
+class CATALOG_EVENT:
+    CREATED = "created"
+    BUMPED = "bumped"
+    POSTS_COUNT = "posts_count"
+    DROPPED = "dropped"
+
+
+class TASK_PRIORITY:
+    # crawl scheduler priorities, lower runs first
+    HOT_THREAD = 0
+    THREAD = 10
+    MEDIA = 20
+    ARCHIVE = 30
+
+
+class JSON_DECODER:
+    AUTO = "auto"
+    STDLIB = "json"
+    ORJSON = "orjson"
+    UJSON = "ujson"
+
+
+class ENDPOINT:
+    CATALOG = "catalog"
+    THREAD = "thread"
+    MEDIA = "media"
+    MAKABA = "makaba"
+    OTHER = "other"
+
+
+class EXPORT_FORMAT:
+    NDJSON = "ndjson"
+    CSV = "csv"
+    PARQUET = "parquet"
+    # parquet when pyarrow is installed, csv otherwise
+    COLUMNAR = "columnar"
+
+
+class POST_LIMITS:
+    MAX_FILES = 4
+    MAX_FILES_PASSCODE = 8
+    # total size of the attachments in MB
+    MAX_SIZE = 20
+    MAX_SIZE_PASSCODE = 60
+
+
 class ConsoleColors:
     HEADER = "\033[95m"
     OKBLUE = "\033[94m"
@@ -0,0 +1,182 @@
+import os
+import time
+from functools import partial
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from py_2ch_api.bulk import BulkResult, run_bulk
+from py_2ch_api.export import (
+    POST_SCHEMA,
+    THREAD_SCHEMA,
+    post_record,
+    thread_record,
+)
+from py_2ch_api.models import PostView, ThreadView
+
+THREAD_COLUMNS = tuple(column for column, _ in THREAD_SCHEMA)
+POST_COLUMNS = tuple(column for column, _ in POST_SCHEMA)
+
+# client of the current worker process, created by _init_worker
+_client = None
+
+
+class BoardRecords:
+    __slots__ = ("board", "threads", "posts", "errors")
+
+    def __init__(
+        self,
+        board: str,
+        threads: List[Tuple],
+        posts: List[Tuple] = None,
+        errors: Dict[int, Exception] = None,
+    ):
+        """
+        Crawl result of a board as flat tuples, in THREAD_COLUMNS and
+        POST_COLUMNS order, so they cross process boundaries cheaply
+
+        errors: thread num -> error of the threads that couldn't be
+            fetched, e.g. deleted since the catalog was read
+        """
+        self.board = board
+        self.threads = threads
+        self.posts = posts or []
+        self.errors = errors or {}
+
+    def thread_records(self) -> Iterator[Dict]:
+        return (dict(zip(THREAD_COLUMNS, row)) for row in self.threads)
+
+    def post_records(self) -> Iterator[Dict]:
+        return (dict(zip(POST_COLUMNS, row)) for row in self.posts)
+
+    def __repr__(self):
+        return (
+            f"<BoardRecords: {self.board} {len(self.threads)} threads, "
+            f"{len(self.posts)} posts, {len(self.errors)} errors>"
+        )
+
+
+def shard_boards(boards: Iterable[str], shards: int) -> List[List[str]]:
+    """
+    Split boards round-robin into at most `shards` non-empty lists
+    """
+    result = [[] for _ in range(shards)]
+
+    for i, board in enumerate(boards):
+        result[i % shards].append(board)
+
+    return [shard for shard in result if shard]
+
+
+def _init_worker(options: Dict, boards: Optional[Dict] = None):
+    global _client
+
+    # py_2ch_api.client imports this module
+    from py_2ch_api import client
+
+    if boards is not None:
+        # the parent's registry, so every worker doesn't fetch its own
+        client._shared_boards[options["base_url"]] = (time.time(), boards)
+
+    _client = client.ChAPI(boards_cache_dir=None, raw=True, **options)
+
+
+def _crawl_board(board: str, posts: bool = True) -> BoardRecords:
+    catalog = _client.get(f"/{board}/catalog.json")["threads"]
+    records = BoardRecords(
+        board,
+        [
+            tuple(thread_record(board, ThreadView(thread)).values())
+            for thread in catalog
+        ],
+    )
+
+    if not posts:
+        return records
+
+    for thread in catalog:
+        num = thread["num"]
+
+        # one failed thread must not cost the rest of the board
+        try:
+            response = _client.get(f"/{board}/res/{num}.json")["threads"]
+        except Exception as e:
+            records.errors[num] = e
+            continue
+
+        records.posts.extend(
+            tuple(post_record(board, num, PostView(post)).values())
+            for post in response[0]["posts"]
+        )
+
+    return records
+
+
+def _crawl_shard(
+    boards: Tuple[str, ...], posts: bool = True
+) -> List[BulkResult]:
+    results = []
+
+    for board in boards:
+        try:
+            results.append(BulkResult(board, _crawl_board(board, posts)))
+        except Exception as e:
+            results.append(BulkResult(board, error=e))
+
+    return results
+
+
+def crawl_boards(
+    boards: Iterable[str],
+    base_url: str = "https://2ch.hk",
+    processes: Optional[int] = None,
+    posts: bool = True,
+    shards: Optional[int] = None,
+    options: Optional[Dict] = None,
+    mp_context: Optional[str] = None,
+    board_registry: Optional[Dict] = None,
+) -> Iterator[BulkResult]:
+    """
+    Crawl boards in worker processes, each with its own ChAPI and session
+
+    Decoding and model building run in the workers, which send back
+    BoardRecords of flat tuples instead of response trees.
+
+    processes: worker processes, os.cpu_count() by default
+    posts: fetch every thread of the catalog, only the catalog if False
+    shards: how many groups the boards are split into, one per board by
+        default, so a slow board doesn't hold up the others
+    options: extra ChAPI arguments of the workers, e.g. proxies or
+        decoder; they must be picklable
+    mp_context: multiprocessing start method, e.g. "spawn"
+    board_registry: board id -> Board, e.g. ChAPI._boards, handed to the
+        workers instead of each one fetching the registry
+
+    Results are yielded as shards complete, BulkResult.key is the board
+    id and BulkResult.value its BoardRecords.
+    """
+    boards = list(boards)
+
+    if not boards:
+        return
+
+    # imported here, multiprocessing is slow to import and only needed
+    # by this mode
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    processes = processes or os.cpu_count() or 1
+    options = dict(options or {}, base_url=base_url)
+
+    with ProcessPoolExecutor(
+        max_workers=processes,
+        mp_context=multiprocessing.get_context(mp_context),
+        initializer=_init_worker,
+        initargs=(options, board_registry),
+    ) as executor:
+        for shard in run_bulk(
+            partial(_crawl_shard, posts=posts),
+            map(tuple, shard_boards(boards, shards or len(boards))),
+            executor,
+            window=processes * 2,
+        ):
+            # _crawl_shard reports errors per board, a broken pool raises
+            yield from shard.value
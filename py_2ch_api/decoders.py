@@ -0,0 +1,46 @@
+import importlib
+import json
+from typing import Any, Callable
+
+from addict import Dict as JSON_Parse
+
+from py_2ch_api.constants import JSON_DECODER
+
+# fastest first, used by JSON_DECODER.AUTO
+FAST_DECODERS = (JSON_DECODER.ORJSON, JSON_DECODER.UJSON)
+
+
+def get_decoder(name: str = JSON_DECODER.STDLIB) -> Callable[[bytes], Any]:
+    """
+    Return a `loads` function taking the raw response body
+
+    AUTO picks the fastest installed decoder and falls back to the stdlib.
+    Every decoder raises a ValueError subclass on malformed input.
+    """
+    if name == JSON_DECODER.STDLIB:
+        return json.loads
+
+    candidates = FAST_DECODERS if name == JSON_DECODER.AUTO else (name,)
+
+    for candidate in candidates:
+        try:
+            return importlib.import_module(candidate).loads
+        except ImportError:
+            if name != JSON_DECODER.AUTO:
+                raise
+
+    return json.loads
+
+
+def parse_json(data):
+    """
+    Wrap decoded JSON in addict for attribute access
+    """
+    # makaba's mobile API answers some requests with a bare list of posts
+    if isinstance(data, list):
+        return [
+            JSON_Parse(item) if isinstance(item, dict) else item
+            for item in data
+        ]
+
+    return JSON_Parse(data)
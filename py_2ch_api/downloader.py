@@ -0,0 +1,294 @@
+import os
+import threading
+import time
+from concurrent.futures import Future
+from concurrent.futures.thread import ThreadPoolExecutor
+from typing import Iterable, List, Optional, Tuple
+
+import requests
+
+from py_2ch_api.constants import USER_AGENT
+from py_2ch_api.exceptions import DownloadError, ChecksumMismatchError
+from py_2ch_api.media_index import MediaIndex, file_md5
+from py_2ch_api.metrics import MetricsSink, record_download, record_retry
+from py_2ch_api.ratelimit import RateLimiter, RetryPolicy
+
+
+class DownloadResult:
+    __slots__ = (
+        "url",
+        "path",
+        "bytes",
+        "duration",
+        "error",
+        "resumed",
+        "skipped",
+        "deduplicated",
+    )
+
+    def __init__(
+        self,
+        url: str,
+        path: str,
+        bytes: int = 0,
+        duration: float = 0.0,
+        error: Optional[Exception] = None,
+        resumed: bool = False,
+        skipped: bool = False,
+        deduplicated: bool = False,
+    ):
+        """
+        bytes: bytes received by this download, not the file size
+        error: exception that stopped the download, None on success
+        resumed: the download continued a partial file
+        skipped: nothing was downloaded, the file was already there
+        deduplicated: the md5 was already archived, `path` is a hardlink to
+            the archived copy or the archived copy itself
+        """
+        self.url = url
+        self.path = path
+        self.bytes = bytes
+        self.duration = duration
+        self.error = error
+        self.resumed = resumed
+        self.skipped = skipped
+        self.deduplicated = deduplicated
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def __repr__(self):
+        status = "ok" if self.ok else f"error={self.error!r}"
+        return f"<DownloadResult: {self.path} {self.bytes}b {status}>"
+
+
+def part_path(out_path: str) -> str:
+    return f"{out_path}.part"
+
+
+class Downloader:
+    def __init__(
+        self,
+        session: requests.Session,
+        workers: int = 10,
+        chunk_size: int = 1 << 16,
+        timeout: int = 60,
+        overwrite: bool = False,
+        index: Optional[MediaIndex] = None,
+        verify_md5: bool = True,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        metrics: Optional[MetricsSink] = None,
+    ):
+        """
+        Streaming media downloader over a shared session and worker pool
+
+        Bodies are written to `<path>.part` and renamed when complete, so an
+        interrupted download is resumed with a Range request next time.
+
+        overwrite: download again even if the target file already exists
+        index: md5 index checked before downloading and updated after
+        verify_md5: compare the downloaded body with the md5 from the API
+        rate_limiter: shared with the API requests, media has its own
+            endpoint class
+        retry_policy: retry failed downloads, resuming from what was
+            already received
+        metrics: receives the outcome, duration and size of every download
+        """
+        self._session = session
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.timeout = timeout
+        self.overwrite = overwrite
+        self.index = index
+        self.verify_md5 = verify_md5
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy
+        self.metrics = metrics
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers,
+                    thread_name_prefix="py-2ch-download",
+                )
+
+            return self._executor
+
+    def fetch(
+        self, url: str, out_path: str, md5: Optional[str] = None
+    ) -> DownloadResult:
+        """
+        Download `url` into `out_path` in the calling thread
+
+        md5: expected checksum, enables deduplication and verification
+        """
+        started = time.monotonic()
+        result = DownloadResult(url, out_path)
+
+        try:
+            if not self.overwrite and os.path.exists(out_path):
+                result.skipped = True
+            elif not (md5 and self._deduplicate(md5, out_path, result)):
+                self._stream_with_retries(url, out_path, result, md5)
+        except (requests.RequestException, OSError, DownloadError) as e:
+            result.error = e
+
+        result.duration = time.monotonic() - started
+
+        if self.metrics is not None:
+            record_download(self.metrics, result)
+
+        return result
+
+    def _deduplicate(
+        self, md5: str, out_path: str, result: DownloadResult
+    ) -> bool:
+        archived_path = self.index.lookup(md5) if self.index else None
+
+        if archived_path is None:
+            return False
+
+        result.deduplicated = True
+
+        try:
+            os.link(archived_path, out_path)
+        except OSError:
+            # other filesystem or no hardlink support, point at the copy
+            result.path = archived_path
+
+        return True
+
+    def _stream_with_retries(
+        self,
+        url: str,
+        out_path: str,
+        result: DownloadResult,
+        md5: Optional[str] = None,
+    ):
+        attempt = 0
+
+        while True:
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire(url)
+
+            try:
+                return self._stream(url, out_path, result, md5)
+            except (
+                requests.ConnectionError,
+                requests.Timeout,
+                DownloadError,
+            ) as e:
+                if isinstance(e, ChecksumMismatchError):
+                    raise
+
+                status_code = getattr(e, "status_code", None)
+
+                if self.retry_policy is None or not (
+                    self.retry_policy.should_retry(attempt, status_code)
+                ):
+                    raise
+
+                if self.metrics is not None:
+                    record_retry(self.metrics, url)
+
+                time.sleep(
+                    self.retry_policy.delay(
+                        attempt, getattr(e, "headers", None)
+                    )
+                )
+
+            attempt += 1
+
+    def _stream(
+        self,
+        url: str,
+        out_path: str,
+        result: DownloadResult,
+        md5: Optional[str] = None,
+    ):
+        tmp_path = part_path(out_path)
+        headers = {"User-agent": USER_AGENT}
+
+        try:
+            offset = os.path.getsize(tmp_path)
+        except OSError:
+            offset = 0
+
+        if offset:
+            headers["Range"] = f"bytes={offset}-"
+
+        with self._session.get(
+            url, headers=headers, stream=True, timeout=self.timeout
+        ) as r:
+            if r.status_code == 416 and offset:
+                # the partial file already holds the whole body
+                self._complete(tmp_path, out_path, url, md5)
+                return
+
+            if r.status_code == 206 and offset:
+                mode = "ab"
+                result.resumed = True
+            elif r.status_code == 200:
+                mode = "wb"
+            else:
+                raise DownloadError(
+                    f"Unexpected status code {r.status_code} for {url}",
+                    r.status_code,
+                    r.headers,
+                )
+
+            with open(tmp_path, mode) as out_file:
+                for chunk in r.iter_content(chunk_size=self.chunk_size):
+                    out_file.write(chunk)
+                    result.bytes += len(chunk)
+
+        self._complete(tmp_path, out_path, url, md5)
+
+    def _complete(
+        self, tmp_path: str, out_path: str, url: str, md5: Optional[str]
+    ):
+        if md5 and self.verify_md5:
+            actual = file_md5(tmp_path)
+
+            if actual != md5.lower():
+                os.remove(tmp_path)
+                raise ChecksumMismatchError(
+                    f"md5 mismatch for {url}: expected {md5}, got {actual}"
+                )
+
+        os.replace(tmp_path, out_path)
+
+        if md5 and self.index is not None:
+            self.index.add(md5, out_path, url)
+
+    def submit(
+        self, url: str, out_path: str, md5: Optional[str] = None
+    ) -> "Future[DownloadResult]":
+        return self.executor.submit(self.fetch, url, out_path, md5)
+
+    def download_many(
+        self, items: Iterable[Tuple], parallel: bool = True
+    ) -> List[DownloadResult]:
+        """
+        Download (url, out_path) or (url, out_path, md5) items, results
+        keep the input order
+        """
+        if not parallel:
+            return [self.fetch(*item) for item in items]
+
+        futures = [self.submit(*item) for item in items]
+
+        return [future.result() for future in futures]
+
+    def shutdown(self, wait: bool = True):
+        with self._lock:
+            executor, self._executor = self._executor, None
+
+        if executor is not None:
+            executor.shutdown(wait=wait)
@@ -20,6 +20,15 @@ class RequestError(Exception):
         )
         super().__init__(self.error_text)
 
+    def __reduce__(self):
+        # the response isn't kept, so rebuild without calling __init__,
+        # e.g. when the error comes back from a worker process
+        return (
+            self.__class__.__new__,
+            (self.__class__, self.error_text),
+            self.__dict__,
+        )
+
 
 class BoardNotFound(Exception):
     pass
@@ -29,6 +38,26 @@ class PasscodeNotProvidedError(Exception):
     pass
 
 
+class ThreadArchivedError(Exception):
+    pass
+
+
+class DownloadError(Exception):
+    def __init__(
+        self,
+        message: str = None,
+        status_code: Optional[int] = None,
+        headers=None,
+    ):
+        self.status_code = status_code
+        self.headers = headers
+        super().__init__(message)
+
+
+class ChecksumMismatchError(DownloadError):
+    pass
+
+
 class ExtraFilesError(Exception):
     def __init__(self, files_len: int = None, passcode: bool = None):
 
@@ -0,0 +1,328 @@
+import csv
+import json
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from py_2ch_api.constants import EXPORT_FORMAT
+
+# (column, type) of the exported records, files are exported as a JSON list
+THREAD_SCHEMA = (
+    ("board", str),
+    ("num", int),
+    ("subject", str),
+    ("comment", str),
+    ("tags", str),
+    ("timestamp", int),
+    ("lasthit", int),
+    ("posts_count", int),
+    ("views", int),
+    ("score", float),
+)
+POST_SCHEMA = (
+    ("board", str),
+    ("thread", int),
+    ("num", int),
+    ("number", int),
+    ("parent", int),
+    ("timestamp", int),
+    ("lasthit", int),
+    ("date", str),
+    ("name", str),
+    ("email", str),
+    ("trip", str),
+    ("subject", str),
+    ("comment", str),
+    ("tags", str),
+    ("op", int),
+    ("banned", int),
+    ("closed", int),
+    ("endless", int),
+    ("sticky", int),
+    ("files", str),
+)
+
+_FILE_FIELDS = (
+    "name",
+    "fullname",
+    "displayname",
+    "path",
+    "thumbnail",
+    "md5",
+    "type",
+    "size",
+    "width",
+    "height",
+    "duration_secs",
+)
+
+
+@lru_cache(maxsize=None)
+def _pyarrow():
+    """
+    pyarrow or None if it isn't installed, imported on first use as it
+    takes longer to import than the rest of the package
+    """
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        return None
+
+    return pyarrow
+
+
+def _convert(value, kind: type):
+    if value is None or value == "":
+        return None
+
+    return kind(value)
+
+
+def thread_record(board: str, thread) -> Dict:
+    """
+    Flat record of a Thread or ThreadView
+    """
+    values = {"board": board, "tags": thread.opening_post.tags}
+
+    return {
+        column: _convert(
+            values[column] if column in values else getattr(thread, column),
+            kind,
+        )
+        for column, kind in THREAD_SCHEMA
+    }
+
+
+def post_record(board: str, thread: int, post) -> Dict:
+    """
+    Flat record of a Post or PostView
+    """
+    values = {
+        "board": board,
+        "thread": thread,
+        "files": json.dumps(
+            [
+                {field: getattr(file, field) for field in _FILE_FIELDS}
+                for file in post.files or ()
+            ],
+            ensure_ascii=False,
+        ),
+    }
+
+    return {
+        column: _convert(
+            values[column] if column in values else getattr(post, column),
+            kind,
+        )
+        for column, kind in POST_SCHEMA
+    }
+
+
+class RecordWriter:
+    def __init__(
+        self, path: str, schema: Tuple[Tuple[str, type], ...], batch_size: int
+    ):
+        """
+        Buffer records and write them `batch_size` at a time
+        """
+        self.path = path
+        self.schema = schema
+        self.batch_size = batch_size
+        self.written = 0
+        self._batch = []
+
+    def write(self, record: Dict):
+        self._batch.append(record)
+
+        if len(self._batch) >= self.batch_size:
+            self.flush()
+
+    def write_many(self, records: Iterable[Dict]):
+        for record in records:
+            self.write(record)
+
+    def flush(self):
+        if self._batch:
+            self._write_batch(self._batch)
+            self.written += len(self._batch)
+            self._batch = []
+
+    def _write_batch(self, batch: List[Dict]):
+        raise NotImplementedError
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class NDJSONWriter(RecordWriter):
+    def __init__(self, path: str, schema, batch_size: int = 1000):
+        super().__init__(path, schema, batch_size)
+        self._file = open(path, "w", encoding="utf-8")
+
+    def _write_batch(self, batch: List[Dict]):
+        self._file.write(
+            "".join(
+                json.dumps(record, ensure_ascii=False) + "\n"
+                for record in batch
+            )
+        )
+
+    def close(self):
+        super().close()
+        self._file.close()
+
+
+class CSVWriter(RecordWriter):
+    def __init__(self, path: str, schema, batch_size: int = 1000):
+        super().__init__(path, schema, batch_size)
+        self._file = open(path, "w", encoding="utf-8", newline="")
+        self._writer = csv.DictWriter(
+            self._file, fieldnames=[column for column, _ in schema]
+        )
+        self._writer.writeheader()
+
+    def _write_batch(self, batch: List[Dict]):
+        self._writer.writerows(batch)
+
+    def close(self):
+        super().close()
+        self._file.close()
+
+
+class ParquetWriter(RecordWriter):
+    def __init__(self, path: str, schema, batch_size: int = 10000):
+        """
+        Every batch becomes a row group of the Parquet file
+        """
+        pyarrow = _pyarrow()
+
+        if pyarrow is None:
+            raise ImportError("Parquet export requires pyarrow")
+
+        super().__init__(path, schema, batch_size)
+        types = {int: pyarrow.int64(), float: pyarrow.float64()}
+        self._schema = pyarrow.schema(
+            [
+                (column, types.get(kind, pyarrow.string()))
+                for column, kind in schema
+            ]
+        )
+        self._writer = pyarrow.parquet.ParquetWriter(path, self._schema)
+        self._table = pyarrow.Table
+
+    def _write_batch(self, batch: List[Dict]):
+        self._writer.write_table(
+            self._table.from_pydict(
+                {
+                    column: [record[column] for record in batch]
+                    for column in self._schema.names
+                },
+                schema=self._schema,
+            )
+        )
+
+    def close(self):
+        super().close()
+        self._writer.close()
+
+
+def open_writer(
+    path: str,
+    schema: Tuple[Tuple[str, type], ...] = POST_SCHEMA,
+    format: str = EXPORT_FORMAT.NDJSON,
+    batch_size: int = 1000,
+) -> RecordWriter:
+    if format == EXPORT_FORMAT.COLUMNAR:
+        format = EXPORT_FORMAT.PARQUET if _pyarrow() else EXPORT_FORMAT.CSV
+
+    writers = {
+        EXPORT_FORMAT.NDJSON: NDJSONWriter,
+        EXPORT_FORMAT.CSV: CSVWriter,
+        EXPORT_FORMAT.PARQUET: ParquetWriter,
+    }
+
+    if format not in writers:
+        raise ValueError(f"Unknown export format: {format}")
+
+    return writers[format](path, schema, batch_size=batch_size)
+
+
+def iter_thread_records(
+    client, boards: Iterable[str] = None, errors: Optional[Dict] = None
+) -> Iterator[Dict]:
+    """
+    Records of the catalog entries of the boards, one catalog at a time
+
+    errors: filled with board -> error of the catalogs that failed
+    """
+    for result in client.get_catalogs(boards, lazy=True):
+        if result.ok:
+            for thread in result.value:
+                yield thread_record(result.key, thread)
+        elif errors is not None:
+            errors[result.key] = result.error
+
+
+def iter_post_records(
+    client, threads: Iterable[Tuple[str, int]], errors: Optional[Dict] = None
+) -> Iterator[Dict]:
+    """
+    Records of the posts of (board, num) threads
+
+    Threads are fetched through get_threads, so at most its window of
+    threads is held in memory at once.
+
+    errors: filled with (board, num) -> error of the threads that failed
+    """
+    for result in client.get_threads(threads, lazy=True):
+        if result.ok:
+            board, num = result.key
+
+            for post in result.value:
+                yield post_record(board, num, post)
+        elif errors is not None:
+            errors[result.key] = result.error
+
+
+def export_board(
+    client,
+    path: str,
+    board: Optional[str] = None,
+    format: str = EXPORT_FORMAT.NDJSON,
+    batch_size: int = 1000,
+    posts: bool = True,
+    errors: Optional[Dict] = None,
+) -> int:
+    """
+    Write a snapshot of a board, every post of every thread in its catalog
+
+    posts: export every post, only the catalog entries if False
+    errors: filled with the keys of the catalogs or threads that couldn't
+        be fetched and their errors, they are missing from the export
+
+    Returns the number of records written.
+    """
+    board = board or client.board.board_id
+
+    if not posts:
+        with open_writer(path, THREAD_SCHEMA, format, batch_size) as writer:
+            writer.write_many(iter_thread_records(client, [board], errors))
+
+        return writer.written
+
+    # keep only the thread numbers, not the whole catalog
+    nums = [
+        (board, thread["num"])
+        for thread in client.get(f"/{board}/catalog.json")["threads"]
+    ]
+
+    with open_writer(path, POST_SCHEMA, format, batch_size) as writer:
+        writer.write_many(iter_post_records(client, nums, errors))
+
+    return writer.written
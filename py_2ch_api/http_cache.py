@@ -0,0 +1,306 @@
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+# access times DiskCacheBackend keeps before writing them
+ACCESS_BATCH = 100
+
+
+class CacheEntry:
+    __slots__ = ("etag", "last_modified", "value", "size")
+
+    def __init__(
+        self,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        value: Any = None,
+        size: int = 0,
+    ):
+        """
+        value: the parsed body, None if the backend loads it only on a 304
+        """
+        self.etag = etag
+        self.last_modified = last_modified
+        self.value = value
+        self.size = size
+
+    def __repr__(self):
+        return f"<CacheEntry: {self.etag or self.last_modified}>"
+
+
+class MemoryCacheBackend:
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 64 << 20):
+        """
+        In-process LRU store
+
+        max_entries: how many responses to keep
+        max_bytes: upper bound on the summed size of the raw response bodies
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is not None:
+                self._entries.move_to_end(key)
+
+            return entry
+
+    def load(self, key: str) -> Any:
+        with self._lock:
+            return self._entries[key].value
+
+    def set(self, key: str, entry: CacheEntry):
+        if entry.size > self.max_bytes:
+            return
+
+        with self._lock:
+            old = self._entries.pop(key, None)
+
+            if old is not None:
+                self._bytes -= old.size
+
+            self._entries[key] = entry
+            self._bytes += entry.size
+
+            while (
+                len(self._entries) > self.max_entries
+                or self._bytes > self.max_bytes
+            ):
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size
+
+    def delete(self, key: str):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+
+            if entry is not None:
+                self._bytes -= entry.size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class DiskCacheBackend:
+    def __init__(self, path: str, max_bytes: int = 256 << 20):
+        """
+        SQLite-backed store that several processes can share
+
+        Parsed bodies are pickled, so a 304 still skips JSON decoding.
+        A lookup reads only the validators, the body is unpickled on a 304.
+        Entries are evicted least recently used first once the summed body
+        size goes over max_bytes; access times are written in batches, so
+        the order across processes is approximate.
+        """
+        directory = os.path.dirname(path)
+
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # key -> access time not written yet
+        self._accessed = {}
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, "
+            "size INTEGER, value BLOB, accessed REAL)"
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS entries_accessed ON entries(accessed)"
+        )
+        self._db.commit()
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT etag, last_modified, size FROM entries WHERE key = ?",
+                (key,),
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        etag, last_modified, size = row
+
+        return CacheEntry(etag, last_modified, None, size)
+
+    def load(self, key: str) -> Any:
+        """
+        Unpickled body of an entry, KeyError if it was evicted since the
+        lookup
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None:
+                raise KeyError(key)
+
+            self._accessed[key] = time.time()
+
+            if len(self._accessed) >= ACCESS_BATCH:
+                self._write_accessed()
+                self._db.commit()
+
+        return pickle.loads(row[0])
+
+    def _write_accessed(self):
+        self._db.executemany(
+            "UPDATE entries SET accessed = ? WHERE key = ?",
+            [(accessed, key) for key, accessed in self._accessed.items()],
+        )
+        self._accessed.clear()
+
+    def set(self, key: str, entry: CacheEntry):
+        if entry.size > self.max_bytes:
+            return
+
+        value = pickle.dumps(entry.value, pickle.HIGHEST_PROTOCOL)
+
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    entry.etag,
+                    entry.last_modified,
+                    entry.size,
+                    value,
+                    time.time(),
+                ),
+            )
+            self._write_accessed()
+            self._evict()
+            self._db.commit()
+
+    def _evict(self):
+        total = self._db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM entries"
+        ).fetchone()[0]
+
+        if total <= self.max_bytes:
+            return
+
+        rows = self._db.execute(
+            "SELECT key, size FROM entries ORDER BY accessed"
+        ).fetchall()
+        evicted = []
+
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+
+            evicted.append((key,))
+            total -= size
+
+        self._db.executemany("DELETE FROM entries WHERE key = ?", evicted)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._accessed.pop(key, None)
+            self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self._db.commit()
+
+    def clear(self):
+        with self._lock:
+            self._accessed.clear()
+            self._db.execute("DELETE FROM entries")
+            self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._write_accessed()
+            self._db.commit()
+            self._db.close()
+
+    def __len__(self):
+        with self._lock:
+            row = self._db.execute("SELECT COUNT(*) FROM entries").fetchone()
+
+        return row[0]
+
+
+class ResponseCache:
+    def __init__(self, backend=None):
+        """
+        Conditional GET cache for JSON responses
+
+        Keeps the ETag / Last-Modified validators together with the parsed
+        body. Cached objects are returned as-is on a 304, so callers must
+        not mutate them.
+        """
+        self.backend = backend if backend is not None else MemoryCacheBackend()
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        self._lock = threading.Lock()
+
+    def lookup(self, key: str) -> Optional[CacheEntry]:
+        return self.backend.get(key)
+
+    def conditional_headers(self, entry: Optional[CacheEntry]) -> Dict:
+        headers = {}
+
+        if entry is not None:
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+
+        return headers
+
+    def hit(self, key: str, entry: CacheEntry) -> Any:
+        """
+        Cached body of a 304, KeyError if the backend evicted it since the
+        lookup
+        """
+        value = entry.value
+
+        if value is None:
+            value = self.backend.load(key)
+
+        with self._lock:
+            self.hits += 1
+            self.bytes_saved += entry.size
+
+        return value
+
+    def store(self, key: str, headers, value: Any, size: int):
+        with self._lock:
+            self.misses += 1
+
+        etag = headers.get("ETag")
+        last_modified = headers.get("Last-Modified")
+
+        if etag or last_modified:
+            self.backend.set(key, CacheEntry(etag, last_modified, value, size))
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "bytes_saved": self.bytes_saved,
+            "entries": len(self.backend),
+        }
+
+    def clear(self):
+        self.backend.clear()
@@ -1,7 +1,14 @@
-import logging.config
+import logging
 import os
+import threading
 from datetime import datetime
 
+_FORMAT = "{asctime} - {levelname} - {message}"
+
+# services whose handlers are set up in this process
+_configured = {}
+_configure_lock = threading.Lock()
+
 
 class LOG_LEVEL:
     CRITICAL = 50
@@ -24,49 +31,44 @@ class Logger:
         if not service:
             raise AttributeError("service name is not defined")
 
-        try:
-            os.mkdir(log_folder)
-        except FileExistsError:
-            pass
-
         self.service = service
         self.log_to_file = log_to_file
         self.logger_level = logger_level
-        self.logger_config = {
-            "version": 1,
-            "disable_existing_loggers": False,
-            "formatters": {
-                "std_format": {
-                    "format": "{asctime} - {levelname} - {message}",
-                    "style": "{",
-                }
-            },
-            "handlers": {
-                "console": {
-                    "class": "logging.StreamHandler",
-                    "level": "DEBUG",
-                    "formatter": "std_format",
-                },
-                "file": {
-                    "class": "logging.FileHandler",
-                    "filename": f"{log_folder}/log-{datetime.now().strftime('%Y-%m-%d')}.log",
-                    "mode": "a",
-                    "formatter": "std_format",
-                },
-            },
-            "loggers": {
-                self.service: {
-                    "level": logger_level,
-                    "handlers": ["console", "file"]
-                    if self.log_to_file
-                    else ["console"],
-                }
-            },
-        }
-
-        logging.config.dictConfig(self.logger_config)
-
-        self.logger = logging.getLogger(self.service)
+        self.logger = logging.getLogger(service)
+
+        self._configure(log_folder)
+
+    def _configure(self, log_folder: str):
+        """
+        Add the handlers once per process, later instances of the same
+        service only change the level or add the file handler
+        """
+        with _configure_lock:
+            handlers = _configured.setdefault(self.service, set())
+
+            if "console" not in handlers:
+                self._add_handler(logging.StreamHandler())
+                handlers.add("console")
+
+            if self.log_to_file and "file" not in handlers:
+                # the folder is only needed when logging to a file
+                os.makedirs(log_folder, exist_ok=True)
+                self._add_handler(
+                    logging.FileHandler(
+                        os.path.join(
+                            log_folder,
+                            f"log-{datetime.now().strftime('%Y-%m-%d')}.log",
+                        ),
+                        mode="a",
+                    )
+                )
+                handlers.add("file")
+
+            self.logger.setLevel(self.logger_level)
+
+    def _add_handler(self, handler: logging.Handler):
+        handler.setFormatter(logging.Formatter(_FORMAT, style="{"))
+        self.logger.addHandler(handler)
 
     def log(
         self,
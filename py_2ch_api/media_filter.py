@@ -0,0 +1,191 @@
+from concurrent.futures import Executor
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+import requests
+
+from py_2ch_api.constants import FILE_TYPE, MEDIA_TYPE
+from py_2ch_api.exceptions import RequestError
+from py_2ch_api.models import File
+
+Predicate = Callable[[File], bool]
+ThumbnailCheck = Callable[[File, bytes], bool]
+
+
+def _at_least(name: str, minimum) -> Predicate:
+    return lambda file: (getattr(file, name) or 0) >= minimum
+
+
+def _at_most(name: str, maximum) -> Predicate:
+    # images have no duration, a missing value passes upper bounds
+    return lambda file: (getattr(file, name) or 0) <= maximum
+
+
+class MediaFilter:
+    def __init__(
+        self,
+        media_type: Optional[MEDIA_TYPE] = None,
+        min_size: int = None,
+        max_size: int = None,
+        min_width: int = None,
+        max_width: int = None,
+        min_height: int = None,
+        max_height: int = None,
+        min_duration: int = None,
+        max_duration: int = None,
+        nsfw: Optional[bool] = None,
+        md5_denylist: Iterable[str] = (),
+    ):
+        """
+        Cheap checks on File metadata, run before anything is downloaded
+
+        size: in KB, as makaba reports it
+        duration: in seconds
+        nsfw: True keeps only nsfw files, False drops them
+        md5_denylist: md5 sums of files never to keep
+
+        The checks that are set are compiled once into a single predicate,
+        unset ones cost nothing.
+        """
+        self.media_type = media_type
+        self.min_size = min_size
+        self.max_size = max_size
+        self.min_width = min_width
+        self.max_width = max_width
+        self.min_height = min_height
+        self.max_height = max_height
+        self.min_duration = min_duration
+        self.max_duration = max_duration
+        self.nsfw = nsfw
+        self.md5_denylist = frozenset(md5.lower() for md5 in md5_denylist)
+        self._predicate = None
+
+    def compile(self) -> Predicate:
+        checks = []
+
+        if self.media_type and self.media_type != MEDIA_TYPE.ALL:
+            types = frozenset(
+                file_type
+                for file_type, name in FILE_TYPE.TYPES.items()
+                if name in self.media_type
+            )
+            checks.append(lambda file: file.type in types)
+
+        for name, minimum, maximum in (
+            ("size", self.min_size, self.max_size),
+            ("width", self.min_width, self.max_width),
+            ("height", self.min_height, self.max_height),
+            ("duration_secs", self.min_duration, self.max_duration),
+        ):
+            if minimum is not None:
+                checks.append(_at_least(name, minimum))
+
+            if maximum is not None:
+                checks.append(_at_most(name, maximum))
+
+        if self.nsfw is not None:
+            nsfw = self.nsfw
+            checks.append(lambda file: bool(file.nsfw) is nsfw)
+
+        if self.md5_denylist:
+            denylist = self.md5_denylist
+            checks.append(
+                lambda file: (file.md5 or "").lower() not in denylist
+            )
+
+        if not checks:
+            return lambda file: True
+
+        if len(checks) == 1:
+            return checks[0]
+
+        checks = tuple(checks)
+
+        def predicate(file: File) -> bool:
+            for check in checks:
+                if not check(file):
+                    return False
+
+            return True
+
+        return predicate
+
+    def __call__(self, file: File) -> bool:
+        if self._predicate is None:
+            self._predicate = self.compile()
+
+        return self._predicate(file)
+
+    def select(self, posts: Iterable) -> List[File]:
+        """
+        Files of `posts` that pass, in one pass over the thread
+        """
+        if self._predicate is None:
+            self._predicate = self.compile()
+
+        predicate = self._predicate
+
+        return [
+            file
+            for post in posts
+            if post.files
+            for file in post.files
+            if predicate(file)
+        ]
+
+
+class MediaPipeline:
+    def __init__(
+        self,
+        fetch: Callable[[str], bytes],
+        media_filter: Optional[MediaFilter] = None,
+        thumbnail_check: Optional[ThumbnailCheck] = None,
+        executor: Optional[Executor] = None,
+    ):
+        """
+        Select media in stages, cheapest first: File metadata through
+        `media_filter`, then, if `thumbnail_check` is set, the thumbnail
+        bytes (for previews or perceptual hashes). Only what passes both
+        is worth fetching in full.
+
+        fetch: returns the body of a media path, e.g. ChAPI.get_media, so
+            thumbnails share the client's rate limits, retries and metrics
+        thumbnail_check: called with the file and its thumbnail bytes,
+            files whose thumbnail can't be fetched are dropped
+        executor: fetch thumbnails concurrently
+        """
+        self.fetch = fetch
+        self.media_filter = media_filter or MediaFilter()
+        self.thumbnail_check = thumbnail_check
+        self.executor = executor
+
+    def fetch_thumbnail(self, file: File) -> Optional[bytes]:
+        if not file.thumbnail:
+            return None
+
+        try:
+            return self.fetch(file.thumbnail)
+        except (RequestError, requests.RequestException):
+            return None
+
+    def _check_thumbnail(self, file: File) -> Tuple[File, bool]:
+        thumbnail = self.fetch_thumbnail(file)
+
+        return file, (
+            thumbnail is not None and self.thumbnail_check(file, thumbnail)
+        )
+
+    def _thumbnail_stage(self, files: List[File]) -> Iterator[File]:
+        if self.executor is None:
+            results = map(self._check_thumbnail, files)
+        else:
+            results = self.executor.map(self._check_thumbnail, files)
+
+        return (file for file, keep in results if keep)
+
+    def select(self, posts: Iterable) -> List[File]:
+        files = self.media_filter.select(posts)
+
+        if self.thumbnail_check is None or not files:
+            return files
+
+        return list(self._thumbnail_stage(files))
@@ -0,0 +1,94 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+
+def file_md5(path: str, chunk_size: int = 1 << 20) -> str:
+    md5 = hashlib.md5()
+
+    with open(path, "rb") as media_file:
+        for chunk in iter(lambda: media_file.read(chunk_size), b""):
+            md5.update(chunk)
+
+    return md5.hexdigest()
+
+
+class MediaIndex:
+    def __init__(self, path: str):
+        """
+        Persistent md5 -> local path index of downloaded media
+
+        Stored in SQLite, so several processes downloading into the same
+        archive can share it.
+        """
+        directory = os.path.dirname(path)
+
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS media ("
+            "md5 TEXT PRIMARY KEY, path TEXT NOT NULL, size INTEGER, "
+            "url TEXT, added REAL)"
+        )
+        self._db.commit()
+
+    def lookup(self, md5: str) -> Optional[str]:
+        """
+        Return the path of an archived file, forgetting files that were
+        removed from disk since
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT path FROM media WHERE md5 = ?", (md5.lower(),)
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        if not os.path.exists(row[0]):
+            self.remove(md5)
+            return None
+
+        return row[0]
+
+    def is_archived(self, md5: str) -> bool:
+        return self.lookup(md5) is not None
+
+    def add(self, md5: str, path: str, url: str = None):
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO media VALUES (?, ?, ?, ?, ?)",
+                (
+                    md5.lower(),
+                    os.path.abspath(path),
+                    os.path.getsize(path),
+                    url,
+                    time.time(),
+                ),
+            )
+            self._db.commit()
+
+    def remove(self, md5: str):
+        with self._lock:
+            self._db.execute("DELETE FROM media WHERE md5 = ?", (md5.lower(),))
+            self._db.commit()
+
+    def close(self):
+        self._db.close()
+
+    def __contains__(self, md5: str) -> bool:
+        return self.is_archived(md5)
+
+    def __len__(self):
+        with self._lock:
+            row = self._db.execute("SELECT COUNT(*) FROM media").fetchone()
+
+        return row[0]
@@ -0,0 +1,320 @@
+import threading
+from bisect import bisect_left
+from functools import lru_cache
+from operator import itemgetter
+from typing import Callable, Dict, Optional, Tuple
+
+from py_2ch_api.ratelimit import classify
+
+# upper bounds in seconds of the latency histogram buckets
+DEFAULT_BUCKETS = (
+    0.001,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+
+_HELP = {
+    "requests_total": "API requests by endpoint class, method and status",
+    "request_seconds": "API request latency, retries and throttling included",
+    "response_bytes_total": "Response body bytes received",
+    "request_bytes_total": "Request body bytes sent",
+    "retries_total": "Retried API requests and downloads",
+    "cache_hits_total": "Responses served from the cache after a 304",
+    "decode_seconds": "Time spent decoding JSON responses",
+    "downloads_total": "Media downloads by outcome",
+    "download_seconds": "Media download duration",
+    "download_bytes_total": "Media bytes downloaded",
+    "tasks_total": "Scheduled crawl tasks by kind and outcome",
+    "task_seconds": "Scheduled crawl task run time",
+    "task_wait_seconds": "Time scheduled crawl tasks spent queued",
+}
+
+
+class MetricsSink:
+    """
+    Receives metric updates, the base class drops them
+
+    Labels are a tuple of (name, value) pairs.
+    """
+
+    def increment(self, name: str, labels: Tuple = (), value: float = 1):
+        pass
+
+    def observe(self, name: str, labels: Tuple, value: float):
+        pass
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        """
+        (upper bound, observations <= bound) pairs, +Inf last
+        """
+        total = 0
+
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            yield bound, total
+
+
+class MetricsRegistry(MetricsSink):
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        """
+        In-process counters and histograms
+        """
+        self.buckets = buckets
+        self._counters = {}
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def increment(self, name: str, labels: Tuple = (), value: float = 1):
+        key = (name, labels)
+
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name: str, labels: Tuple, value: float):
+        key = (name, labels)
+
+        with self._lock:
+            histogram = self._histograms.get(key)
+
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(self.buckets)
+
+            histogram.observe(value)
+
+    def counter(self, name: str, **labels) -> float:
+        """
+        Sum of a counter over every label set matching `labels`
+        """
+        wanted = set(labels.items())
+
+        with self._lock:
+            return sum(
+                value
+                for (counter, counter_labels), value in self._counters.items()
+                if counter == name and wanted <= set(counter_labels)
+            )
+
+    def histogram(self, name: str, **labels) -> Optional[Histogram]:
+        wanted = set(labels.items())
+
+        with self._lock:
+            for key, histogram in self._histograms.items():
+                if key[0] == name and wanted == set(key[1]):
+                    return histogram
+
+        return None
+
+    def snapshot(self) -> Dict:
+        """
+        Plain dict of every metric, for logging or JSON
+        """
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {
+                key: (histogram.count, histogram.sum)
+                for key, histogram in self._histograms.items()
+            }
+
+        snapshot = {}
+
+        for (name, labels), value in counters.items():
+            snapshot.setdefault(name, []).append(
+                {"labels": dict(labels), "value": value}
+            )
+
+        for (name, labels), (count, total) in histograms.items():
+            snapshot.setdefault(name, []).append(
+                {"labels": dict(labels), "count": count, "sum": total}
+            )
+
+        return snapshot
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+
+def _format_labels(labels: Tuple, extra: Tuple = ()) -> str:
+    labels = labels + extra
+
+    if not labels:
+        return ""
+
+    return "{%s}" % ",".join(
+        '{}="{}"'.format(
+            name, str(value).replace("\\", "\\\\").replace('"', '\\"')
+        )
+        for name, value in labels
+    )
+
+
+class PrometheusSink(MetricsRegistry):
+    def __init__(
+        self,
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+        namespace: str = "py_2ch_api",
+    ):
+        """
+        Registry that renders the Prometheus text exposition format
+        """
+        super().__init__(buckets)
+        self.namespace = namespace
+
+    def render(self) -> str:
+        with self._lock:
+            counters = sorted(self._counters.items(), key=itemgetter(0))
+            histograms = [
+                (key, list(histogram.cumulative()), histogram.sum)
+                for key, histogram in sorted(
+                    self._histograms.items(), key=itemgetter(0)
+                )
+            ]
+
+        lines = []
+        described = set()
+
+        def describe(name: str, kind: str) -> str:
+            full_name = f"{self.namespace}_{name}"
+
+            if name not in described:
+                described.add(name)
+                lines.append(f"# HELP {full_name} {_HELP.get(name, name)}")
+                lines.append(f"# TYPE {full_name} {kind}")
+
+            return full_name
+
+        for (name, labels), value in counters:
+            full_name = describe(name, "counter")
+            lines.append(f"{full_name}{_format_labels(labels)} {value}")
+
+        for (name, labels), buckets, total in histograms:
+            full_name = describe(name, "histogram")
+
+            for bound, count in buckets:
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(
+                    f"{full_name}_bucket"
+                    f"{_format_labels(labels, (('le', le),))} {count}"
+                )
+
+            lines.append(f"{full_name}_sum{_format_labels(labels)} {total}")
+            lines.append(
+                f"{full_name}_count{_format_labels(labels)} {buckets[-1][1]}"
+            )
+
+        return "\n".join(lines) + "\n"
+
+
+class CallbackSink(MetricsSink):
+    def __init__(self, callback: Callable[[str, str, Tuple, float], None]):
+        """
+        Forward every update as callback(kind, name, labels, value), kind
+        is "counter" or "histogram"
+        """
+        self.callback = callback
+
+    def increment(self, name: str, labels: Tuple = (), value: float = 1):
+        self.callback("counter", name, labels, value)
+
+    def observe(self, name: str, labels: Tuple, value: float):
+        self.callback("histogram", name, labels, value)
+
+
+@lru_cache(maxsize=1024)
+def _endpoint(url: str) -> Tuple:
+    # a client hits the same few URLs over and over, don't reparse them
+    return (("endpoint", classify(url)),)
+
+
+def record_request(
+    sink: MetricsSink,
+    url: str,
+    method: str,
+    status: int,
+    seconds: float,
+    bytes_in: int,
+    bytes_out: int = 0,
+):
+    endpoint = _endpoint(url)
+
+    sink.increment(
+        "requests_total", endpoint + (("method", method), ("status", status))
+    )
+    sink.observe("request_seconds", endpoint, seconds)
+    sink.increment("response_bytes_total", endpoint, bytes_in)
+
+    if bytes_out:
+        sink.increment("request_bytes_total", endpoint, bytes_out)
+
+
+def record_retry(sink: MetricsSink, url: str):
+    sink.increment("retries_total", _endpoint(url))
+
+
+def record_cache_hit(sink: MetricsSink, url: str):
+    sink.increment("cache_hits_total", _endpoint(url))
+
+
+def record_decode(sink: MetricsSink, url: str, seconds: float):
+    sink.observe("decode_seconds", _endpoint(url), seconds)
+
+
+def record_download(sink: MetricsSink, result):
+    """
+    result: DownloadResult
+    """
+    if not result.ok:
+        outcome = "error"
+    elif result.skipped:
+        outcome = "skipped"
+    elif result.deduplicated:
+        outcome = "deduplicated"
+    else:
+        outcome = "downloaded"
+
+    sink.increment("downloads_total", (("outcome", outcome),))
+
+    if outcome == "downloaded":
+        sink.observe("download_seconds", (), result.duration)
+
+    if result.bytes:
+        sink.increment("download_bytes_total", (), result.bytes)
+
+
+def record_task(
+    sink: MetricsSink, kind: str, wait: float, seconds: float, ok: bool
+):
+    labels = (("kind", kind),)
+
+    sink.increment(
+        "tasks_total", labels + (("outcome", "ok" if ok else "error"),)
+    )
+    sink.observe("task_wait_seconds", labels, wait)
+    sink.observe("task_seconds", labels, seconds)
@@ -1,50 +1,97 @@
 import os
-from typing import List
+from typing import List, Optional
 
 from addict import Dict
 
+from py_2ch_api.constants import POST_LIMITS
+from py_2ch_api.exceptions import ExtraFilesError, FileSizeError
+from py_2ch_api.multipart import MultipartBody
+
 
 class Board:
-    def __init__(self, board_data: Dict = None):
-        self.bump_limit = board_data.bump_limit
-        self.category = board_data.category
-        self.default_name = board_data.default_name
-        self.enable_names = board_data.enable_names
-        self.enable_sage = board_data.enable_sage
-        self.board_id = board_data.id
-        self.info = board_data.info
-        self.last_num = board_data.last_num
-        self.name = board_data.name
-        self.speed = board_data.speed
-        self.threads = board_data.threads
-        self.unique_posters = board_data.unique_posters
-        self.enable_dices = board_data.enable_dices
-        self.enable_flags = board_data.enable_flags
-        self.enable_icons = board_data.enable_icons
-        self.enable_likes = board_data.enable_likes
-        self.enable_oekaki = board_data.enable_oekaki
-        self.enable_posting = board_data.enable_posting
-        self.enable_shield = board_data.enable_shield
-        self.enable_subject = board_data.enable_subject
-        self.enable_thread_tags = board_data.enable_thread_tags
-        self.enable_trips = board_data.enable_trips
-        self.icons = board_data.icons
-        self.pages = board_data.pages
+    __slots__ = (
+        "bump_limit",
+        "category",
+        "default_name",
+        "enable_names",
+        "enable_sage",
+        "board_id",
+        "info",
+        "last_num",
+        "name",
+        "speed",
+        "threads",
+        "unique_posters",
+        "enable_dices",
+        "enable_flags",
+        "enable_icons",
+        "enable_likes",
+        "enable_oekaki",
+        "enable_posting",
+        "enable_shield",
+        "enable_subject",
+        "enable_thread_tags",
+        "enable_trips",
+        "icons",
+        "pages",
+    )
+
+    def __init__(self, board_data: dict = None):
+        get = board_data.get
+
+        self.bump_limit = get("bump_limit")
+        self.category = get("category")
+        self.default_name = get("default_name")
+        self.enable_names = get("enable_names")
+        self.enable_sage = get("enable_sage")
+        self.board_id = get("id")
+        self.info = get("info")
+        self.last_num = get("last_num")
+        self.name = get("name")
+        self.speed = get("speed")
+        self.threads = get("threads")
+        self.unique_posters = get("unique_posters")
+        self.enable_dices = get("enable_dices")
+        self.enable_flags = get("enable_flags")
+        self.enable_icons = get("enable_icons")
+        self.enable_likes = get("enable_likes")
+        self.enable_oekaki = get("enable_oekaki")
+        self.enable_posting = get("enable_posting")
+        self.enable_shield = get("enable_shield")
+        self.enable_subject = get("enable_subject")
+        self.enable_thread_tags = get("enable_thread_tags")
+        self.enable_trips = get("enable_trips")
+        self.icons = get("icons")
+        self.pages = get("pages")
 
     def __repr__(self):
         return f"<Settings: {self.board_id}>"
 
 
 class Thread:
-    def __init__(self, thread_data: Dict = None):
-        self.comment = thread_data.comment
-        self.lasthit = thread_data.lasthit
-        self.num = thread_data.num
-        self.posts_count = thread_data.posts_count
-        self.score = thread_data.score
-        self.subject = thread_data.subject
-        self.timestamp = thread_data.timestamp
-        self.views = thread_data.views
+    __slots__ = (
+        "comment",
+        "lasthit",
+        "num",
+        "posts_count",
+        "score",
+        "subject",
+        "timestamp",
+        "views",
+        "opening_post",
+    )
+
+    def __init__(self, thread_data: dict = None):
+        get = thread_data.get
+
+        self.comment = get("comment")
+        self.lasthit = get("lasthit")
+        self.num = get("num")
+        self.posts_count = get("posts_count")
+        self.score = get("score")
+        self.subject = get("subject")
+        self.timestamp = get("timestamp")
+        self.views = get("views")
         self.opening_post = Post(thread_data)
 
     def __repr__(self):
@@ -52,60 +99,196 @@ class Thread:
 
 
 class Post:
-    def __init__(self, post):
+    __slots__ = (
+        "banned",
+        "closed",
+        "comment",
+        "date",
+        "email",
+        "endless",
+        "files",
+        "lasthit",
+        "name",
+        "num",
+        "number",
+        "op",
+        "parent",
+        "sticky",
+        "subject",
+        "tags",
+        "timestamp",
+        "trip",
+    )
+
+    def __init__(self, post: dict):
         """
         Create object from dict with post info
         :param post: dict with post info
         """
-        self.banned = post.banned
-        self.closed = post.closed
-        self.comment = post.comment
-        self.date = post.date
-        self.email = post.email
-        self.endless = post.endless
-        self.files = [File(Dict(file)) for file in post.files]
-        self.lasthit = post.lasthit
-        self.name = post.name
-        self.num = post.num
-        self.number = post.number
-        self.op = post.op
-        self.parent = post.parent
-        self.sticky = post.sticky
-        self.subject = post.subject
-        self.tags = post.tags
-        self.timestamp = post.timestamp
-        self.trip = post.trip
+        get = post.get
+
+        self.banned = get("banned")
+        self.closed = get("closed")
+        self.comment = get("comment")
+        self.date = get("date")
+        self.email = get("email")
+        self.endless = get("endless")
+        self.files = [File(file) for file in get("files") or ()]
+        self.lasthit = get("lasthit")
+        self.name = get("name")
+        self.num = get("num")
+        self.number = get("number")
+        self.op = get("op")
+        self.parent = get("parent")
+        self.sticky = get("sticky")
+        self.subject = get("subject")
+        self.tags = get("tags")
+        self.timestamp = get("timestamp")
+        self.trip = get("trip")
 
     def __repr__(self):
         return f"<Post: {self.num}>"
 
 
 class File:
-    def __init__(self, file):
+    __slots__ = (
+        "displayname",
+        "fullname",
+        "height",
+        "md5",
+        "name",
+        "nsfw",
+        "path",
+        "size",
+        "thumbnail",
+        "tn_height",
+        "tn_width",
+        "type",
+        "width",
+        "duration",
+        "duration_secs",
+    )
+
+    def __init__(self, file: dict):
         """
             Create file object from dict of file params
             :param file: dict of file params
             """
-        self.displayname = file.displayname
-        self.fullname = file.fullname
-        self.height = file.height
-        self.md5 = file.md5
-        self.name = file.name
-        self.nsfw = file.nsfw
-        self.path = file.path
-        self.size = file.size
-        self.thumbnail = file.thumbnail
-        self.tn_height = file.tn_height
-        self.tn_width = file.tn_width
-        self.type = file.type
-        self.width = file.width
-        self.duration = file.duration if file.duration else None
-        self.duration_secs = file.duration_secs if file.duration_secs else None
+        get = file.get
+
+        self.displayname = get("displayname")
+        self.fullname = get("fullname")
+        self.height = get("height")
+        self.md5 = get("md5")
+        self.name = get("name")
+        self.nsfw = get("nsfw")
+        self.path = get("path")
+        self.size = get("size")
+        self.thumbnail = get("thumbnail")
+        self.tn_height = get("tn_height")
+        self.tn_width = get("tn_width")
+        self.type = get("type")
+        self.width = get("width")
+        self.duration = get("duration") or None
+        self.duration_secs = get("duration_secs") or None
 
     def __repr__(self):
         return f"<File: {self.name}>"
 
 
+def _field(key: str) -> property:
+    return property(lambda self: self._data.get(key), doc=key)
+
+
+class FileView:
+    """
+    Read-only File over the raw decoded dict, fields are read on access
+    """
+
+    __slots__ = ("_data",)
+
+    def __init__(self, file: dict):
+        self._data = file
+
+    @property
+    def duration(self):
+        return self._data.get("duration") or None
+
+    @property
+    def duration_secs(self):
+        return self._data.get("duration_secs") or None
+
+    def materialize(self) -> File:
+        return File(self._data)
+
+    def __repr__(self):
+        return f"<File: {self.name}>"
+
+
+class PostView:
+    """
+    Read-only Post over the raw decoded dict, files are wrapped on first
+    access only
+    """
+
+    __slots__ = ("_data", "_files")
+
+    def __init__(self, post: dict):
+        self._data = post
+        self._files = None
+
+    @property
+    def files(self) -> List[FileView]:
+        if self._files is None:
+            self._files = [
+                FileView(file) for file in self._data.get("files") or ()
+            ]
+
+        return self._files
+
+    def materialize(self) -> Post:
+        return Post(self._data)
+
+    def __repr__(self):
+        return f"<Post: {self.num}>"
+
+
+class ThreadView:
+    """
+    Read-only Thread over the raw catalog entry
+    """
+
+    __slots__ = ("_data", "_opening_post")
+
+    def __init__(self, thread_data: dict):
+        self._data = thread_data
+        self._opening_post = None
+
+    @property
+    def opening_post(self) -> PostView:
+        if self._opening_post is None:
+            self._opening_post = PostView(self._data)
+
+        return self._opening_post
+
+    def materialize(self) -> Thread:
+        return Thread(self._data)
+
+    def __repr__(self):
+        return f"<Thread: {self.num}"
+
+
+def _add_fields(view, model):
+    for name in model.__slots__:
+        if not hasattr(view, name):
+            setattr(view, name, _field(name))
+
+
+_add_fields(FileView, File)
+_add_fields(PostView, Post)
+_add_fields(ThreadView, Thread)
+
+
 class Message:
     def __init__(
         self,
@@ -125,11 +308,10 @@ class Message:
         self.subject = subject
         self.name = name
         self.sage = sage
-        self.files = files
-        self._files_data = {}
+        self.files = files or []
+        self.filesize = {"size": 0}
 
         self._generate_payload()
-        self._generate_files_payload()
 
     def _generate_payload(self):
         self.payload = Dict(
@@ -146,22 +328,42 @@ class Message:
             }
         )
 
-    def _generate_files_payload(self):
-        if self.files and len(self.files) <= 8:
-            self.filesize = {"size": 0}
-
-            try:
-                for file_name in self.files:
-                    with open(file_name, "rb") as current_file:
-                        self._files_data[
-                            current_file.name
-                        ] = current_file.read()
-
-                    self.filesize["size"] += (
-                        os.path.getsize(file_name) / 1000000
-                    )
-            except Exception as e:
-                print(f"IO Error: {e}")
-
-        else:
-            self._files_data = {"": ""}
+    def validate(
+        self, passcode: bool = False, max_file_size: Optional[float] = None
+    ):
+        """
+        Check the number and the total size of the attachments against
+        POST_LIMITS before anything is uploaded, files are only stat'ed
+
+        max_file_size: also check every file on its own against this
+            size in MB
+        """
+        max_files = (
+            POST_LIMITS.MAX_FILES_PASSCODE
+            if passcode
+            else POST_LIMITS.MAX_FILES
+        )
+        max_size = (
+            POST_LIMITS.MAX_SIZE_PASSCODE if passcode else POST_LIMITS.MAX_SIZE
+        )
+
+        if len(self.files) > max_files:
+            raise ExtraFilesError(len(self.files), passcode)
+
+        sizes = [
+            os.stat(file_name).st_size / 1000000 for file_name in self.files
+        ]
+        self.filesize["size"] = sum(sizes)
+
+        if self.filesize["size"] > max_size:
+            raise FileSizeError(round(self.filesize["size"], 2), passcode)
+
+        if max_file_size is not None and sizes and max(sizes) > max_file_size:
+            raise FileSizeError(round(max(sizes), 2), passcode)
+
+    def body(self) -> MultipartBody:
+        """
+        multipart/form-data body streaming the files from memory maps,
+        close it when the request is done
+        """
+        return MultipartBody(self.payload, self.files)
@@ -0,0 +1,156 @@
+import mimetypes
+import mmap
+import os
+import uuid
+from typing import Dict, Iterable
+
+
+class FileSource:
+    """
+    File attachment read through a memory map, slices of it are handed to
+    the socket without copying the file into Python bytes
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.name = os.path.basename(path)
+        self._file = open(path, "rb")
+        self.size = os.fstat(self._file.fileno()).st_size
+        # mmap can't map empty files
+        self._map = (
+            mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            if self.size
+            else None
+        )
+        self._view = memoryview(self._map if self.size else b"")
+
+    def __len__(self):
+        return self.size
+
+    def slice(self, start: int, end: int) -> memoryview:
+        return self._view[start:end]
+
+    def close(self):
+        try:
+            self._view.release()
+
+            if self._map is not None:
+                self._map.close()
+        except BufferError:
+            # a chunk is still referenced, the map is closed once it's
+            # garbage collected
+            pass
+
+        self._file.close()
+
+
+class MultipartBody:
+    def __init__(
+        self,
+        fields: Dict,
+        files: Iterable[str] = (),
+        file_field: str = "formimages[]",
+    ):
+        """
+        multipart/form-data body streamed from memory-mapped files
+
+        The length is known up front, so requests sends a Content-Length
+        instead of a chunked body, and `read` returns slices of the maps,
+        keeping memory use independent of the attachment sizes.
+        """
+        self.boundary = uuid.uuid4().hex
+        self._parts = []
+        self._sources = []
+
+        try:
+            for name, value in fields.items():
+                if value is None:
+                    continue
+
+                self._parts.append(
+                    self._header(name) + str(value).encode("utf-8") + b"\r\n"
+                )
+
+            for path in files:
+                source = FileSource(path)
+                self._sources.append(source)
+                content_type = (
+                    mimetypes.guess_type(source.name)[0]
+                    or "application/octet-stream"
+                )
+                self._parts.append(
+                    self._header(file_field, source.name, content_type)
+                )
+                self._parts.append(source)
+                self._parts.append(b"\r\n")
+        except OSError:
+            self.close()
+            raise
+
+        self._parts.append(f"--{self.boundary}--\r\n".encode("ascii"))
+        self._length = sum(len(part) for part in self._parts)
+        self._index = 0
+        self._offset = 0
+
+    def _header(
+        self, name: str, filename: str = None, content_type: str = None
+    ) -> bytes:
+        disposition = f'form-data; name="{name}"'
+
+        if filename is not None:
+            disposition += f'; filename="{filename}"'
+
+        header = f"--{self.boundary}\r\nContent-Disposition: {disposition}\r\n"
+
+        if content_type:
+            header += f"Content-Type: {content_type}\r\n"
+
+        return (header + "\r\n").encode("utf-8")
+
+    @property
+    def content_type(self) -> str:
+        return f"multipart/form-data; boundary={self.boundary}"
+
+    @property
+    def files_size(self) -> int:
+        return sum(source.size for source in self._sources)
+
+    def __len__(self):
+        return self._length
+
+    def read(self, size: int = -1):
+        """
+        Return at most `size` bytes of the body, a memoryview when they
+        come from an attachment
+        """
+        while self._index < len(self._parts):
+            part = self._parts[self._index]
+            end = len(part) if size < 0 else self._offset + size
+            end = min(end, len(part))
+
+            if self._offset < end:
+                if isinstance(part, FileSource):
+                    chunk = part.slice(self._offset, end)
+                else:
+                    chunk = part[self._offset : end]
+
+                self._offset = end
+
+                return chunk
+
+            self._index += 1
+            self._offset = 0
+
+        return b""
+
+    def close(self):
+        for source in self._sources:
+            source.close()
+
+        self._sources = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
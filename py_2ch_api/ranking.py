@@ -0,0 +1,193 @@
+import heapq
+import time
+from operator import itemgetter
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from py_2ch_api.constants import TOP_METHODS, CATALOG_EVENT
+
+# half-life in hours of the score decay used by TOP_METHODS.RECENCY
+RECENCY_HALF_LIFE = 6
+
+# methods whose keys change as time passes
+TIME_BASED_METHODS = frozenset(
+    (
+        TOP_METHODS.POSTS_PER_HOUR,
+        TOP_METHODS.VIEWS_PER_HOUR,
+        TOP_METHODS.RECENCY,
+    )
+)
+
+
+def _age_hours(timestamp: Optional[int], now: float) -> float:
+    # threads younger than a minute would get absurd per-hour rates
+    return max((now - (timestamp or now)) / 3600, 1 / 60)
+
+
+def rank_key(method: str, now: float = None) -> Optional[Callable]:
+    """
+    Return a key function for `method` or None if the method is unknown
+
+    Time-based methods are evaluated against `now`, current time if None.
+    """
+    now = time.time() if now is None else now
+
+    if method == TOP_METHODS.VIEWS:
+        return lambda thread: (thread.views or 0, thread.score or 0)
+    if method == TOP_METHODS.POSTS:
+        return lambda thread: (thread.posts_count or 0, thread.views or 0)
+    if method == TOP_METHODS.SCORE:
+        return lambda thread: (thread.score or 0, thread.views or 0)
+    if method == TOP_METHODS.POSTS_PER_HOUR:
+        return lambda thread: (thread.posts_count or 0) / _age_hours(
+            thread.timestamp, now
+        )
+    if method == TOP_METHODS.VIEWS_PER_HOUR:
+        return lambda thread: (thread.views or 0) / _age_hours(
+            thread.timestamp, now
+        )
+    if method == TOP_METHODS.RECENCY:
+        return lambda thread: (thread.score or 0) * 0.5 ** (
+            _age_hours(thread.lasthit, now) / RECENCY_HALF_LIFE
+        )
+
+    return None
+
+
+def rank_threads(
+    threads: Iterable,
+    method: str = TOP_METHODS.VIEWS,
+    limit: int = 5,
+    now: float = None,
+) -> List:
+    """
+    Return the `limit` best threads without sorting the whole catalog,
+    all of them sorted if `limit` is None
+    """
+    key = rank_key(method, now)
+
+    if key is None:
+        return []
+
+    if limit is None:
+        return sorted(threads, key=key, reverse=True)
+
+    return heapq.nlargest(limit, threads, key=key)
+
+
+class RollingTopN:
+    def __init__(
+        self,
+        method: str = TOP_METHODS.VIEWS,
+        limit: int = 5,
+        now: Callable[[], float] = time.time,
+    ):
+        """
+        Top-N threads across boards kept up to date from catalog updates
+
+        Every thread's key is computed when it is updated. The top list is
+        only rebuilt when an update can change it: a thread in the top
+        changed or dropped, or a new key beats the current minimum.
+
+        Keys of TIME_BASED_METHODS go stale as time passes, so for those
+        `top` re-ranks every thread against the current time.
+        """
+        if rank_key(method) is None:
+            raise ValueError(f"Unknown top method: {method}")
+
+        self.method = method
+        self.limit = limit
+        self._now = now
+        self._time_based = method in TIME_BASED_METHODS
+        self._entries = {}
+        self._top = []
+        self._top_keys = set()
+        self._dirty = False
+
+    def _min_key(self):
+        return self._top[-1][0] if len(self._top) >= self.limit else None
+
+    def update(self, board: str, thread):
+        entry_key = (board, thread.num)
+
+        if self._time_based:
+            # ranked in `top`, a key computed now would be stale by then
+            self._entries[entry_key] = (None, entry_key, thread)
+            return
+
+        key = rank_key(self.method, self._now())(thread)
+        self._entries[entry_key] = (key, entry_key, thread)
+
+        if entry_key in self._top_keys:
+            self._dirty = True
+        else:
+            min_key = self._min_key()
+
+            if min_key is None or key > min_key:
+                self._dirty = True
+
+    def update_many(self, board: str, threads: Iterable):
+        for thread in threads:
+            self.update(board, thread)
+
+    def replace_board(self, board: str, threads: Iterable):
+        """
+        Use a full catalog of a board, threads missing from it are dropped
+        """
+        threads = list(threads)
+        current = {thread.num for thread in threads}
+
+        for entry_board, num in list(self._entries):
+            if entry_board == board and num not in current:
+                self.remove(board, num)
+
+        self.update_many(board, threads)
+
+    def remove(self, board: str, num: int):
+        entry_key = (board, num)
+
+        if self._entries.pop(entry_key, None) is not None:
+            if entry_key in self._top_keys:
+                self._dirty = True
+
+    def apply(self, events: Iterable):
+        """
+        Feed CatalogEvent objects from a CatalogPoller
+        """
+        for event in events:
+            if event.kind == CATALOG_EVENT.DROPPED:
+                self.remove(event.board, event.num)
+            else:
+                self.update(event.board, event.thread)
+
+    def top(self) -> List[Tuple[str, object]]:
+        """
+        Return (board, thread) pairs, best first
+        """
+        if self._dirty or self._time_based:
+            self._top = heapq.nlargest(
+                self.limit, self._ranked(), key=itemgetter(0)
+            )
+            self._top_keys = {entry_key for _, entry_key, _ in self._top}
+            self._dirty = False
+
+        return [(entry_key[0], thread) for _, entry_key, thread in self._top]
+
+    def _ranked(self) -> Iterable[Tuple]:
+        """
+        Entries with keys of time-based methods computed against one `now`
+        """
+        if not self._time_based:
+            return self._entries.values()
+
+        key = rank_key(self.method, self._now())
+
+        return (
+            (key(thread), entry_key, thread)
+            for _, entry_key, thread in self._entries.values()
+        )
+
+    def __len__(self):
+        return len(self._entries)
+
+    def scores(self) -> Dict[Tuple[str, int], object]:
+        return {entry_key: key for key, entry_key, _ in self._ranked()}
@@ -0,0 +1,207 @@
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Iterable, Optional, Tuple
+from urllib.parse import urlsplit
+
+from py_2ch_api.constants import ENDPOINT
+
+# requests per second and burst size for every endpoint class
+DEFAULT_RATES = {
+    ENDPOINT.CATALOG: (2.0, 5),
+    ENDPOINT.THREAD: (5.0, 10),
+    ENDPOINT.MEDIA: (10.0, 20),
+    ENDPOINT.MAKABA: (1.0, 2),
+    ENDPOINT.OTHER: (5.0, 10),
+}
+
+
+def classify(path: str) -> str:
+    """
+    Map a makaba URL or path to one of ENDPOINT
+    """
+    path = urlsplit(path).path
+
+    if path.startswith("/makaba/"):
+        return ENDPOINT.MAKABA
+    if path.endswith("/catalog.json"):
+        return ENDPOINT.CATALOG
+    if "/res/" in path and path.endswith(".json"):
+        return ENDPOINT.THREAD
+    if "/src/" in path or "/thumb/" in path:
+        return ENDPOINT.MEDIA
+
+    return ENDPOINT.OTHER
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.acquired = 0
+        self.throttled = 0
+        self.waited = 0.0
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(
+            self.burst, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    def reserve(self) -> float:
+        """
+        Take a token and return how long the caller must wait before using
+        it; callers queue up by driving the balance below zero
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens -= 1
+            self.acquired += 1
+
+            delay = -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+            if delay:
+                self.throttled += 1
+                self.waited += delay
+
+            return delay
+
+    @property
+    def tokens(self) -> float:
+        with self._lock:
+            self._refill(time.monotonic())
+
+            return self._tokens
+
+    def stats(self) -> Dict:
+        return {
+            "rate": self.rate,
+            "burst": self.burst,
+            "tokens": round(self.tokens, 3),
+            "acquired": self.acquired,
+            "throttled": self.throttled,
+            "waited": round(self.waited, 3),
+        }
+
+
+class RateLimiter:
+    def __init__(self, rates: Dict[str, Tuple[float, int]] = None):
+        """
+        Token buckets per (host, endpoint class)
+
+        rates: ENDPOINT -> (requests per second, burst), merged over
+            DEFAULT_RATES
+        """
+        self.rates = dict(DEFAULT_RATES, **(rates or {}))
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, url: str) -> TokenBucket:
+        key = (urlsplit(url).netloc, classify(url))
+        bucket = self._buckets.get(key)
+
+        if bucket is None:
+            with self._lock:
+                bucket = self._buckets.get(key)
+
+                if bucket is None:
+                    bucket = self._buckets[key] = TokenBucket(
+                        *self.rates[key[1]]
+                    )
+
+        return bucket
+
+    def reserve(self, url: str) -> float:
+        return self.bucket(url).reserve()
+
+    def acquire(self, url: str):
+        """
+        Block the calling thread until a request to `url` is allowed
+        """
+        delay = self.reserve(url)
+
+        if delay:
+            time.sleep(delay)
+
+    def stats(self) -> Dict[str, Dict]:
+        return {
+            f"{host}/{endpoint}": bucket.stats()
+            for (host, endpoint), bucket in list(self._buckets.items())
+        }
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class RetryPolicy:
+    def __init__(
+        self,
+        retries: int = 3,
+        backoff: float = 0.5,
+        max_backoff: float = 30,
+        max_retry_after: float = 120,
+        statuses: Iterable[int] = (429, 500, 502, 503, 504),
+    ):
+        """
+        Retries with full-jitter exponential backoff
+
+        A `Retry-After` header, capped at max_retry_after, takes precedence
+        over the computed backoff.
+        """
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.max_retry_after = max_retry_after
+        self.statuses = frozenset(statuses)
+        self.retried = 0
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # locks can't be pickled, e.g. into crawl_boards workers
+        state = self.__dict__.copy()
+        del state["_lock"]
+
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def should_retry(self, attempt: int, status_code: int = None) -> bool:
+        """
+        status_code: None for connection errors and timeouts
+        """
+        return attempt < self.retries and (
+            status_code is None or status_code in self.statuses
+        )
+
+    def delay(self, attempt: int, headers=None) -> float:
+        with self._lock:
+            self.retried += 1
+
+        retry_after = parse_retry_after(
+            headers.get("Retry-After") if headers else None
+        )
+
+        if retry_after is not None:
+            return min(retry_after, self.max_retry_after)
+
+        return random.uniform(
+            0, min(self.max_backoff, self.backoff * 2 ** attempt)
+        )
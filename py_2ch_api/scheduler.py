@@ -0,0 +1,223 @@
+import itertools
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from concurrent.futures.thread import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+from py_2ch_api.constants import TASK_PRIORITY
+from py_2ch_api.metrics import MetricsSink, record_task
+
+
+class TaskStats:
+    __slots__ = ("count", "errors", "wait", "seconds", "max_seconds")
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.wait = 0.0
+        self.seconds = 0.0
+        self.max_seconds = 0.0
+
+    def add(self, wait: float, seconds: float, ok: bool):
+        self.count += 1
+        self.errors += not ok
+        self.wait += wait
+        self.seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+
+    def stats(self) -> Dict:
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "avg_wait": round(self.wait / self.count, 6),
+            "avg_seconds": round(self.seconds / self.count, 6),
+            "max_seconds": round(self.max_seconds, 6),
+        }
+
+
+class _Task:
+    __slots__ = ("fn", "args", "kwargs", "kind", "future", "queued", "started")
+
+    def __init__(self, fn: Callable, args, kwargs, kind: str):
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.kind = kind
+        self.future = Future()
+        self.queued = time.perf_counter()
+        self.started = None
+
+
+# sorts after every task, so pending tasks still run on shutdown
+_STOP = (float("inf"), 0, None)
+
+
+class CrawlScheduler:
+    def __init__(
+        self,
+        workers: int = 10,
+        max_pending: int = 1000,
+        processes: bool = False,
+        submit_timeout: Optional[float] = None,
+        metrics: Optional[MetricsSink] = None,
+    ):
+        """
+        Long-lived pool running crawl tasks by priority
+
+        Tasks wait in a priority queue (TASK_PRIORITY, lower first, FIFO
+        within a priority) and are handed to the executor only when a
+        worker is free, so a late hot thread overtakes queued media.
+
+        max_pending: queue depth, `submit` blocks when it's reached
+        processes: run tasks in a process pool, for CPU-heavy post
+            processing, tasks and their results must be picklable, so
+            ChAPI's schedule_* methods can't use it
+        submit_timeout: seconds `submit` waits for room in the queue
+            before raising queue.Full, None waits forever
+        metrics: sink for task counts and timings
+        """
+        self.workers = workers
+        self.processes = processes
+        self.submit_timeout = submit_timeout
+        self._metrics = metrics or MetricsSink()
+        self._queue = queue.PriorityQueue(maxsize=max_pending)
+        self._slots = threading.Semaphore(workers)
+        self._counter = itertools.count()
+        self._stats = {}
+        self._stats_lock = threading.Lock()
+        self._closed = False
+        if processes:
+            # multiprocessing is slow to import, only pay for it here
+            from concurrent.futures import ProcessPoolExecutor
+
+            self._executor = ProcessPoolExecutor(max_workers=workers)
+        else:
+            self._executor = ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="py-2ch-crawl"
+            )
+        self._dispatcher = threading.Thread(
+            target=self._dispatch, name="py-2ch-crawl-dispatcher", daemon=True
+        )
+        self._dispatcher.start()
+
+    def submit(
+        self,
+        fn: Callable,
+        *args,
+        priority: int = TASK_PRIORITY.MEDIA,
+        kind: str = None,
+        **kwargs,
+    ) -> Future:
+        """
+        Queue `fn(*args, **kwargs)`
+
+        kind: name the timing stats are kept under, the function name by
+            default
+        """
+        if self._closed:
+            raise RuntimeError("cannot schedule new tasks after shutdown")
+
+        task = _Task(fn, args, kwargs, kind or getattr(fn, "__name__", "task"))
+        self._queue.put(
+            (priority, next(self._counter), task),
+            timeout=self.submit_timeout,
+        )
+
+        return task.future
+
+    def _dispatch(self):
+        while True:
+            self._slots.acquire()
+            _, _, task = self._queue.get()
+
+            if task is None:
+                # every queued task is in the executor by now
+                self._executor.shutdown(wait=True)
+                return
+
+            if not task.future.set_running_or_notify_cancel():
+                self._slots.release()
+                continue
+
+            task.started = time.perf_counter()
+
+            try:
+                inner = self._executor.submit(
+                    task.fn, *task.args, **task.kwargs
+                )
+            except Exception as e:
+                self._complete(task, None, e)
+                continue
+
+            inner.add_done_callback(
+                lambda inner, task=task: self._complete(
+                    task, inner, inner.exception()
+                )
+            )
+
+    def _complete(
+        self, task: _Task, inner: Optional[Future], error: Optional[Exception]
+    ):
+        self._slots.release()
+
+        finished = time.perf_counter()
+        wait = task.started - task.queued
+        seconds = finished - task.started
+
+        with self._stats_lock:
+            stats = self._stats.get(task.kind)
+
+            if stats is None:
+                stats = self._stats[task.kind] = TaskStats()
+
+            stats.add(wait, seconds, error is None)
+
+        record_task(self._metrics, task.kind, wait, seconds, error is None)
+
+        if error is not None:
+            task.future.set_exception(error)
+        else:
+            task.future.set_result(inner.result())
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def stats(self) -> Dict[str, Dict]:
+        """
+        Count, errors, average queue wait and run time per task kind
+        """
+        with self._stats_lock:
+            return {kind: stats.stats() for kind, stats in self._stats.items()}
+
+    def shutdown(self, wait: bool = True, cancel_pending: bool = False):
+        """
+        Stop accepting tasks, queued ones still run unless
+        `cancel_pending` is set
+        """
+        if self._closed:
+            return
+
+        self._closed = True
+
+        if cancel_pending:
+            while True:
+                try:
+                    _, _, task = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+
+                task.future.cancel()
+
+        self._queue.put(_STOP)
+
+        if wait:
+            self._dispatcher.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.shutdown()
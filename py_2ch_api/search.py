@@ -0,0 +1,273 @@
+import html
+import re
+from bisect import bisect_left
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from py_2ch_api.constants import CATALOG_EVENT
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_TOKEN_RE = re.compile(r"\w+")
+
+# query prefix that matches a thread tag instead of subject/comment tokens
+TAG_PREFIX = "tag:"
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """
+    Lowercased word tokens of a subject or an HTML comment
+    """
+    if not text:
+        return []
+
+    if "<" in text or "&" in text:
+        text = html.unescape(_TAG_RE.sub(" ", text))
+
+    return _TOKEN_RE.findall(text.lower())
+
+
+def _thread_fields(thread) -> Tuple:
+    """
+    (num, subject, tags, comment) of a raw catalog dict or a thread model
+    """
+    if isinstance(thread, dict):
+        get = thread.get
+        return get("num"), get("subject"), get("tags"), get("comment")
+
+    return (
+        thread.num,
+        thread.subject,
+        thread.opening_post.tags,
+        thread.comment,
+    )
+
+
+class ThreadIndex:
+    def __init__(self, comments: bool = False):
+        """
+        Inverted index over thread subjects and tags, optionally comments
+
+        Threads are keyed by (board, num) and can be raw catalog dicts,
+        Thread or ThreadView objects. Queries are matched token by token,
+        every query token must match; with `prefix` a query token matches
+        every indexed token starting with it. `tag:<name>` query tokens
+        match the thread tag exactly.
+
+        comments: also index the opening post text
+        """
+        self.comments = comments
+        self._postings = {}
+        self._tags = {}
+        self._docs = {}
+        self._vocabulary = []
+        self._vocabulary_dirty = False
+
+    def _source(self, thread) -> Tuple[int, Tuple]:
+        num, subject, tags, comment = _thread_fields(thread)
+
+        return num, (subject, tags, comment if self.comments else None)
+
+    def add(self, board: str, thread):
+        """
+        Index a thread or reindex it if its subject, tag or comment changed
+        """
+        num, source = self._source(thread)
+        key = (board, num)
+        doc = self._docs.get(key)
+
+        if doc is not None:
+            if doc[0] == source:
+                return
+
+            self.remove(board, num)
+
+        subject, tags, comment = source
+        tokens = frozenset(tokenize(subject) + tokenize(comment))
+        tag = tags.lower() if tags else None
+
+        for token in tokens:
+            postings = self._postings.get(token)
+
+            if postings is None:
+                postings = self._postings[token] = set()
+                self._vocabulary_dirty = True
+
+            postings.add(key)
+
+        if tag:
+            self._tags.setdefault(tag, set()).add(key)
+
+        self._docs[key] = (source, tokens, tag)
+
+    def add_many(self, board: str, threads: Iterable):
+        for thread in threads:
+            self.add(board, thread)
+
+    def replace_board(self, board: str, threads: Iterable):
+        """
+        Use a full catalog of a board, threads missing from it are dropped
+        """
+        current = set()
+
+        for thread in threads:
+            self.add(board, thread)
+            current.add(_thread_fields(thread)[0])
+
+        for entry_board, num in list(self._docs):
+            if entry_board == board and num not in current:
+                self.remove(board, num)
+
+    def remove(self, board: str, num: int):
+        key = (board, num)
+        doc = self._docs.pop(key, None)
+
+        if doc is None:
+            return
+
+        _, tokens, tag = doc
+
+        for token in tokens:
+            postings = self._postings[token]
+            postings.discard(key)
+
+            if not postings:
+                del self._postings[token]
+                self._vocabulary_dirty = True
+
+        if tag:
+            self._tags[tag].discard(key)
+
+            if not self._tags[tag]:
+                del self._tags[tag]
+
+    def apply(self, events: Iterable):
+        """
+        Feed CatalogEvent objects from a CatalogPoller
+        """
+        for event in events:
+            if event.kind == CATALOG_EVENT.DROPPED:
+                self.remove(event.board, event.num)
+            else:
+                self.add(event.board, event.thread)
+
+    def _expand(self, token: str) -> List[str]:
+        """
+        Indexed tokens starting with `token`, found by bisecting the sorted
+        vocabulary
+        """
+        if self._vocabulary_dirty:
+            self._vocabulary = sorted(self._postings)
+            self._vocabulary_dirty = False
+
+        vocabulary = self._vocabulary
+        start = bisect_left(vocabulary, token)
+        end = start
+
+        while end < len(vocabulary) and vocabulary[end].startswith(token):
+            end += 1
+
+        return vocabulary[start:end]
+
+    def _matches(
+        self, token: str, prefix: bool, memo: Dict
+    ) -> FrozenSet[Tuple[str, int]]:
+        result = memo.get(token)
+
+        if result is not None:
+            return result
+
+        if token.startswith(TAG_PREFIX):
+            result = frozenset(self._tags.get(token[len(TAG_PREFIX) :], ()))
+        elif prefix:
+            result = frozenset().union(
+                *(self._postings[match] for match in self._expand(token))
+            )
+        else:
+            result = frozenset(self._postings.get(token, ()))
+
+        memo[token] = result
+
+        return result
+
+    @staticmethod
+    def _query_tokens(query: str) -> List[str]:
+        tokens = []
+
+        for word in query.split():
+            if word.lower().startswith(TAG_PREFIX):
+                tokens.append(word.lower())
+            else:
+                tokens.extend(tokenize(word))
+
+        return tokens
+
+    def _search(
+        self,
+        query: str,
+        board: Optional[str],
+        prefix: bool,
+        memo: Dict,
+    ) -> List[Tuple[str, int]]:
+        tokens = self._query_tokens(query)
+
+        if not tokens:
+            return []
+
+        # intersect starting from the rarest token
+        matches = sorted(
+            (self._matches(token, prefix, memo) for token in tokens), key=len
+        )
+        result = set(matches[0])
+
+        for match in matches[1:]:
+            if not result:
+                break
+            result &= match
+
+        if board is not None:
+            result = {key for key in result if key[0] == board}
+
+        return sorted(result)
+
+    def search(
+        self,
+        query: str = "",
+        tag: str = None,
+        board: str = None,
+        prefix: bool = True,
+    ) -> List[Tuple[str, int]]:
+        """
+        Return sorted (board, num) keys of the threads matching the query
+
+        tag: shortcut for a `tag:<name>` query token
+        board: only return threads of this board
+        """
+        if tag:
+            query = f"{query} {TAG_PREFIX}{tag}"
+
+        return self._search(query, board, prefix, {})
+
+    def search_many(
+        self,
+        queries: Iterable[str],
+        board: str = None,
+        prefix: bool = True,
+    ) -> Dict[str, List[Tuple[str, int]]]:
+        """
+        Answer many queries at once, the posting lists of tokens shared
+        between queries are looked up and merged only once
+        """
+        memo = {}
+
+        return {
+            query: self._search(query, board, prefix, memo)
+            for query in queries
+        }
+
+    def boards(self) -> Set[str]:
+        return {board for board, _ in self._docs}
+
+    def __contains__(self, key: Tuple[str, int]) -> bool:
+        return key in self._docs
+
+    def __len__(self):
+        return len(self._docs)
@@ -1,31 +1,117 @@
-from json import JSONDecodeError
+import threading
+import time
 from typing import Optional, Dict
-from addict import Dict as JSON_Parse
-from urllib.parse import urljoin
+from urllib.parse import urljoin, urlencode
 
 import requests
+from requests.adapters import HTTPAdapter
 
+from py_2ch_api.constants import USER_AGENT, JSON_DECODER
+from py_2ch_api.decoders import get_decoder, parse_json
 from py_2ch_api.exceptions import RequestError
+from py_2ch_api.http_cache import ResponseCache
+from py_2ch_api.metrics import (
+    MetricsSink,
+    record_cache_hit,
+    record_decode,
+    record_request,
+    record_retry,
+)
+from py_2ch_api.ratelimit import RateLimiter, RetryPolicy
+
+IDEMPOTENT = ("get", "head", "options")
+
+# connections kept open per host, requests' own default
+DEFAULT_POOL_SIZE = 10
+
+
+def make_session(
+    pool_size: int = DEFAULT_POOL_SIZE, proxies: Dict = None
+) -> requests.Session:
+    """
+    Session whose adapters keep up to `pool_size` keep-alive connections
+    per host, so that many threads can share it without reconnecting
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+    if proxies:
+        session.proxies.update(proxies)
+
+    return session
 
 
 class GenericRequestProvider:
-    def __init__(self, base_url: str = "https://2ch.hk", proxies: Dict = None):
+    def __init__(
+        self,
+        base_url: str = "https://2ch.hk",
+        proxies: Dict = None,
+        cache: Optional[ResponseCache] = None,
+        decoder: str = JSON_DECODER.STDLIB,
+        raw: bool = False,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        metrics: Optional[MetricsSink] = None,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        media_pool_size: int = DEFAULT_POOL_SIZE,
+    ):
+        """
+        cache: conditional GET cache for JSON responses, disabled if None
+        decoder: one of JSON_DECODER
+        raw: return plain dicts and lists instead of addict wrappers
+        rate_limiter: throttles requests per host and endpoint class
+        retry_policy: retries GET requests on 429/5xx and connection errors
+        metrics: receives latency, size, status, retry, cache and decode
+            metrics of every request, nothing is measured if None
+        pool_size: keep-alive connections per host for API requests, set
+            it to the number of threads sharing the client
+        media_pool_size: connections per host of the separate media
+            session, so downloads don't take connections from API calls
+        """
         self._base_url = base_url
-        self._session = requests.Session()
         self._proxies = proxies
+        self._media_pool_size = media_pool_size
+        self._session = make_session(pool_size, proxies)
+        self._media_session = None
+        self._session_lock = threading.Lock()
+        self._cache = cache
+        self._decode = get_decoder(decoder)
+        self._raw = raw
+        self._rate_limiter = rate_limiter
+        self._retry_policy = retry_policy
+        self._metrics = metrics
 
-        if self._proxies:
-            self._session.proxies.update(self._proxies)
+    @property
+    def media_session(self) -> requests.Session:
+        """
+        Session used for media downloads, created on first use
+        """
+        with self._session_lock:
+            if self._media_session is None:
+                self._media_session = make_session(
+                    self._media_pool_size, self._proxies
+                )
 
-    def __enter__(self):
-        if not self._session:
-            self._session = requests.Session()
+            return self._media_session
 
+    def __enter__(self):
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """
+        Close pooled connections, sessions reconnect if used again
+        """
         self._session.close()
 
+        with self._session_lock:
+            if self._media_session is not None:
+                self._media_session.close()
+
     def _request(
         self,
         method: str = None,
@@ -41,16 +127,30 @@ class GenericRequestProvider:
 
         headers.update(extra_headers or {})
 
-        headers[
-            "User-agent"
-        ] = "Mozilla/5.0 (Windows NT 6.1; rv:52.0) Gecko/20100101 Firefox/52.0"
+        headers["User-agent"] = USER_AGENT
 
         params = kwargs.pop("params", {})
         params.update(extra_params or {})
 
         timeout = kwargs.pop("timeout", 20)
 
-        r = self._session.request(
+        cache_key = cache_entry = None
+
+        if (
+            self._cache is not None
+            and method == "get"
+            and "data" not in kwargs
+        ):
+            cache_key = self._cache_key(url, params)
+            cache_entry = self._cache.lookup(cache_key)
+            headers.update(self._cache.conditional_headers(cache_entry))
+
+        metrics = self._metrics
+
+        if metrics is not None:
+            started = time.perf_counter()
+
+        r = self._send(
             method,
             url,
             headers=headers,
@@ -59,14 +159,148 @@ class GenericRequestProvider:
             **kwargs
         )
 
+        if metrics is not None:
+            record_request(
+                metrics,
+                url,
+                method,
+                r.status_code,
+                time.perf_counter() - started,
+                len(r.content),
+                int(r.request.headers.get("Content-Length") or 0),
+            )
+
+        if r.status_code == 304 and cache_entry is not None:
+            try:
+                value = self._cache.hit(cache_key, cache_entry)
+            except KeyError:
+                # evicted by another process since the lookup, fetch the
+                # whole body
+                for name in self._cache.conditional_headers(cache_entry):
+                    headers.pop(name, None)
+
+                r = self._send(
+                    method,
+                    url,
+                    headers=headers,
+                    params=params,
+                    timeout=timeout,
+                    **kwargs
+                )
+            else:
+                if metrics is not None:
+                    record_cache_hit(metrics, url)
+
+                return value
+
         if r.status_code != status_code:
             raise RequestError(r, status_code)
 
+        if metrics is not None:
+            started = time.perf_counter()
+
         try:
-            return JSON_Parse(r.json())
-        except JSONDecodeError:
+            data = self._parse(r.content)
+        except ValueError:
             return r
 
+        if metrics is not None:
+            record_decode(metrics, url, time.perf_counter() - started)
+
+        if cache_key is not None:
+            self._cache.store(cache_key, r.headers, data, len(r.content))
+
+        return data
+
+    def _send(
+        self,
+        method: str,
+        url: str,
+        session: Optional[requests.Session] = None,
+        **kwargs
+    ) -> requests.Response:
+        session = session or self._session
+        retry_policy = self._retry_policy if method in IDEMPOTENT else None
+        attempt = 0
+
+        while True:
+            if self._rate_limiter is not None:
+                self._rate_limiter.acquire(url)
+
+            try:
+                r = session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if retry_policy is None or not retry_policy.should_retry(
+                    attempt
+                ):
+                    raise
+
+                if self._metrics is not None:
+                    record_retry(self._metrics, url)
+
+                time.sleep(retry_policy.delay(attempt))
+            else:
+                if retry_policy is None or not retry_policy.should_retry(
+                    attempt, r.status_code
+                ):
+                    return r
+
+                if self._metrics is not None:
+                    record_retry(self._metrics, url)
+
+                time.sleep(retry_policy.delay(attempt, r.headers))
+                r.close()
+
+            attempt += 1
+
+    def get_media(self, path: str, timeout: int = 60) -> bytes:
+        """
+        Body of a small media file, e.g. a thumbnail, over the media
+        session with the rate limiting, retries and metrics of API
+        requests; large files go through Downloader
+        """
+        url = self.build_url(path)
+        metrics = self._metrics
+
+        if metrics is not None:
+            started = time.perf_counter()
+
+        r = self._send(
+            "get",
+            url,
+            session=self.media_session,
+            headers={"User-agent": USER_AGENT},
+            timeout=timeout,
+        )
+
+        if metrics is not None:
+            record_request(
+                metrics,
+                url,
+                "get",
+                r.status_code,
+                time.perf_counter() - started,
+                len(r.content),
+                0,
+            )
+
+        if r.status_code != 200:
+            raise RequestError(r, 200)
+
+        return r.content
+
+    def _parse(self, content: bytes):
+        data = self._decode(content)
+
+        return data if self._raw else parse_json(data)
+
+    @staticmethod
+    def _cache_key(url: str, params: Dict) -> str:
+        if not params:
+            return url
+
+        return f"{url}?{urlencode(sorted(params.items()))}"
+
     def build_url(self, path: str = None) -> str:
         return urljoin(self._base_url, path.lstrip("/"))
 
@@ -0,0 +1,275 @@
+import time
+from typing import Iterator, List, Optional, Set
+
+from py_2ch_api.exceptions import RequestError, ThreadArchivedError
+from py_2ch_api.models import Post, Thread, ThreadView
+
+
+class ThreadState:
+    __slots__ = (
+        "board",
+        "num",
+        "last_num",
+        "last_number",
+        "lasthit",
+        "seen",
+        "deleted",
+        "archived",
+    )
+
+    def __init__(self, board: str, num: int):
+        self.board = board
+        self.num = num
+        self.last_num = 0
+        self.last_number = 0
+        self.lasthit = None
+        self.seen = set()
+        self.deleted = set()
+        self.archived = False
+
+    def __repr__(self):
+        return f"<ThreadState: {self.board}/{self.num} last={self.last_num}>"
+
+
+class BaseThreadWatcher:
+    def __init__(
+        self,
+        client,
+        thread,
+        board: str = None,
+        interval: float = 10,
+        incremental: bool = True,
+    ):
+        """
+        Keep track of a thread and return only posts that weren't seen yet
+
+        incremental: ask makaba's mobile API for posts after the last seen
+            one instead of downloading the whole thread every poll; falls
+            back to a full diff whenever the answer can't be trusted
+        """
+        if isinstance(thread, (Thread, ThreadView)):
+            thread = thread.num
+
+        self.client = client
+        self.interval = interval
+        self.incremental = incremental
+        self.state = ThreadState(board, int(thread))
+        self._last_response = None
+
+    @property
+    def archived(self) -> bool:
+        return self.state.archived
+
+    @property
+    def deleted(self) -> Set[int]:
+        return self.state.deleted
+
+    def _thread_path(self) -> str:
+        return f"/{self.state.board}/res/{self.state.num}.json"
+
+    def _incremental_params(self) -> dict:
+        # ask for the last seen post again, it's used to check that the
+        # ordinal numbers didn't shift because of deleted posts
+        return {
+            "task": "get_thread",
+            "board": self.state.board,
+            "thread": self.state.num,
+            "post": max(self.state.last_number, 1),
+        }
+
+    def _use_incremental(self) -> bool:
+        return self.incremental and self.state.last_number > 0
+
+    def _skip(self, lasthit: Optional[int]) -> bool:
+        return self.state.archived or (
+            lasthit is not None and lasthit == self.state.lasthit
+        )
+
+    def _new_posts(self, raw_posts) -> List[Post]:
+        state = self.state
+        result = []
+
+        for raw_post in raw_posts:
+            num = raw_post["num"]
+
+            if num > state.last_num:
+                result.append(Post(raw_post))
+                state.seen.add(num)
+                state.last_num = num
+                state.last_number = raw_post.get("number") or (
+                    state.last_number + 1
+                )
+
+        return result
+
+    def _process_full(self, response) -> List[Post]:
+        if response is self._last_response:
+            # 304 from the response cache, nothing changed
+            return []
+
+        self._last_response = response
+        raw_posts = response["threads"][0]["posts"]
+
+        if raw_posts:
+            self.state.lasthit = raw_posts[0].get("lasthit")
+
+        nums = {raw_post["num"] for raw_post in raw_posts}
+        self.state.deleted |= self.state.seen - nums
+        self.state.seen &= nums
+
+        return self._new_posts(raw_posts)
+
+    def _process_incremental(self, response) -> Optional[List[Post]]:
+        """
+        Return new posts or None if a full refresh is needed
+        """
+        if isinstance(response, dict):
+            if response.get("Error") == -404:
+                raise ThreadArchivedError(
+                    f"Thread {self.state.board}/{self.state.num} not found"
+                )
+            return None
+
+        if not response or response[0]["num"] != self.state.last_num:
+            return None
+
+        return self._new_posts(response[1:])
+
+    def _polled(self, posts: List[Post], lasthit: Optional[int]) -> List[Post]:
+        # the incremental answer has no OP, so remember the caller's
+        # lasthit, or the next poll with the same value isn't skipped
+        if lasthit is not None:
+            self.state.lasthit = lasthit
+
+        return posts
+
+    def _archive(self):
+        self.state.archived = True
+
+        return []
+
+
+class ThreadWatcher(BaseThreadWatcher):
+    def __init__(
+        self,
+        client,
+        thread,
+        board: str = None,
+        interval: float = 10,
+        incremental: bool = True,
+    ):
+        super().__init__(
+            client,
+            thread,
+            board or client.board.board_id,
+            interval,
+            incremental,
+        )
+
+    def poll(self, lasthit: Optional[int] = None) -> List[Post]:
+        """
+        Fetch posts added since the previous poll
+
+        lasthit: thread's `lasthit` from a catalog, if it equals the last
+            seen value the thread is not requested at all
+        """
+        if self._skip(lasthit):
+            return []
+
+        try:
+            posts = None
+
+            if self._use_incremental():
+                posts = self._process_incremental(
+                    self.client.get(
+                        "/makaba/mobile.fcgi",
+                        params=self._incremental_params(),
+                    )
+                )
+
+            if posts is None:
+                posts = self._process_full(
+                    self.client.get(self._thread_path())
+                )
+        except ThreadArchivedError:
+            return self._archive()
+        except RequestError as e:
+            if e.status_code == 404:
+                return self._archive()
+            raise
+
+        return self._polled(posts, lasthit)
+
+    def watch(self) -> Iterator[Post]:
+        """
+        Yield new posts until the thread is archived or deleted
+        """
+        while True:
+            yield from self.poll()
+
+            if self.state.archived:
+                return
+
+            time.sleep(self.interval)
+
+    def __iter__(self):
+        return self.watch()
+
+
+class AsyncThreadWatcher(BaseThreadWatcher):
+    def __init__(
+        self,
+        client,
+        thread,
+        board: str = None,
+        interval: float = 10,
+        incremental: bool = True,
+    ):
+        super().__init__(client, thread, board, interval, incremental)
+
+    async def poll(self, lasthit: Optional[int] = None) -> List[Post]:
+        if self.state.board is None:
+            self.state.board = await self.client._resolve_board()
+
+        if self._skip(lasthit):
+            return []
+
+        try:
+            posts = None
+
+            if self._use_incremental():
+                posts = self._process_incremental(
+                    await self.client.get(
+                        "/makaba/mobile.fcgi",
+                        params=self._incremental_params(),
+                    )
+                )
+
+            if posts is None:
+                posts = self._process_full(
+                    await self.client.get(self._thread_path())
+                )
+        except ThreadArchivedError:
+            return self._archive()
+        except RequestError as e:
+            if e.status_code == 404:
+                return self._archive()
+            raise
+
+        return self._polled(posts, lasthit)
+
+    async def watch(self):
+        # imported here so the sync client doesn't import asyncio
+        import asyncio
+
+        while True:
+            for post in await self.poll():
+                yield post
+
+            if self.state.archived:
+                return
+
+            await asyncio.sleep(self.interval)
+
+    def __aiter__(self):
+        return self.watch()
@@ -40,6 +40,11 @@ setup(
     license="MIT",
     packages=find_packages(include=["py_2ch_api", "py_2ch_api.*"]),
     python_requires=">=3.7, <4",
-    install_requires=["requests==2.22.0", "addict==2.2.1", "wget==3.2"],
-    extras_require={"dev": ["black"], "test": ["pytest"]},
+    install_requires=["requests==2.22.0", "addict==2.2.1"],
+    extras_require={
+        "async": ["aiohttp"],
+        "parquet": ["pyarrow"],
+        "dev": ["black"],
+        "test": ["pytest"],
+    },
 )
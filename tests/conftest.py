@@ -0,0 +1,24 @@
+import asyncio
+
+import pytest
+
+from benchmarks.fake_makaba import FakeMakaba
+
+# thread of the fake catalog that answers 404
+MISSING_THREAD = 2000
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+@pytest.fixture(scope="session")
+def fake():
+    with FakeMakaba(
+        boards=("b", "po"),
+        threads=5,
+        posts=20,
+        media_size=1024,
+        missing=(MISSING_THREAD,),
+    ) as fake:
+        yield fake
@@ -0,0 +1,113 @@
+import sqlite3
+
+import pytest
+
+from py_2ch_api.archive import (
+    Archive,
+    _BOARD_COLUMNS,
+    _FILE_COLUMNS,
+    _POST_COLUMNS,
+    _THREAD_COLUMNS,
+)
+from py_2ch_api.client import ChAPI
+from py_2ch_api.models import File, Post, Thread
+from tests.conftest import MISSING_THREAD
+
+THREAD = 1000
+
+
+@pytest.fixture
+def archive(tmp_path):
+    with Archive(str(tmp_path / "archive" / "2ch.db"), batch_size=7) as a:
+        yield a
+
+
+def test_schema_follows_the_models(archive):
+    db = sqlite3.connect(archive.path)
+
+    try:
+        for table, columns in (
+            ("boards", _BOARD_COLUMNS),
+            ("threads", _THREAD_COLUMNS),
+            ("posts", _POST_COLUMNS),
+            ("files", _FILE_COLUMNS),
+        ):
+            names = [
+                row[1] for row in db.execute(f"PRAGMA table_info({table})")
+            ]
+            assert names == list(columns) + ["archived"]
+    finally:
+        db.close()
+
+    assert "opening_post" not in _THREAD_COLUMNS
+    assert "files" not in _POST_COLUMNS
+    assert set(Post.__slots__) - {"files"} <= set(_POST_COLUMNS)
+    assert set(File.__slots__) <= set(_FILE_COLUMNS)
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_ingest_round_trip(fake, archive, lazy):
+    api = ChAPI(base_url=fake.url, boards_cache_dir=None)
+    keys = [("b", THREAD), ("b", MISSING_THREAD)]
+
+    catalogs = list(archive.ingest(api.get_catalogs(["b"], lazy=lazy)))
+    threads = list(archive.ingest(api.get_threads(keys, lazy=lazy)))
+
+    # results are passed on, failed ones too
+    assert [result.key for result in catalogs] == ["b"]
+    assert sorted(result.key for result in threads) == sorted(keys)
+    assert not dict((r.key, r) for r in threads)["b", MISSING_THREAD].ok
+
+    archived = archive.threads("b")
+    assert len(archived) == fake.threads
+    assert all(isinstance(thread, Thread) for thread in archived)
+    assert archive.thread("b", THREAD).num == THREAD
+    assert archive.thread("b", 1) is None
+
+    posts = archive.posts("b", THREAD)
+    fetched = dict((r.key, r) for r in threads)["b", THREAD].value
+    assert len(archive) == fake.posts
+    assert [post.num for post in posts] == [post.num for post in fetched]
+    assert [post.comment for post in posts] == [
+        post.comment for post in fetched
+    ]
+    assert [[file.md5 for file in post.files] for post in posts] == [
+        [file.md5 for file in post.files] for post in fetched
+    ]
+    assert archive.posts("b", MISSING_THREAD) == []
+
+
+def test_posts_since_and_last_post_num(fake, archive):
+    api = ChAPI(base_url=fake.url, boards_cache_dir=None)
+    posts = api.get_thread(THREAD, board="b")
+    archive.add_posts("b", posts)
+    archive.flush()
+
+    assert archive.last_post_num("b", THREAD) == posts[-1].num
+    assert archive.last_post_num("b", MISSING_THREAD) is None
+
+    since = posts[9].timestamp
+    assert [post.num for post in archive.posts("b", THREAD, since)] == [
+        post.num for post in posts[10:]
+    ]
+    assert archive.posts("b", THREAD, posts[-1].timestamp) == []
+
+
+def test_files_by_md5(fake, archive):
+    api = ChAPI(base_url=fake.url, boards_cache_dir=None)
+    posts = api.get_thread(THREAD, board="b")
+    archive.add_posts("b", posts)
+    archive.add_posts("po", posts[:1], thread=THREAD)
+    archive.flush()
+
+    post = next(post for post in posts if post.files)
+    file = post.files[0]
+    copies = archive.files_by_md5(file.md5.upper())
+
+    boards = ["b", "po"] if post is posts[0] else ["b"]
+    assert sorted(board for board, _, _ in copies) == boards
+    assert all(num == post.num for _, num, _ in copies)
+    assert all(isinstance(copy, File) for _, _, copy in copies)
+    assert copies[0][2].path == file.path
+    assert copies[0][2].name == file.name
+    assert archive.files_by_md5("0" * 32) == []
@@ -0,0 +1,199 @@
+import asyncio
+import hashlib
+import os
+
+import pytest
+
+from benchmarks.fake_makaba import FakeMakaba
+from py_2ch_api.async_client import AsyncChAPI
+from py_2ch_api.exceptions import BoardNotFound, RequestError
+from py_2ch_api.models import Post, PostView, Thread
+from tests.conftest import MISSING_THREAD, run
+
+
+def client(fake: FakeMakaba, **kwargs) -> AsyncChAPI:
+    return AsyncChAPI(base_url=fake.url, boards_cache_dir=None, **kwargs)
+
+
+async def collect(results):
+    return {result.key: result async for result in results}
+
+
+def test_get_board_threads(fake):
+    async def main():
+        async with client(fake) as api:
+            return await api.get_board_threads(board="po")
+
+    threads = run(main())
+
+    assert len(threads) == fake.threads
+    assert all(isinstance(thread, Thread) for thread in threads)
+    assert threads[0].num == 1000
+
+
+def test_unknown_board_falls_back_to_default(fake):
+    hits = fake.hits.get("/po/catalog.json", 0)
+
+    async def main():
+        async with client(fake, board="po") as api:
+            return await api.get_board_threads(board="nope")
+
+    threads = run(main())
+
+    assert len(threads) == fake.threads
+    assert fake.hits["/po/catalog.json"] == hits + 1
+
+
+def test_set_board_unknown(fake):
+    async def main():
+        async with client(fake) as api:
+            await api.set_board("nope")
+
+    with pytest.raises(BoardNotFound):
+        run(main())
+
+
+def test_concurrent_first_calls_load_the_registry_once(fake):
+    hits = fake.hits.get("/userboards.json", 0)
+
+    async def main():
+        async with client(fake) as api:
+            return await asyncio.gather(
+                *(api.get_board(board) for board in ("b", "po") * 5)
+            )
+
+    boards = run(main())
+
+    assert [board.board_id for board in boards] == ["b", "po"] * 5
+    assert fake.hits["/userboards.json"] == hits + 1
+
+
+def test_get_thread(fake):
+    async def main():
+        async with client(fake) as api:
+            return (
+                await api.get_thread(1000, board="b"),
+                await api.get_thread(1000, board="b", lazy=True),
+            )
+
+    posts, views = run(main())
+
+    assert len(posts) == len(views) == fake.posts
+    assert isinstance(posts[0], Post)
+    assert isinstance(views[0], PostView)
+    assert [post.num for post in posts] == [view.num for view in views]
+
+
+def test_get_thread_not_found(fake):
+    async def main():
+        async with client(fake) as api:
+            return await api.get_thread(MISSING_THREAD, board="b")
+
+    with pytest.raises(RequestError) as error:
+        run(main())
+
+    assert error.value.status_code == 404
+
+
+def test_get_threads_reports_errors_per_key(fake):
+    keys = [("b", 1000), ("po", 3000), ("b", MISSING_THREAD), ("nope", 1000)]
+
+    async def main():
+        async with client(fake) as api:
+            return await collect(api.get_threads(keys))
+
+    results = run(main())
+
+    assert set(results) == set(keys)
+    assert len(results["b", 1000].value) == fake.posts
+    assert len(results["po", 3000].value) == fake.posts
+    assert isinstance(results["b", MISSING_THREAD].error, RequestError)
+    assert isinstance(results["nope", 1000].error, BoardNotFound)
+
+
+def test_get_catalogs(fake):
+    async def main():
+        async with client(fake) as api:
+            return await collect(api.get_catalogs(["b", "po", "nope"]))
+
+    results = run(main())
+
+    assert results["b"].ok and results["po"].ok
+    assert isinstance(results["nope"].error, BoardNotFound)
+
+
+def test_download_all_media_from_thread(fake, tmp_path):
+    async def main():
+        async with client(fake) as api:
+            files = await api.get_all_media_from_thread(
+                1000, media_type=None, board="b"
+            )
+            results = await api.download_all_media_from_thread(
+                1000, out_dir=str(tmp_path), board="b"
+            )
+
+            return files, results
+
+    files, results = run(main())
+
+    assert files and len(results) == len(files)
+    assert all(result.ok and not result.skipped for result in results)
+
+    for file in files:
+        with open(os.path.join(tmp_path, file.name[:64]), "rb") as out_file:
+            assert hashlib.md5(out_file.read()).hexdigest() == file.md5
+
+
+def test_download_skips_existing_file(fake, tmp_path):
+    out_path = str(tmp_path / "1.jpg")
+
+    with open(out_path, "wb") as out_file:
+        out_file.write(b"existing")
+
+    async def main():
+        async with client(fake) as api:
+            return await api.download(
+                fake.url + "/b/src/1000/1.jpg", out_path=out_path
+            )
+
+    result = run(main())
+
+    assert result.ok and result.skipped
+
+    with open(out_path, "rb") as out_file:
+        assert out_file.read() == b"existing"
+
+
+def test_download_error_is_reported(fake, tmp_path):
+    async def main():
+        async with client(fake) as api:
+            return await api.download(
+                fake.url + "/missing.jpg", out_path=str(tmp_path / "1.jpg")
+            )
+
+    result = run(main())
+
+    assert not result.ok
+    assert "404" in str(result.error)
+    assert not os.path.exists(tmp_path / "1.jpg")
+
+
+def test_download_timeout_is_reported(tmp_path):
+    with FakeMakaba(threads=1, posts=3, media_size=1024) as fake:
+
+        async def main():
+            async with client(fake, download_timeout=0.2) as api:
+                posts = await api.get_thread(1000, board="b")
+                fake.latency = 1
+
+                return await api.download_all_media_from_post(
+                    posts[0], out_dir=str(tmp_path)
+                )
+
+        results = run(main())
+
+    # every file times out, none of them aborts the others
+    assert results
+    assert all(
+        isinstance(result.error, asyncio.TimeoutError) for result in results
+    )
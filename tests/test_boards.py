@@ -0,0 +1,25 @@
+from py_2ch_api import client
+from py_2ch_api.client import ChAPI
+
+
+def test_boards_never_expiring_without_a_shared_entry(fake):
+    client._shared_boards.pop(fake.url, None)
+
+    api = ChAPI(
+        board="po",
+        base_url=fake.url,
+        boards_cache_dir=None,
+        boards_cache_ttl=float("inf"),
+    )
+
+    assert api.board.board_id == "po"
+    assert set(api._boards) == {"b", "po"}
+
+
+def test_boards_are_shared_between_clients(fake):
+    ChAPI(base_url=fake.url, boards_cache_dir=None)
+    before = fake.hits.get("/userboards.json", 0)
+
+    ChAPI(base_url=fake.url, boards_cache_dir=None)
+
+    assert fake.hits.get("/userboards.json", 0) == before
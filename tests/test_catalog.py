@@ -0,0 +1,34 @@
+from itertools import islice
+
+from py_2ch_api.catalog import CatalogPoller
+from py_2ch_api.client import ChAPI
+from py_2ch_api.exceptions import RequestError
+
+
+def test_stream_keeps_other_boards_when_one_fails(fake):
+    api = ChAPI(base_url=fake.url, boards_cache_dir=None)
+    # "gone" isn't served, its catalog answers 404
+    poller = CatalogPoller(api, boards=["b", "gone", "po"], max_interval=60)
+
+    events = list(islice(poller.stream(), 2 * fake.threads))
+
+    assert {event.board for event in events} == {"b", "po"}
+    failures, error = poller.errors["gone"]
+    assert failures == 1
+    assert isinstance(error, RequestError)
+    assert poller.backoff_for("gone", failures) == 60
+
+
+def test_backoff_doubles_up_to_max_interval(fake):
+    api = ChAPI(base_url=fake.url, boards_cache_dir=None)
+    poller = CatalogPoller(
+        api, boards=["b"], max_interval=100, intervals={"b": 10}
+    )
+
+    assert [poller.backoff_for("b", n) for n in range(1, 6)] == [
+        20,
+        40,
+        80,
+        100,
+        100,
+    ]
@@ -0,0 +1,85 @@
+import pickle
+
+from benchmarks.fake_makaba import FakeMakaba
+from py_2ch_api.client import ChAPI
+from py_2ch_api.crawl import crawl_boards
+from py_2ch_api.exceptions import RequestError
+from py_2ch_api.ratelimit import RetryPolicy
+
+MISSING_THREAD = 2000
+
+
+def crawl_fake():
+    # no "b" on this registry, ChAPI's default board
+    return FakeMakaba(
+        boards=("po", "a"), threads=3, posts=5, missing=(MISSING_THREAD,)
+    )
+
+
+def test_retry_policy_pickles():
+    policy = pickle.loads(pickle.dumps(RetryPolicy(retries=5)))
+
+    assert policy.retries == 5
+    assert policy.delay(0) >= 0
+
+
+def test_crawl_boards_spawn():
+    with crawl_fake() as fake:
+        results = {
+            result.key: result
+            for result in crawl_boards(
+                ["po", "a"],
+                base_url=fake.url,
+                processes=2,
+                options={"board": "po", "retry_policy": RetryPolicy()},
+                mp_context="spawn",
+            )
+        }
+
+    assert set(results) == {"po", "a"}
+
+    for result in results.values():
+        records = result.value
+
+        assert result.ok
+        assert len(records.threads) == fake.threads
+        # the missing thread is recorded, the others are kept
+        assert len(records.posts) == (fake.threads - 1) * fake.posts
+        assert list(records.errors) == [MISSING_THREAD]
+        assert isinstance(records.errors[MISSING_THREAD], RequestError)
+
+
+def test_client_crawl_boards_forwards_board():
+    with crawl_fake() as fake:
+        api = ChAPI(
+            board="po",
+            base_url=fake.url,
+            boards_cache_dir=None,
+            retry_policy=RetryPolicy(),
+        )
+        results = list(api.crawl_boards(processes=1, posts=False))
+
+    assert sorted(result.key for result in results) == ["a", "po"]
+    assert all(result.ok for result in results)
+
+
+def test_workers_reuse_the_parent_registry():
+    with crawl_fake() as fake:
+        api = ChAPI(board="po", base_url=fake.url, boards_cache_dir=None)
+        before = fake.hits.get("/userboards.json", 0)
+
+        results = list(
+            crawl_boards(
+                ["po", "a"],
+                base_url=fake.url,
+                processes=2,
+                posts=False,
+                options={"board": "po"},
+                mp_context="spawn",
+                board_registry=api._boards,
+            )
+        )
+
+        assert fake.hits.get("/userboards.json", 0) == before
+
+    assert all(result.ok for result in results)
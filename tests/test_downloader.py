@@ -0,0 +1,141 @@
+import os
+
+import pytest
+
+from benchmarks.fixtures import media_md5
+from py_2ch_api.downloader import Downloader, part_path
+from py_2ch_api.exceptions import ChecksumMismatchError
+from py_2ch_api.media_index import MediaIndex
+from py_2ch_api.session import make_session
+
+
+@pytest.fixture
+def downloader():
+    session = make_session()
+    yield Downloader(session, workers=2)
+    session.close()
+
+
+def media(fake, name: str):
+    path = f"/b/src/1000/{name}"
+
+    return fake.url + path, fake.media_body(path), media_md5(path, 1024)
+
+
+def read(path: str) -> bytes:
+    with open(path, "rb") as media_file:
+        return media_file.read()
+
+
+def test_download_verifies_the_md5(fake, downloader, tmp_path):
+    url, body, md5 = media(fake, "full.jpg")
+    out_path = str(tmp_path / "full.jpg")
+
+    result = downloader.fetch(url, out_path, md5)
+
+    assert result.ok and not result.resumed
+    assert result.bytes == len(body)
+    assert read(out_path) == body
+    assert not os.path.exists(part_path(out_path))
+
+    assert downloader.fetch(url, out_path, md5).skipped
+
+
+def test_download_resumes_a_partial_file(fake, downloader, tmp_path):
+    url, body, md5 = media(fake, "resume.jpg")
+    out_path = str(tmp_path / "resume.jpg")
+
+    with open(part_path(out_path), "wb") as part_file:
+        part_file.write(body[:300])
+
+    result = downloader.fetch(url, out_path, md5)
+
+    assert result.ok and result.resumed
+    assert result.bytes == len(body) - 300
+    assert read(out_path) == body
+    assert not os.path.exists(part_path(out_path))
+
+
+def test_download_completes_on_416(fake, downloader, tmp_path):
+    url, body, md5 = media(fake, "complete.jpg")
+    out_path = str(tmp_path / "complete.jpg")
+
+    # the partial file already holds the whole body, the server answers
+    # the Range request with 416
+    with open(part_path(out_path), "wb") as part_file:
+        part_file.write(body)
+
+    result = downloader.fetch(url, out_path, md5)
+
+    assert result.ok and not result.resumed
+    assert result.bytes == 0
+    assert read(out_path) == body
+    assert not os.path.exists(part_path(out_path))
+
+
+@pytest.mark.parametrize("partial", [False, True])
+def test_md5_mismatch_removes_the_partial_file(
+    fake, downloader, tmp_path, partial
+):
+    url, body, _ = media(fake, "broken.jpg")
+    out_path = str(tmp_path / "broken.jpg")
+
+    if partial:
+        # a corrupted prefix is only noticed once the rest is appended
+        with open(part_path(out_path), "wb") as part_file:
+            part_file.write(b"\0" * 300)
+
+    result = downloader.fetch(url, out_path, "0" * 32)
+
+    assert isinstance(result.error, ChecksumMismatchError)
+    assert not os.path.exists(out_path)
+    assert not os.path.exists(part_path(out_path))
+
+    # the next attempt starts over
+    assert downloader.fetch(url, out_path).ok
+    assert read(out_path) == body
+
+
+def test_archived_md5_is_hardlinked(fake, tmp_path):
+    url, _, md5 = media(fake, "dedup.jpg")
+    path = url[len(fake.url) :]
+    session = make_session()
+    index = MediaIndex(str(tmp_path / "index.db"))
+    downloader = Downloader(session, index=index)
+
+    try:
+        first = downloader.fetch(url, str(tmp_path / "first.jpg"), md5)
+        hits = fake.hits[path]
+        second = downloader.fetch(url, str(tmp_path / "second.jpg"), md5)
+    finally:
+        index.close()
+        session.close()
+
+    assert first.ok and not first.deduplicated
+    assert second.ok and second.deduplicated
+    assert second.path == str(tmp_path / "second.jpg")
+    assert os.path.samefile(first.path, second.path)
+    assert fake.hits[path] == hits
+
+
+def test_archived_copy_is_used_without_hardlinks(fake, tmp_path, monkeypatch):
+    url, body, md5 = media(fake, "nolink.jpg")
+    session = make_session()
+    index = MediaIndex(str(tmp_path / "index.db"))
+    downloader = Downloader(session, index=index)
+
+    def link(src, dst):
+        raise OSError("Invalid cross-device link")
+
+    try:
+        first = downloader.fetch(url, str(tmp_path / "first.jpg"), md5)
+        monkeypatch.setattr(os, "link", link)
+        second = downloader.fetch(url, str(tmp_path / "second.jpg"), md5)
+    finally:
+        index.close()
+        session.close()
+
+    assert second.ok and second.deduplicated
+    assert second.path == os.path.abspath(first.path)
+    assert not os.path.exists(tmp_path / "second.jpg")
+    assert read(second.path) == body
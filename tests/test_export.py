@@ -0,0 +1,35 @@
+import json
+
+from py_2ch_api.client import ChAPI
+from py_2ch_api.exceptions import BoardNotFound, RequestError
+from py_2ch_api.export import iter_thread_records
+from tests.conftest import MISSING_THREAD
+
+
+def test_export_board_reports_failed_threads(fake, tmp_path):
+    api = ChAPI(base_url=fake.url, boards_cache_dir=None, raw=True)
+    path = str(tmp_path / "b.ndjson")
+    errors = {}
+
+    written = api.export_board(path, board="b", errors=errors)
+
+    assert written == (fake.threads - 1) * fake.posts
+    assert list(errors) == [("b", MISSING_THREAD)]
+    assert isinstance(errors["b", MISSING_THREAD], RequestError)
+
+    with open(path, encoding="utf-8") as export_file:
+        threads = {json.loads(line)["thread"] for line in export_file}
+
+    assert MISSING_THREAD not in threads
+    assert len(threads) == fake.threads - 1
+
+
+def test_thread_records_report_failed_boards(fake):
+    api = ChAPI(base_url=fake.url, boards_cache_dir=None, raw=True)
+    errors = {}
+
+    records = list(iter_thread_records(api, ["b", "nope"], errors))
+
+    assert len(records) == fake.threads
+    assert list(errors) == ["nope"]
+    assert isinstance(errors["nope"], BoardNotFound)
@@ -0,0 +1,24 @@
+import pytest
+
+from py_2ch_api.client import filter_threads
+from py_2ch_api.models import Thread, ThreadView
+
+
+@pytest.mark.parametrize("model", [Thread, ThreadView])
+def test_tag_filter_skips_threads_without_tags(model):
+    threads = [
+        model({"num": 1, "subject": "a", "tags": "foo"}),
+        model({"num": 2, "subject": "b"}),
+    ]
+
+    assert [t.num for t in filter_threads(threads, tag="foo", limit=5)] == [1]
+    assert filter_threads(threads[1:], tag="foo") == []
+
+
+@pytest.mark.parametrize("model", [Thread, ThreadView])
+def test_subject_filter_skips_threads_without_subject(model):
+    threads = [model({"num": 1, "subject": "Foo bar"}), model({"num": 2})]
+
+    assert [
+        t.num for t in filter_threads(threads, subject="foo", limit=5)
+    ] == [1]
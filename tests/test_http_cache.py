@@ -0,0 +1,73 @@
+import pytest
+
+from py_2ch_api.client import ChAPI
+from py_2ch_api.http_cache import (
+    DiskCacheBackend,
+    MemoryCacheBackend,
+    ResponseCache,
+)
+
+THREAD_PATH = "/b/res/1000.json"
+
+
+@pytest.fixture(params=["memory", "disk"])
+def backend(request, tmp_path):
+    if request.param == "memory":
+        yield MemoryCacheBackend()
+    else:
+        backend = DiskCacheBackend(str(tmp_path / "cache.sqlite"))
+        yield backend
+        backend.close()
+
+
+def client(fake, cache: ResponseCache) -> ChAPI:
+    return ChAPI(base_url=fake.url, boards_cache_dir=None, cache=cache)
+
+
+def test_second_request_is_served_from_the_cache(fake, backend):
+    cache = ResponseCache(backend)
+    api = client(fake, cache)
+
+    first = api.get(THREAD_PATH)
+    second = api.get(THREAD_PATH)
+
+    assert second == first
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+    assert stats["bytes_saved"] == len(fake.thread_body("b", 1000))
+
+
+def test_disk_cache_is_shared_between_clients(fake, tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    writer = DiskCacheBackend(path)
+    expected = client(fake, ResponseCache(writer)).get(THREAD_PATH)
+    writer.close()
+
+    reader = DiskCacheBackend(path)
+    cache = ResponseCache(reader)
+
+    # the lookup only reads the validators
+    assert reader.get(fake.url + THREAD_PATH).value is None
+    assert client(fake, cache).get(THREAD_PATH) == expected
+    assert cache.hits == 1 and cache.misses == 0
+    reader.close()
+
+
+def test_entry_evicted_before_the_304_is_fetched_again(fake, tmp_path):
+    class EvictingBackend(MemoryCacheBackend):
+        def get(self, key):
+            entry = super().get(key)
+
+            return entry and type(entry)(
+                entry.etag, entry.last_modified, None, entry.size
+            )
+
+        def load(self, key):
+            raise KeyError(key)
+
+    cache = ResponseCache(EvictingBackend())
+    api = client(fake, cache)
+    expected = api.get(THREAD_PATH)
+
+    assert api.get(THREAD_PATH) == expected
+    assert cache.hits == 0 and cache.misses == 2
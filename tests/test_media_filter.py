@@ -0,0 +1,53 @@
+from types import SimpleNamespace
+
+from benchmarks.fixtures import media_body
+from py_2ch_api.client import ChAPI
+from py_2ch_api.constants import ENDPOINT
+from py_2ch_api.media_filter import MediaFilter
+from py_2ch_api.metrics import MetricsRegistry
+from py_2ch_api.ratelimit import RateLimiter
+
+
+def test_thumbnails_use_the_client_request_path(fake):
+    metrics = MetricsRegistry()
+    rate_limiter = RateLimiter({ENDPOINT.MEDIA: (1000, 1000)})
+    api = ChAPI(
+        base_url=fake.url,
+        boards_cache_dir=None,
+        metrics=metrics,
+        rate_limiter=rate_limiter,
+    )
+    checked = {}
+
+    def thumbnail_check(file, thumbnail):
+        checked[file.thumbnail] = thumbnail
+
+        return file.type == 1
+
+    files = api.get_all_media_from_thread(
+        1000, media_type=None, board="b", thumbnail_check=thumbnail_check
+    )
+    candidates = MediaFilter().select(api.get_thread(1000, board="b"))
+
+    assert len(checked) == len(candidates)
+    assert [file.name for file in files] == [
+        file.name for file in candidates if file.type == 1
+    ]
+    assert all(
+        thumbnail == media_body(path, fake.media_size)
+        for path, thumbnail in checked.items()
+    )
+    assert metrics.counter("requests_total", endpoint=ENDPOINT.MEDIA) == len(
+        checked
+    )
+    assert any(key.endswith(ENDPOINT.MEDIA) for key in rate_limiter.stats())
+
+
+def test_missing_thumbnail_drops_the_file(fake):
+    api = ChAPI(base_url=fake.url, boards_cache_dir=None)
+    pipeline = api.media_pipeline(thumbnail_check=lambda file, body: True)
+    file = MediaFilter().select(api.get_thread(1000, board="b"))[0]
+    file.thumbnail = "/missing.jpg"
+
+    assert pipeline.fetch_thumbnail(file) is None
+    assert pipeline.select([SimpleNamespace(files=[file])]) == []
@@ -0,0 +1,60 @@
+from types import SimpleNamespace
+
+from py_2ch_api.constants import TOP_METHODS
+from py_2ch_api.ranking import RollingTopN, rank_threads
+
+HOUR = 3600
+
+
+def thread(num, views=0, posts_count=0, score=0, timestamp=0, lasthit=0):
+    return SimpleNamespace(
+        num=num,
+        views=views,
+        posts_count=posts_count,
+        score=score,
+        timestamp=timestamp,
+        lasthit=lasthit,
+    )
+
+
+def test_rank_threads_without_limit_sorts_all():
+    threads = [thread(num, views=num % 7) for num in range(20)]
+
+    ranked = rank_threads(threads, TOP_METHODS.VIEWS, limit=None)
+
+    assert len(ranked) == len(threads)
+    assert [t.views for t in ranked] == sorted(
+        (t.views for t in threads), reverse=True
+    )
+    assert rank_threads(threads, TOP_METHODS.VIEWS, limit=3) == ranked[:3]
+
+
+def test_rolling_top_reranks_time_based_keys():
+    clock = [10 * HOUR]
+    top = RollingTopN(
+        TOP_METHODS.POSTS_PER_HOUR, limit=1, now=lambda: clock[0]
+    )
+
+    # 100 posts in 1 hour, then 300 posts in 9 hours
+    top.update("b", thread(1, posts_count=100, timestamp=9 * HOUR))
+    top.update("b", thread(2, posts_count=300, timestamp=1 * HOUR))
+    assert [t.num for _, t in top.top()] == [1]
+
+    # 10 hours later: 100 in 11 hours is slower than 300 in 19
+    clock[0] = 20 * HOUR
+    assert [t.num for _, t in top.top()] == [2]
+    assert top.scores() == {
+        ("b", 1): 100 / 11,
+        ("b", 2): 300 / 19,
+    }
+
+
+def test_rolling_top_static_keys():
+    top = RollingTopN(TOP_METHODS.VIEWS, limit=2)
+    top.update_many("b", [thread(1, views=5), thread(2, views=9)])
+    top.update("po", thread(3, views=7))
+
+    assert [(board, t.num) for board, t in top.top()] == [("b", 2), ("po", 3)]
+
+    top.remove("b", 2)
+    assert [(board, t.num) for board, t in top.top()] == [("po", 3), ("b", 1)]
@@ -0,0 +1,67 @@
+import pytest
+
+from py_2ch_api.client import ChAPI
+from py_2ch_api.scheduler import CrawlScheduler
+
+
+def test_client_keeps_a_scheduler_passed_in(fake):
+    with CrawlScheduler(workers=2) as scheduler:
+        with ChAPI(
+            base_url=fake.url, boards_cache_dir=None, scheduler=scheduler
+        ) as api:
+            assert len(api.schedule_thread(1000, board="b").result()) == (
+                fake.posts
+            )
+
+        # still usable after the client is closed
+        assert scheduler.submit(sum, [1, 2]).result() == 3
+
+
+def test_client_shuts_down_its_own_scheduler(fake):
+    with ChAPI(base_url=fake.url, boards_cache_dir=None) as api:
+        api.schedule_thread(1000, board="b").result()
+        scheduler = api.scheduler
+
+    with pytest.raises(RuntimeError):
+        scheduler.submit(sum, [1, 2])
+
+
+def test_client_rejects_a_process_scheduler(fake):
+    scheduler = CrawlScheduler(workers=1, processes=True)
+
+    try:
+        with pytest.raises(ValueError):
+            ChAPI(
+                base_url=fake.url, boards_cache_dir=None, scheduler=scheduler
+            )
+    finally:
+        scheduler.shutdown()
+
+
+@pytest.mark.parametrize("scheduler_workers", [None, 30])
+def test_client_pools_cover_the_scheduler(fake, scheduler_workers):
+    scheduler = (
+        CrawlScheduler(workers=scheduler_workers)
+        if scheduler_workers
+        else None
+    )
+
+    try:
+        with ChAPI(
+            base_url=fake.url,
+            boards_cache_dir=None,
+            workers=20,
+            scheduler=scheduler,
+        ) as api:
+            threads = scheduler_workers or api.workers
+            # executor and scheduler threads make API calls, downloads
+            # also run on the downloader's pool
+            assert api._session.get_adapter(fake.url)._pool_maxsize == (
+                api.workers + threads
+            )
+            assert api.media_session.get_adapter(fake.url)._pool_maxsize == (
+                2 * api.workers + threads
+            )
+    finally:
+        if scheduler is not None:
+            scheduler.shutdown()
@@ -0,0 +1,86 @@
+import pytest
+
+from py_2ch_api.client import ChAPI
+from py_2ch_api.constants import POST_LIMITS
+from py_2ch_api.exceptions import ExtraFilesError, FileSizeError
+from py_2ch_api.models import Message
+
+MB = 1000000
+
+
+def make_files(directory, count: int, size: int):
+    paths = []
+
+    for i in range(count):
+        path = directory / f"{i}.webm"
+
+        with open(path, "wb") as out_file:
+            # sparse, only stat'ed by validate
+            out_file.truncate(size)
+
+        paths.append(str(path))
+
+    return paths
+
+
+def test_validate_checks_the_total_size(tmp_path):
+    # each file is within the limit, together they are not
+    files = make_files(tmp_path, 2, POST_LIMITS.MAX_SIZE_PASSCODE * MB // 2)
+
+    Message("b", 0, files=files).validate(passcode=True)
+
+    extra = tmp_path / "extra"
+    extra.mkdir()
+
+    with pytest.raises(FileSizeError):
+        Message("b", 0, files=files + make_files(extra, 1, 1)).validate(
+            passcode=True
+        )
+
+    with pytest.raises(FileSizeError):
+        Message("b", 0, files=files).validate(passcode=False)
+
+
+def test_validate_file_count(tmp_path):
+    files = make_files(tmp_path, POST_LIMITS.MAX_FILES + 1, 1)
+
+    Message("b", 0, files=files).validate(passcode=True)
+
+    with pytest.raises(ExtraFilesError):
+        Message("b", 0, files=files).validate()
+
+
+def test_validate_max_file_size(tmp_path):
+    files = make_files(tmp_path, 2, 5 * MB)
+    message = Message("b", 0, files=files)
+
+    message.validate(max_file_size=5)
+    assert message.filesize["size"] == 10
+
+    with pytest.raises(FileSizeError):
+        message.validate(max_file_size=4)
+
+
+def test_send_post(fake, tmp_path):
+    files = make_files(tmp_path, 2, MB)
+    api = ChAPI(base_url=fake.url, boards_cache_dir=None, passcode="test")
+
+    response = api.send_post(Message("b", 1000, "test", files=files))
+
+    assert response["Error"] is None
+    assert response["Num"] == len(fake.posted)
+    assert api.passcode_data == "fake-passcode-hash"
+    # the whole multipart body arrived, files included
+    assert fake.posted[-1] > 2 * MB
+
+
+def test_send_post_validates_before_upload(fake, tmp_path):
+    files = make_files(tmp_path, 2, POST_LIMITS.MAX_SIZE * MB)
+    posted = len(fake.posted)
+
+    with pytest.raises(FileSizeError):
+        ChAPI(base_url=fake.url, boards_cache_dir=None).send_post(
+            Message("b", 1000, files=files)
+        )
+
+    assert len(fake.posted) == posted
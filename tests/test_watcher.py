@@ -0,0 +1,42 @@
+from py_2ch_api.async_client import AsyncChAPI
+from py_2ch_api.client import ChAPI
+from tests.conftest import run
+
+INCREMENTAL_PATH = "/makaba/mobile.fcgi"
+THREAD_PATH = "/b/res/3000.json"
+
+
+def hits(fake):
+    return (
+        fake.hits.get(INCREMENTAL_PATH, 0),
+        fake.hits.get(THREAD_PATH, 0),
+    )
+
+
+def test_incremental_poll_keeps_lasthit(fake):
+    api = ChAPI(base_url=fake.url, boards_cache_dir=None)
+    watcher = api.watch_thread(3000, board="b")
+
+    assert len(watcher.poll(lasthit=1)) == fake.posts
+    assert watcher.poll(lasthit=2) == []
+    assert watcher.state.lasthit == 2
+
+    before = hits(fake)
+    assert watcher.poll(lasthit=2) == []
+    assert hits(fake) == before
+
+
+def test_async_incremental_poll_keeps_lasthit(fake):
+    async def main():
+        async with AsyncChAPI(base_url=fake.url, boards_cache_dir=None) as api:
+            watcher = await api.watch_thread(3000, board="b")
+
+            assert len(await watcher.poll(lasthit=1)) == fake.posts
+            assert await watcher.poll(lasthit=2) == []
+            assert watcher.state.lasthit == 2
+
+            before = hits(fake)
+            assert await watcher.poll(lasthit=2) == []
+            assert hits(fake) == before
+
+    run(main())